@@ -0,0 +1,77 @@
+"""
+Per-request cost of authentication with and without the in-process caches.
+
+Each configuration authenticates the same access token repeatedly, the way a
+client does during the token's lifetime. The user lookup goes to a local
+SQLite database when the user cache is off.
+
+The last row is ``get_current_principal`` with a stateless token: no user
+lookup, only the token version check, here against in-process fakeredis. A
+networked Redis adds one round trip to it.
+
+Usage:
+    python -m benchmarks.auth_overhead [REPEAT]
+"""
+import asyncio
+import sys
+
+import fakeredis
+
+from benchmarks.common import measure, print_table, seed_contacts, temporary_database
+from src.services.auth import Auth, auth_service
+from src.services.cache import token_cache, user_cache
+
+CONFIGURATIONS = [
+    ("no cache", False, False),
+    ("user cache", False, True),
+    ("token cache", True, False),
+    ("token + user cache", True, True),
+]
+
+
+def main(repeat: int) -> None:
+    engine, session_local = temporary_database()
+    loop = asyncio.new_event_loop()
+    token_ttl, user_ttl = token_cache.ttl, user_cache.ttl
+    rows = []
+    with session_local() as db:
+        user = seed_contacts(db, 0)[0]
+        token = loop.run_until_complete(auth_service.create_access_token(data={"sub": user.email}))
+
+        for name, use_tokens, use_users in CONFIGURATIONS:
+            token_cache.clear()
+            user_cache.clear()
+            token_cache.ttl = token_ttl if use_tokens else 0
+            user_cache.ttl = user_ttl if use_users else 0
+            stats = measure(
+                lambda: loop.run_until_complete(auth_service.get_current_user(token, db)),
+                repeat=repeat,
+                warmup=10,
+            )
+            rows.append([name, stats["p50_ms"] * 1000, stats["p99_ms"] * 1000, stats["mean_ms"] * 1000])
+
+        token_cache.ttl = token_ttl
+        Auth.stateless_claims = True
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        claims = loop.run_until_complete(auth_service.token_claims(user, redis))
+        stateless = loop.run_until_complete(auth_service.create_access_token(data=claims))
+        stats = measure(
+            lambda: loop.run_until_complete(auth_service.get_current_principal(stateless, None, redis)),
+            repeat=repeat,
+            warmup=10,
+        )
+        rows.append(["stateless principal", stats["p50_ms"] * 1000, stats["p99_ms"] * 1000, stats["mean_ms"] * 1000])
+        Auth.stateless_claims = False
+
+    token_cache.ttl, user_cache.ttl = token_ttl, user_ttl
+    loop.close()
+    engine.dispose()
+    print_table(
+        f"authentication overhead ({auth_service.ALGORITHM}, {repeat} calls)",
+        ["configuration", "p50_us", "p99_us", "mean_us"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,116 @@
+"""
+Helpers shared by the benchmark scripts.
+
+The scripts import the application modules, so they need the same environment
+(``.env``) as the application itself. Each of them works on its own temporary
+SQLite database unless stated otherwise.
+"""
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Contact, User
+
+
+def temporary_database(name: str = "bench.db"):
+    """
+    Creates an empty SQLite database with the application schema.
+
+    Args:
+        name (str): File name inside a fresh temporary directory.
+
+    Returns:
+        tuple: The engine and a bound sessionmaker.
+    """
+    path = Path(tempfile.mkdtemp()) / name
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed_contacts(session, total: int, owners: int = 1) -> list[User]:
+    """
+    Inserts ``total`` contacts spread evenly over ``owners`` users.
+
+    Args:
+        session (Session): Database session.
+        total (int): Number of contacts to insert.
+        owners (int): Number of users owning them.
+
+    Returns:
+        list[User]: The created owners.
+    """
+    users = [
+        User(username=f"bench{i}", email=f"bench{i}@example.com", password="secret")
+        for i in range(owners)
+    ]
+    session.add_all(users)
+    session.commit()
+    rows = [
+        {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i % 997}",
+            "email": f"contact{i}@example{i % 13}.com",
+            "phone_number": "1234567890",
+            "birthday": date(1980, 1, 1) + timedelta(days=i % 9000),
+            "additional_info": "x" * 200,
+            "owner_id": users[i % owners].id,
+        }
+        for i in range(total)
+    ]
+    for start in range(0, total, 5000):
+        session.execute(insert(Contact), rows[start:start + 5000])
+    session.commit()
+    return users
+
+
+def measure(fn, repeat: int = 50, warmup: int = 3) -> dict:
+    """
+    Runs ``fn`` repeatedly and summarises its latency.
+
+    Args:
+        fn (Callable): Zero-argument callable to time.
+        repeat (int): Number of timed runs.
+        warmup (int): Number of untimed runs before measuring.
+
+    Returns:
+        dict: Median, p99 and mean latency in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def print_table(title: str, header: list[str], rows: list[list]) -> None:
+    """
+    Prints benchmark results as an aligned text table.
+
+    Args:
+        title (str): Table caption.
+        header (list[str]): Column names.
+        rows (list[list]): Table rows; floats are printed with three decimals.
+    """
+    cells = [header] + [
+        [f"{value:.3f}" if isinstance(value, float) else str(value) for value in row]
+        for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    print(title)
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+    print()
@@ -0,0 +1,35 @@
+"""
+Hash cost picked by the calibration on this machine, and the verify time it gives.
+
+Useful to pin ``PASSWORD_HASH_ROUNDS`` when node types differ by more than a
+factor of two, so that nodes do not rehash each other's passwords.
+
+Usage:
+    python -m benchmarks.hash_calibration [SCHEME] [TARGET_MS ...]
+"""
+import sys
+
+from benchmarks.common import measure, print_table
+from src.services.hashing import calibrate_rounds, password_context
+
+
+def main(scheme: str, targets: list[float]) -> None:
+    rows = []
+    for target in targets:
+        rounds = calibrate_rounds(scheme, target)
+        context = password_context(scheme, rounds)
+        hashed = context.hash("benchmark-password")
+        stats = measure(lambda: context.verify("benchmark-password", hashed), repeat=10, warmup=1)
+        rows.append([target, rounds, stats["p50_ms"], stats["p99_ms"]])
+    print_table(
+        f"{scheme} calibration",
+        ["target_ms", "rounds", "verify_p50_ms", "verify_p99_ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "bcrypt",
+        [float(arg) for arg in sys.argv[2:]] or [100.0, 250.0, 500.0],
+    )
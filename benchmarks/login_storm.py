@@ -0,0 +1,126 @@
+"""
+Latency of a cheap endpoint while logins hammer the same worker.
+
+An application with the auth router and a ``/ping`` route is served in process
+through httpx's ASGI transport, with refresh token families kept in fakeredis.
+``CONCURRENCY`` clients log in back to back while a probe calls ``/ping`` every
+10 ms. The run is repeated with bcrypt
+called inline on the event loop, as before, and through the hashing pool.
+
+Usage:
+    python -m benchmarks.login_storm [SECONDS] [CONCURRENCY]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import fakeredis
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.common import print_table, temporary_database
+from src.database.db import get_db
+from src.database.redis_db import get_redis
+from src.database.models import User
+from src.routes import auth as auth_routes
+from src.services.auth import Auth
+from src.services.hashing import hashing_pool
+
+PASSWORD = "secret123"
+
+
+def build_app(session_local) -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth_routes.router, prefix="/api")
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    redis_server = fakeredis.FakeServer()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_redis] = lambda: fakeredis.FakeAsyncRedis(
+        server=redis_server, decode_responses=True
+    )
+    return app
+
+
+async def storm(app: FastAPI, seconds: float, concurrency: int) -> tuple[int, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    deadline = time.perf_counter() + seconds
+    logins = 0
+    probes = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login():
+            nonlocal logins
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/api/auth/login", data={"username": "storm@example.com", "password": PASSWORD}
+                )
+                logins += response.status_code == 200
+
+        async def probe():
+            # Latency is measured from the scheduled start, so time spent waiting
+            # for a blocked event loop to run the probe is counted too.
+            scheduled = time.perf_counter()
+            while scheduled < deadline:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/ping")
+                finished = time.perf_counter()
+                probes.append((finished - scheduled) * 1000)
+                scheduled = max(scheduled + 0.01, finished)
+
+        await asyncio.gather(probe(), *(login() for _ in range(concurrency)))
+    return logins, probes
+
+
+def main(seconds: float, concurrency: int) -> None:
+    engine, session_local = temporary_database()
+    with session_local() as db:
+        db.add(User(username="storm", email="storm@example.com", confirmed=True,
+                    password=Auth.pwd_context.hash(PASSWORD)))
+        db.commit()
+    app = build_app(session_local)
+
+    rows = []
+    pooled_verify = Auth.verify_password
+
+    async def inline_verify(self, plain_password, hashed_password):
+        return self.pwd_context.verify(plain_password, hashed_password)
+
+    for name, verify in (("inline", inline_verify), ("hashing pool", pooled_verify)):
+        Auth.verify_password = verify
+        logins, probes = asyncio.run(storm(app, seconds, concurrency))
+        probes.sort()
+        rows.append([
+            name,
+            logins / seconds,
+            statistics.median(probes),
+            probes[min(len(probes) - 1, int(len(probes) * 0.99))],
+            probes[-1],
+        ])
+    Auth.verify_password = pooled_verify
+    engine.dispose()
+    print_table(
+        f"/ping latency during {concurrency} concurrent logins "
+        f"({hashing_pool.workers} hashing workers, {seconds:g}s)",
+        ["bcrypt", "logins_per_s", "ping_p50_ms", "ping_p99_ms", "ping_max_ms"],
+        rows,
+    )
+    print("hashing pool:", hashing_pool.stats())
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 16,
+    )
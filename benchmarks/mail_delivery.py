@@ -0,0 +1,116 @@
+"""
+Time to deliver a burst of confirmation emails to a local SMTP server.
+
+``MESSAGES`` messages are sent to an aiosmtpd server the way ``send_email``
+used to send them, each background task opening, authenticating and closing
+its own session, and through the Redis mail queue (fakeredis) drained by a
+:class:`MailWorker` with a two-session pool. The local server answers EHLO
+after ``HANDSHAKE_MS`` milliseconds, standing in for the TCP and TLS round
+trips to a real provider. Sends that fail, such as connections timing out
+while the server is flooded, are counted rather than retried.
+
+Usage:
+    python -m benchmarks.mail_delivery [MESSAGES] [HANDSHAKE_MS]
+"""
+import asyncio
+import socket
+import sys
+import time
+
+import aiosmtplib
+import fakeredis
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from fastapi_mail import ConnectionConfig
+
+from benchmarks.common import print_table
+from src.services.email import render_message
+from src.services.mail_queue import MailWorker, SMTPPool, enqueue_message
+
+
+class Sink:
+    def __init__(self, handshake_ms: float):
+        self.handshake = handshake_ms / 1000
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        await asyncio.sleep(self.handshake)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def messages(count: int):
+    return [
+        render_message(f"user{i}@example.com", "Confirm your email", "email_template.html",
+                       {"host": "http://localhost:8000/", "username": f"user{i}", "token": "x" * 150})
+        for i in range(count)
+    ]
+
+
+async def session_per_message(config: ConnectionConfig, count: int) -> int:
+    async def send(message):
+        smtp = aiosmtplib.SMTP(hostname=config.MAIL_SERVER, port=config.MAIL_PORT, start_tls=False,
+                               username=config.MAIL_USERNAME, password=config.MAIL_PASSWORD)
+        async with smtp:
+            await smtp.send_message(message)
+
+    results = await asyncio.gather(*(send(message) for message in messages(count)), return_exceptions=True)
+    return sum(isinstance(result, Exception) for result in results)
+
+
+async def pooled_worker(config: ConnectionConfig, count: int) -> int:
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    for message in messages(count):
+        await enqueue_message(client, message)
+    worker = MailWorker(client, SMTPPool(config, size=2))
+    while await worker.run_once():
+        pass
+    await worker.pool.close()
+    return worker.counters["retried"] + worker.counters["dead"]
+
+
+def main(count: int, handshake_ms: float) -> None:
+    rows = []
+    for name, deliver in (("session per message", session_per_message), ("pooled worker", pooled_worker)):
+        sink = Sink(handshake_ms)
+        port = free_port()
+        controller = Controller(sink, hostname="127.0.0.1", port=port,
+                                authenticator=authenticate, auth_require_tls=False)
+        controller.start()
+        config = ConnectionConfig(
+            MAIL_USERNAME="user", MAIL_PASSWORD="secret", MAIL_FROM="noreply@example.com",
+            MAIL_PORT=port, MAIL_SERVER="127.0.0.1", MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+        )
+        start = time.perf_counter()
+        failed = asyncio.run(deliver(config, count))
+        elapsed = time.perf_counter() - start
+        controller.stop()
+        rows.append([name, sink.messages, failed, sink.sessions, elapsed * 1000, sink.messages / elapsed])
+    print_table(
+        f"delivering {count} messages, {handshake_ms:g} ms handshake",
+        ["method", "delivered", "failed", "smtp_sessions", "total_ms", "messages_per_s"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+    )
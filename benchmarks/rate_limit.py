@@ -0,0 +1,57 @@
+"""
+Redis round trips and per-request cost of the rate limiter.
+
+A single user sends ``TIMES`` requests, the whole allowance of a 60 second
+window, through the limiter backed by in-process fakeredis. ``batch=1`` syncs
+every request, which is what the previous Redis-only limiter did; the default
+batch syncs every ``TIMES // 4`` requests until the bucket runs low. A networked
+Redis adds its round trip time to every sync.
+
+Usage:
+    python -m benchmarks.rate_limit [TIMES]
+"""
+import asyncio
+import sys
+import time
+
+import fakeredis
+from fastapi import Request, Response
+
+from benchmarks.common import print_table
+from src.services.rate_limit import RateLimiter
+
+REQUEST = Request({
+    "type": "http",
+    "method": "GET",
+    "path": "/api/contacts/",
+    "query_string": b"",
+    "headers": [],
+    "client": ("10.0.0.1", 1234),
+})
+
+
+async def run(limiter: RateLimiter, times: int) -> tuple[int, float]:
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    syncs = RateLimiter.counters["syncs"]
+    started = time.perf_counter()
+    for _ in range(times):
+        await limiter(REQUEST, Response(), redis)
+    elapsed = time.perf_counter() - started
+    return RateLimiter.counters["syncs"] - syncs, elapsed / times * 1e6
+
+
+def main(times: int) -> None:
+    rows = []
+    for name, batch in (("every request", 1), ("batched", None)):
+        limiter = RateLimiter(times=times, seconds=60, batch=batch)
+        syncs, per_request = asyncio.run(run(limiter, times))
+        rows.append([name, limiter.batch, syncs, per_request])
+    print_table(
+        f"rate limiter, {times} requests per 60s",
+        ["sync", "batch", "redis_round_trips", "us_per_request"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,78 @@
+"""
+Time and memory to read contacts as ORM entities and as column-only rows.
+
+Each query reads ``ROWS`` contacts of one owner, through the ORM variant of the
+repository function and through its read-only ``*_row(s)`` variant, in a fresh
+session. Time is the median of several runs and includes building the JSON
+body with the fast serializer; memory is the tracemalloc peak of one run,
+taken while the results are still referenced, as they are until the response
+is sent.
+
+Usage:
+    python -m benchmarks.read_hydration [ROWS]
+"""
+import sys
+import tracemalloc
+from datetime import date
+
+from benchmarks.common import measure, print_table, seed_contacts, temporary_database
+from src.repository import contacts as repository_contacts
+from src.services.serialization import contact_list_json
+
+VARIANTS = [
+    ("page", "get_contacts", "get_contact_rows", lambda rows: {"limit": rows}),
+    ("search", "search_contacts", "search_contact_rows",
+     lambda rows: {"query": "example", "limit": rows}),
+    ("birthdays", "get_contacts_with_upcoming_birthdays", "get_upcoming_birthday_rows",
+     lambda rows: {"days": 366, "today": date(2024, 1, 1)}),
+]
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 1024
+
+
+def main(rows: int) -> None:
+    engine, session_local = temporary_database()
+    with session_local() as db:
+        owner = seed_contacts(db, rows)[0]
+        db.refresh(owner)
+        db.expunge(owner)
+
+    table = []
+    for name, orm_name, rows_name, arguments in VARIANTS:
+        for kind, function_name in (("orm", orm_name), ("columns", rows_name)):
+            function = getattr(repository_contacts, function_name)
+
+            def run():
+                with session_local() as db:
+                    result = function(db, user=owner, **arguments(rows))
+                    contact_list_json(result)
+                    return result, len(db.identity_map)
+
+            (result, identity_map), memory = run(), peak_kib(run)
+            stats = measure(run, repeat=5, warmup=1)
+            table.append([
+                name,
+                kind,
+                len(result),
+                identity_map,
+                stats["p50_ms"],
+                memory,
+                memory * 1024 / len(result),
+            ])
+    engine.dispose()
+    print_table(
+        f"reading {rows} contacts",
+        ["query", "variant", "rows", "identity_map", "p50_ms", "peak_kib", "bytes_per_row"],
+        table,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,52 @@
+"""
+Search latency against table size: ILIKE scan versus the indexed search.
+
+Usage:
+    python -m benchmarks.search_latency [SIZE ...]
+"""
+import sys
+
+from sqlalchemy import or_
+
+from benchmarks.common import measure, print_table, seed_contacts, temporary_database
+from src.database.models import Contact
+from src.repository.contacts import search_contacts
+
+QUERIES = ["Last42", "example7", "rst999"]
+
+
+def ilike_scan(db, query, user):
+    return (
+        db.query(Contact)
+        .filter(
+            Contact.owner_id == user.id,
+            or_(
+                Contact.first_name.ilike(f"%{query}%"),
+                Contact.last_name.ilike(f"%{query}%"),
+                Contact.email.ilike(f"%{query}%"),
+            ),
+        )
+        .all()
+    )
+
+
+def main(sizes: list[int]) -> None:
+    rows = []
+    for size in sizes:
+        engine, session_local = temporary_database()
+        with session_local() as db:
+            user = seed_contacts(db, size, owners=4)[0]
+            for query in QUERIES:
+                scan = measure(lambda: ilike_scan(db, query, user), repeat=20)
+                indexed = measure(lambda: search_contacts(db, query, user), repeat=20)
+                rows.append([size, query, scan["p50_ms"], indexed["p50_ms"], indexed["p99_ms"]])
+        engine.dispose()
+    print_table(
+        "search_contacts latency (SQLite, 4 owners)",
+        ["rows", "query", "ilike_p50_ms", "indexed_p50_ms", "indexed_p99_ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
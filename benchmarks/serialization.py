@@ -0,0 +1,87 @@
+"""
+Cost of turning a page of contacts into JSON bytes.
+
+Pages of ORM contacts are serialized the way FastAPI does for a
+``response_model`` (validate from attributes, dump to Python, ``json.dumps``),
+by validating and dumping with a cached TypeAdapter, and by the fast path of
+:mod:`src.services.serialization`. orjson over the same dicts is listed for
+comparison when it is installed.
+
+Usage:
+    python -m benchmarks.serialization [ROWS ...]
+"""
+import json
+import sys
+from datetime import date
+from typing import List
+
+from pydantic import TypeAdapter
+
+from benchmarks.common import measure, print_table
+from src.database.models import Contact
+from src.schemas import ContactResponse
+from src.services.serialization import contact_list_json, contact_row
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+adapter = TypeAdapter(List[ContactResponse])
+
+
+def make_contacts(count: int) -> list[Contact]:
+    return [
+        Contact(
+            id=i,
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone_number="1234567890",
+            birthday=date(1990, 1, 1 + i % 28),
+            additional_info=None if i % 2 else "met at a conference",
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_default(contacts) -> bytes:
+    content = adapter.dump_python(adapter.validate_python(contacts, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def validate_and_dump(contacts) -> bytes:
+    return adapter.dump_json(adapter.validate_python(contacts, from_attributes=True))
+
+
+def orjson_dump(contacts) -> bytes:
+    return orjson.dumps([contact_row(contact) for contact in contacts])
+
+
+def main(sizes: list[int]) -> None:
+    methods = [
+        ("fastapi default", fastapi_default),
+        ("validate + dump_json", validate_and_dump),
+        ("fast path", contact_list_json),
+    ]
+    if orjson is not None:
+        methods.append(("orjson", orjson_dump))
+
+    rows = []
+    for size in sizes:
+        contacts = make_contacts(size)
+        expected = json.loads(fastapi_default(contacts))
+        repeat = max(3, min(200, 200_000 // size))
+        for name, serialize in methods:
+            assert json.loads(serialize(contacts)) == expected, name
+            stats = measure(lambda: serialize(contacts), repeat=repeat, warmup=1)
+            rows.append([size, name, stats["p50_ms"], stats["p50_ms"] * 1000 / size])
+    print_table(
+        "contact list serialization",
+        ["rows", "method", "p50_ms", "us_per_row"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 1000, 100000])
@@ -0,0 +1,72 @@
+"""
+Cost of rendering email templates for each message.
+
+``MESSAGES`` confirmation emails with different contexts are rendered the way
+fastapi_mail does (a new Jinja environment, so a fresh parse, per message),
+through one shared environment that checks the template file on each lookup,
+and through the precompiled :class:`MailTemplates`. Startup compilation is
+timed with an empty and with a warm bytecode cache, as a new process sees it.
+
+Usage:
+    python -m benchmarks.template_render [MESSAGES]
+"""
+import sys
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemLoader
+
+from benchmarks.common import measure, print_table
+from src.services.email import conf
+from src.services.mail_templates import TEMPLATE_FOLDER, MailTemplates
+
+TEMPLATE = "email_template.html"
+
+
+def contexts(count: int) -> list[dict]:
+    return [
+        {"host": "http://localhost:8000/", "username": f"user{i}", "token": f"{i:0150d}"}
+        for i in range(count)
+    ]
+
+
+def main(count: int) -> None:
+    batch = contexts(count)
+    shared = Environment(loader=FileSystemLoader(TEMPLATE_FOLDER))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        templates = MailTemplates(TEMPLATE_FOLDER, cache_dir)
+        templates.compile_all()
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        MailTemplates(TEMPLATE_FOLDER, cache_dir).compile_all()
+        warm_ms = (time.perf_counter() - start) * 1000
+
+        methods = [
+            ("environment per message",
+             lambda: [conf.template_engine().get_template(TEMPLATE).render(**context) for context in batch]),
+            ("shared environment",
+             lambda: [shared.get_template(TEMPLATE).render(**context) for context in batch]),
+            ("precompiled",
+             lambda: [templates.render(TEMPLATE, context) for context in batch]),
+        ]
+        rows = []
+        for name, render in methods:
+            stats = measure(render, repeat=5, warmup=1)
+            rows.append([name, count, stats["p50_ms"], stats["p50_ms"] * 1000 / count])
+
+    print_table(
+        f"rendering {count} messages",
+        ["method", "messages", "p50_ms", "us_per_message"],
+        rows,
+    )
+    print_table(
+        "startup compilation",
+        ["bytecode cache", "compile_ms"],
+        [["empty", cold_ms], ["warm", warm_ms]],
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,122 @@
+"""
+Database round trips and latency of the contact write paths, before and after
+moving them to single ``... RETURNING`` statements.
+
+Round trips are counted as executed statements plus COMMITs. SQLite runs in
+process, so the latency gap it shows is a lower bound of what a networked
+Postgres adds per round trip. The seeded user is kept loaded across commits,
+as the request's user is not part of the write path.
+
+Only the repository is measured. The write routes add two Redis DELs around
+it to invalidate the owner's cached responses, and no database statement.
+
+Usage:
+    python -m benchmarks.write_path [REPEAT]
+"""
+import itertools
+import sys
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from benchmarks.common import measure, print_table, seed_contacts, temporary_database
+from src.database.models import Contact
+from src.repository import contacts as repository_contacts
+from src.schemas import ContactCreate, ContactUpdate
+
+
+def legacy_create(db, contact, user):
+    if db.query(Contact).filter(Contact.email == contact.email).first():
+        raise HTTPException(status_code=409)
+    db_contact = Contact(**contact.model_dump(), owner_id=user.id)
+    db.add(db_contact)
+    db.commit()
+    db.refresh(db_contact)
+    return db_contact
+
+
+def legacy_update(db, contact_id, contact, user):
+    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    if db_contact is None or db_contact.owner_id != user.id:
+        raise HTTPException(status_code=404)
+    for attr, value in contact.model_dump(exclude_unset=True).items():
+        setattr(db_contact, attr, value)
+    db.commit()
+    db.refresh(db_contact)
+    return db_contact
+
+
+def legacy_delete(db, contact_id, user):
+    db_contact = (
+        db.query(Contact).filter(Contact.id == contact_id, Contact.owner_id == user.id).first()
+    )
+    if db_contact is None:
+        raise HTTPException(status_code=404)
+    db.delete(db_contact)
+    db.commit()
+
+
+def use_wal(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+    dbapi_connection.execute("PRAGMA synchronous=NORMAL")
+
+
+class RoundTrips:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._bump)
+        event.listen(engine, "commit", self._bump)
+
+    def _bump(self, *args):
+        self.count += 1
+
+
+def run(name, db, user, counter, create, update, delete, repeat):
+    numbers = itertools.count()
+    created = []
+
+    def do_create():
+        n = next(numbers)
+        contact = ContactCreate(first_name="Bench", last_name=name, email=f"{name}{n}@example.com",
+                                phone_number="1", birthday=date(1990, 1, 1))
+        created.append(create(db, contact, user).id)
+
+    def do_update():
+        update(db, created[len(created) // 2], ContactUpdate(first_name="Updated"), user)
+
+    def do_delete():
+        delete(db, created.pop(), user)
+
+    rows = []
+    for operation, fn in (("create", do_create), ("update", do_update), ("delete", do_delete)):
+        before = counter.count
+        fn()
+        trips = counter.count - before
+        stats = measure(fn, repeat=repeat, warmup=2)
+        rows.append([name, operation, trips, stats["p50_ms"], stats["p99_ms"]])
+    return rows
+
+
+def main(repeat: int) -> None:
+    engine, session_local = temporary_database()
+    engine.dispose()
+    event.listen(engine, "connect", use_wal)
+    counter = RoundTrips(engine)
+    rows = []
+    with session_local(expire_on_commit=False) as db:
+        user = seed_contacts(db, 10_000)[0]
+        rows += run("legacy", db, user, counter,
+                    legacy_create, legacy_update, legacy_delete, repeat)
+        rows += run("returning", db, user, counter, repository_contacts.create_contact,
+                    repository_contacts.update_contact, repository_contacts.delete_contact, repeat)
+    engine.dispose()
+    print_table(
+        "contact writes (SQLite in WAL mode, 10k contacts)",
+        ["path", "operation", "round_trips", "p50_ms", "p99_ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -1,11 +1,18 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.database import db
-from src.database.db import Base, engine
-from src.routes import contacts, auth, users
-from fastapi_limiter import FastAPILimiter
-import redis.asyncio as redis
+from sqlalchemy import Engine, inspect
+from src.database.db import engine
+from src.database.pool import configure_threadpool
+from src.database.redis_db import redis_client
 from src.conf.config import settings
+from src.services.auth import auth_service
+from src.services.email import mail_worker
+from src.services.mail_templates import mail_templates
+from src.routes import contacts, auth, users, internal
 
 app = FastAPI()
 
@@ -15,33 +22,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+# Revision matching the schema that create_all() used to build
+BASELINE_REVISION = "c22a4eb08f7f"
+
+
+def migrate_database(bind: Engine = engine):
+    """
+    Brings the database schema up to date by running the Alembic migrations.
+
+    Databases created before migrations were introduced have no
+    ``alembic_version`` table. They are stamped with the baseline revision first,
+    so only the later migrations run against them. Those migrations skip the
+    objects that ``create_all`` may already have built.
+
+    Args:
+        bind (Engine): Engine of the database to migrate.
+    """
+    config = Config(str(Path(__file__).parent / "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    with bind.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
 
 
 app.include_router(contacts.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
+app.include_router(internal.router, prefix="/api")
 
-create_tables()
+migrate_database()
 
 
 @app.on_event("startup")
 async def startup():
-    r = redis.Redis(
-        host=settings.redis_host,
-        port=settings.redis_port,
-        db=0,
-        encoding="utf-8",
-        decode_responses=True,
-    )
+    configure_threadpool()
+    auth_service.configure_password_hashing()
+    mail_templates.compile_all()
+    r = redis_client
     # Проверка подключения
     try:
         await r.ping()
         print("Connected to Redis")
     except Exception as e:
         print(f"Could not connect to Redis: {e}")
-    await FastAPILimiter.init(r)
+    if settings.mail_worker_enabled:
+        mail_worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await mail_worker.stop()
@@ -0,0 +1,54 @@
+"""add contact search indexes
+
+Revision ID: 75c9c17ba589
+Revises: ce8dece058ab
+Create Date: 2026-10-17 10:11:29.664810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.database.models import SEARCH_DDL_POSTGRESQL, SEARCH_DDL_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision: str = "75c9c17ba589"
+down_revision: Union[str, None] = "ce8dece058ab"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ("first_name", "last_name", "email")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in SEARCH_DDL_POSTGRESQL:
+            op.execute(statement)
+        # Databases built by create_all before migrations already have them
+        for name in SEARCH_COLUMNS:
+            op.create_index(
+                f"ix_contacts_{name}_trgm",
+                "contacts",
+                [name],
+                postgresql_using="gin",
+                postgresql_ops={name: "gin_trgm_ops"},
+                if_not_exists=True,
+            )
+    elif dialect == "sqlite":
+        # The statements are idempotent; the last one rebuilds the FTS table from
+        # the existing rows
+        for statement in SEARCH_DDL_SQLITE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for name in SEARCH_COLUMNS:
+            op.drop_index(f"ix_contacts_{name}_trgm", table_name="contacts")
+    elif dialect == "sqlite":
+        for trigger in ("contacts_fts_ai", "contacts_fts_ad", "contacts_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS contacts_fts")
@@ -0,0 +1,33 @@
+"""add per-owner composite indexes on contacts
+
+Revision ID: 7d83117fb612
+Revises: 75c9c17ba589
+Create Date: 2026-10-17 10:15:03.257190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d83117fb612"
+down_revision: Union[str, None] = "75c9c17ba589"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_contacts_owner_id_id": ["owner_id", "id"],
+    "ix_contacts_owner_id_last_name_first_name": ["owner_id", "last_name", "first_name"],
+    "ix_contacts_owner_id_email": ["owner_id", "email"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, "contacts", columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="contacts")
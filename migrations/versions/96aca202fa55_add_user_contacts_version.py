@@ -0,0 +1,30 @@
+"""add user contacts_version
+
+Revision ID: 96aca202fa55
+Revises: 7d83117fb612
+Create Date: 2026-10-17 14:32:18.604215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "96aca202fa55"
+down_revision: Union[str, None] = "7d83117fb612"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("contacts_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("contacts_version")
@@ -0,0 +1,31 @@
+"""drop user contacts_version
+
+Revision ID: b41e6d0c9a73
+Revises: 96aca202fa55
+Create Date: 2026-10-17 16:08:41.372904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b41e6d0c9a73"
+down_revision: Union[str, None] = "96aca202fa55"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The contacts version moved to Redis, see src/services/response_cache.py
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("contacts_version")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("contacts_version", sa.Integer(), nullable=False, server_default="0"),
+    )
@@ -0,0 +1,65 @@
+"""initial schema
+
+Revision ID: c22a4eb08f7f
+Revises:
+Create Date: 2026-10-17 10:02:11.418202
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c22a4eb08f7f"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("avatar", sa.String(), nullable=True),
+        sa.Column("crated_at", sa.DateTime(), nullable=True),
+        sa.Column("refresh_token", sa.String(length=255), nullable=True),
+        sa.Column("confirmed", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+    op.create_index(op.f("ix_users_id"), "users", ["id"], unique=False)
+    op.create_index(op.f("ix_users_username"), "users", ["username"], unique=True)
+    op.create_table(
+        "contacts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("first_name", sa.String(length=25), nullable=False),
+        sa.Column("last_name", sa.String(length=25), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("phone_number", sa.String(length=13), nullable=False),
+        sa.Column("birthday", sa.Date(), nullable=False),
+        sa.Column("additional_info", sa.String(), nullable=True),
+        sa.Column("owner_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_contacts_email"), "contacts", ["email"], unique=True)
+    op.create_index(op.f("ix_contacts_first_name"), "contacts", ["first_name"], unique=False)
+    op.create_index(op.f("ix_contacts_id"), "contacts", ["id"], unique=False)
+    op.create_index(op.f("ix_contacts_last_name"), "contacts", ["last_name"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_contacts_last_name"), table_name="contacts")
+    op.drop_index(op.f("ix_contacts_id"), table_name="contacts")
+    op.drop_index(op.f("ix_contacts_first_name"), table_name="contacts")
+    op.drop_index(op.f("ix_contacts_email"), table_name="contacts")
+    op.drop_table("contacts")
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.drop_index(op.f("ix_users_id"), table_name="users")
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_table("users")
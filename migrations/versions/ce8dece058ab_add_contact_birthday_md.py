@@ -0,0 +1,53 @@
+"""add contact birthday_md
+
+Revision ID: ce8dece058ab
+Revises: c22a4eb08f7f
+Create Date: 2026-10-17 10:06:45.102934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ce8dece058ab"
+down_revision: Union[str, None] = "c22a4eb08f7f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL = {
+    "postgresql": (
+        "UPDATE contacts SET birthday_md = "
+        "EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)"
+    ),
+    "sqlite": (
+        "UPDATE contacts SET birthday_md = "
+        "CAST(strftime('%m', birthday) AS INTEGER) * 100 "
+        "+ CAST(strftime('%d', birthday) AS INTEGER)"
+    ),
+}
+
+
+def upgrade() -> None:
+    # Databases built by create_all before migrations may already have the column
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("contacts")}
+    if "birthday_md" not in columns:
+        op.add_column("contacts", sa.Column("birthday_md", sa.SmallInteger(), nullable=True))
+        op.execute(BACKFILL[op.get_bind().dialect.name])
+        with op.batch_alter_table("contacts") as batch_op:
+            batch_op.alter_column("birthday_md", existing_type=sa.SmallInteger(), nullable=False)
+    op.create_index(
+        "ix_contacts_owner_id_birthday_md",
+        "contacts",
+        ["owner_id", "birthday_md"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_owner_id_birthday_md", table_name="contacts")
+    with op.batch_alter_table("contacts") as batch_op:
+        batch_op.drop_column("birthday_md")
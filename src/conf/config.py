@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from pydantic import EmailStr
 from dotenv import load_dotenv
@@ -7,6 +9,31 @@ load_dotenv()
 
 class Settings(BaseSettings):
     database_url: str
+    database_async_url: str | None = None
+    database_replica_url: str | None = None
+    database_replica_async_url: str | None = None
+    db_replica_sticky_seconds: float = 5.0
+    db_async: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    threadpool_size: int | None = None
+    user_cache_ttl: float = 60.0
+    user_cache_max_entries: int = 10000
+    token_cache_ttl: float = 900.0
+    token_cache_max_entries: int = 10000
+    stateless_access_tokens: bool = False
+    response_cache_ttl: float = 300.0
+    internal_stats_enabled: bool = False
+    internal_stats_networks: list[str] = ["127.0.0.0/8", "::1/128"]
+    rate_limit_trusted_proxies: list[str] = []
+    hash_workers: int | None = None
+    hash_max_queue: int = 64
+    password_hash_scheme: Literal["bcrypt", "argon2"] = "bcrypt"
+    password_hash_rounds: int | None = None
+    password_hash_target_ms: float = 250.0
     secret_key: str
     algorithm: str
     mail_username: str
@@ -14,6 +41,15 @@ class Settings(BaseSettings):
     mail_from: EmailStr
     mail_port: int
     mail_server: str
+    mail_ssl_tls: bool = True
+    mail_starttls: bool = False
+    mail_worker_enabled: bool = True
+    mail_pool_size: int = 2
+    mail_batch_size: int = 20
+    mail_max_attempts: int = 5
+    mail_retry_base: float = 30.0
+    mail_retry_max: float = 3600.0
+    mail_template_cache_dir: str | None = None
     redis_host: str
     redis_port: int
     cloudinary_name: str
@@ -1,18 +1,345 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from fastapi import Depends, Request
+from jose import JWTError, jwt
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from src.conf.config import settings
+from src.database.pool import engine_options
+from src.database.redis_db import get_redis
+
+T = TypeVar("T")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def make_async_url(url: str) -> str:
+    """
+    Converts a synchronous database URL into its asyncio driver equivalent.
+
+    Args:
+        url (str): Database URL using a synchronous driver (psycopg2, pysqlite).
+
+    Returns:
+        str: The same URL using asyncpg for Postgres or aiosqlite for SQLite.
+    """
+    sa_url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(sa_url.drivername, sa_url.drivername)
+    return sa_url.set(drivername=drivername).render_as_string(hide_password=False)
+
 
 DATABASE_URL = settings.database_url
+ASYNC_DATABASE_URL = settings.database_async_url or make_async_url(DATABASE_URL)
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# The async engine is only built when enabled so that asyncpg/aiosqlite stay
+# optional for deployments running the synchronous mode.
+async_engine = (
+    create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+    if settings.db_async
+    else None
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Optional read replica. Without one, reads share the primary engines.
+REPLICA_URL = settings.database_replica_url
+ASYNC_REPLICA_URL = settings.database_replica_async_url or (
+    make_async_url(REPLICA_URL) if REPLICA_URL else None
+)
+
+read_engine = (
+    create_engine(REPLICA_URL, **engine_options(REPLICA_URL)) if REPLICA_URL else engine
+)
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine, info={"replica": bool(REPLICA_URL)}
+)
+async_read_engine = (
+    create_async_engine(ASYNC_REPLICA_URL, **engine_options(ASYNC_REPLICA_URL, is_async=True))
+    if REPLICA_URL and settings.db_async
+    else async_engine
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine, autoflush=False, expire_on_commit=False,
+    info={"replica": bool(REPLICA_URL)},
+)
+
+
+def is_replica(db: Session | AsyncSession) -> bool:
+    """
+    Tells whether a session reads from the replica.
+
+    Data read from the replica may lag behind the primary, so it must not be
+    cached as the current state.
+
+    Args:
+        db (Session | AsyncSession): Database session.
+
+    Returns:
+        bool: True if the session is bound to the replica.
+    """
+    return db.info.get("replica", False)
+
+
+STICKY_KEY = "sticky:{}"
+
+
+class ReadYourWrites:
+    """
+    Remembers recent writers so that their reads stay on the primary for a short window.
+
+    Replicas lag behind the primary, so a client reading right after its own write
+    could miss it. The markers live in Redis with a TTL of ``window``, so they
+    hold whichever worker process serves the next request. When Redis cannot
+    be reached, reads go to the primary.
+
+    Attributes:
+        window (float): Number of seconds reads stay on the primary after a write.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+
+    async def mark(self, redis: Redis, key: str | None) -> None:
+        """
+        Pins reads for a key to the primary for the next ``window`` seconds.
+
+        Args:
+            redis (Redis): Redis client shared by the worker processes.
+            key (str | None): Key identifying the writer; ``None`` is ignored.
+        """
+        if key is None or self.window <= 0:
+            return
+        try:
+            await redis.set(STICKY_KEY.format(key), 1, px=max(1, int(self.window * 1000)))
+        except (RedisError, OSError):
+            # Reads fall back to the primary while Redis is unreachable
+            pass
+
+    async def is_sticky(self, redis: Redis, key: str | None) -> bool:
+        """
+        Checks whether reads for a key must still go to the primary.
+
+        Args:
+            redis (Redis): Redis client shared by the worker processes.
+            key (str | None): Key identifying the reader.
+
+        Returns:
+            bool: True if the key wrote within the last ``window`` seconds, or if Redis is unreachable.
+        """
+        if key is None or self.window <= 0:
+            return False
+        try:
+            return bool(await redis.exists(STICKY_KEY.format(key)))
+        except (RedisError, OSError):
+            return True
+
+
+read_your_writes = ReadYourWrites(settings.db_replica_sticky_seconds)
+
+
+def sticky_key(request: Request) -> str | None:
+    """
+    Extracts the key used for read-your-writes routing from a request.
+
+    The subject of the bearer token is read without verifying its signature: it
+    only selects an engine, authentication still happens in ``get_current_user``.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        str | None: Token subject, or None for anonymous or malformed requests.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_commit(session: Session) -> None:
+    session.info["committed"] = True
+
+
+async def get_sync_db(request: Request, redis: Redis = Depends(get_redis)):
+    """
+    Yields a synchronous database session.
 
-def get_db():
+    Commits made through the session pin the caller's reads to the primary, see
+    :class:`ReadYourWrites`. The session is closed in the threadpool, as closing
+    may roll back on the database.
+
+    Args:
+        request (Request): Incoming request.
+        redis (Redis): Redis client holding the read-your-writes markers.
+
+    Yields:
+        Session: Database session bound to the synchronous engine.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
+        if REPLICA_URL and db.info.get("committed"):
+            await read_your_writes.mark(redis, sticky_key(request))
+
+
+async def get_async_db(request: Request, redis: Redis = Depends(get_redis)):
+    """
+    Yields an asyncio database session.
+
+    Commits made through the session pin the caller's reads to the primary, see
+    :class:`ReadYourWrites`.
+
+    Args:
+        request (Request): Incoming request.
+        redis (Redis): Redis client holding the read-your-writes markers.
+
+    Yields:
+        AsyncSession: Database session bound to the async engine.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        finally:
+            if REPLICA_URL and db.info.get("committed"):
+                await read_your_writes.mark(redis, sticky_key(request))
+
+
+async def get_sync_read_db(request: Request, redis: Redis = Depends(get_redis)):
+    """
+    Yields a synchronous session for read-only work.
+
+    The session is bound to the replica unless the caller wrote recently.
+
+    Args:
+        request (Request): Incoming request.
+        redis (Redis): Redis client holding the read-your-writes markers.
+
+    Yields:
+        Session: Database session bound to the replica or the primary.
+    """
+    sticky = await read_your_writes.is_sticky(redis, sticky_key(request))
+    db = (SessionLocal if sticky else ReadSessionLocal)()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def get_async_read_db(request: Request, redis: Redis = Depends(get_redis)):
+    """
+    Yields an asyncio session for read-only work.
+
+    The session is bound to the replica unless the caller wrote recently.
+
+    Args:
+        request (Request): Incoming request.
+        redis (Redis): Redis client holding the read-your-writes markers.
+
+    Yields:
+        AsyncSession: Database session bound to the replica or the primary.
+    """
+    sticky = await read_your_writes.is_sticky(redis, sticky_key(request))
+    async with (AsyncSessionLocal if sticky else AsyncReadSessionLocal)() as db:
+        yield db
+
+
+async def get_read_sessionmaker(
+    request: Request, redis: Redis = Depends(get_redis)
+) -> sessionmaker | async_sessionmaker:
+    """
+    Returns a session factory for read-only work that outlives the dependencies.
+
+    Streaming responses are sent after dependency cleanup has run, so they open
+    their own session. Routing follows :func:`get_sync_read_db` and
+    :func:`get_async_read_db`.
+
+    Args:
+        request (Request): Incoming request.
+        redis (Redis): Redis client holding the read-your-writes markers.
+
+    Returns:
+        sessionmaker | async_sessionmaker: Factory bound to the replica or the primary.
+    """
+    sticky = await read_your_writes.is_sticky(redis, sticky_key(request))
+    if settings.db_async:
+        return AsyncSessionLocal if sticky else AsyncReadSessionLocal
+    return SessionLocal if sticky else ReadSessionLocal
+
+
+get_db = get_async_db if settings.db_async else get_sync_db
+
+# Without a replica reads reuse get_db, so a request resolving both dependencies
+# shares a single session.
+if REPLICA_URL:
+    get_read_db = get_async_read_db if settings.db_async else get_sync_read_db
+else:
+    get_read_db = get_db
+
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[Session | AsyncSession]:
+    """
+    Opens a primary session outside of a request, e.g. in a background task.
+
+    Background tasks run after the request's dependencies are closed, so they
+    cannot reuse the request's session.
+
+    Yields:
+        Session | AsyncSession: Session of the kind :data:`get_db` would provide.
+    """
+    if settings.db_async:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+async def run_sync(
+    db: Session | AsyncSession, fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """
+    Runs a repository function against either kind of session without blocking the event loop.
+
+    With an AsyncSession the function is executed through ``AsyncSession.run_sync``,
+    so its I/O goes through the asyncio driver. With a synchronous Session it is
+    executed in the AnyIO threadpool.
+
+    Args:
+        db (Session | AsyncSession): Database session.
+        fn (Callable): Function taking a synchronous Session as its first argument.
+        *args: Positional arguments passed to ``fn``.
+        **kwargs: Keyword arguments passed to ``fn``.
+
+    Returns:
+        The value returned by ``fn``.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
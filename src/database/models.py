@@ -7,11 +7,34 @@ from sqlalchemy import (
     func,
     ForeignKey,
     Boolean,
+    DDL,
+    Index,
+    SmallInteger,
+    event,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from datetime import date
 from src.database.db import Base
 
 
+def birthday_key(birthday: date) -> int:
+    """
+    Encodes the month and day of a date as a sortable integer, e.g. March 7 -> 307.
+
+    Args:
+        birthday (date): Date to encode; the year is ignored.
+
+    Returns:
+        int: ``month * 100 + day``.
+    """
+    return birthday.month * 100 + birthday.day
+
+
+def _birthday_md_default(context) -> int | None:
+    birthday = context.get_current_parameters().get("birthday")
+    return birthday_key(birthday) if birthday else None
+
+
 class User(Base):
     """
     Represents a user in the system.
@@ -52,6 +75,8 @@ class Contact(Base):
         phone_number (str): Phone number of the contact.
         birthday (date): Birthdate of the contact.
         additional_info (str): Additional information about the contact.
+        birthday_md (int): Month and day of the birthday as ``month * 100 + day``,
+            derived from ``birthday`` and indexed per owner for birthday lookups.
         owner_id (int): Unique identifier of the user to whom the contact belongs.
         owner (relationship): User to whom this contact belongs.
     """
@@ -64,5 +89,68 @@ class Contact(Base):
     phone_number = Column(String(13), nullable=False)
     birthday = Column(Date, nullable=False)
     additional_info = Column(String, nullable=True)
+    birthday_md = Column(SmallInteger, nullable=False, default=_birthday_md_default)
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="contacts")
+
+    __table_args__ = (
+        Index("ix_contacts_owner_id_id", "owner_id", "id"),
+        Index("ix_contacts_owner_id_last_name_first_name", "owner_id", "last_name", "first_name"),
+        Index("ix_contacts_owner_id_email", "owner_id", "email"),
+        Index("ix_contacts_owner_id_birthday_md", "owner_id", "birthday_md"),
+        *(
+            Index(
+                f"ix_contacts_{name}_trgm",
+                name,
+                postgresql_using="gin",
+                postgresql_ops={name: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for name in ("first_name", "last_name", "email")
+        ),
+    )
+
+    @validates("birthday")
+    def _sync_birthday_md(self, key, birthday):
+        self.birthday_md = birthday_key(birthday) if birthday else None
+        return birthday
+
+
+# Search indexes: pg_trgm GIN indexes on Postgres (declared above) and an external
+# content FTS5 table kept in sync by triggers on SQLite.
+SEARCH_DDL_POSTGRESQL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+
+SEARCH_DDL_SQLITE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        first_name, last_name, email,
+        content='contacts', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        INSERT INTO contacts_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END""",
+    "INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')",
+]
+
+for statement in SEARCH_DDL_POSTGRESQL:
+    event.listen(
+        Contact.__table__, "before_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SEARCH_DDL_SQLITE:
+    event.listen(
+        Contact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Contact.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,194 @@
+import threading
+import time
+
+import anyio.to_thread
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.conf.config import settings
+
+
+class CheckoutStats:
+    """
+    Thread-safe counters describing how long callers waited for a pooled connection.
+
+    Attributes:
+        checkouts (int): Number of successful checkouts.
+        timeouts (int): Number of checkouts that gave up after ``pool_timeout``.
+        wait_total (float): Total time spent waiting for checkouts, in seconds.
+        wait_max (float): Longest single checkout wait, in seconds.
+        wait_last (float): Most recent checkout wait, in seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+
+    def observe(self, waited: float, timed_out: bool = False) -> None:
+        """
+        Records a single checkout attempt.
+
+        Args:
+            waited (float): Time spent inside ``Pool.connect()``, in seconds.
+            timed_out (bool): Whether the attempt ended with a pool timeout.
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_last = waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters as a plain dictionary.
+
+        Returns:
+            dict: Checkout counters with wait times in milliseconds.
+        """
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": self.wait_total / attempts * 1000 if attempts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "wait_last_ms": self.wait_last * 1000,
+            }
+
+
+class InstrumentedPoolMixin:
+    """
+    Measures the time spent waiting in ``Pool.connect()`` for every checkout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.checkout_stats.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.checkout_stats.observe(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Builds the pool keyword arguments for ``create_engine``/``create_async_engine``.
+
+    In-memory SQLite databases keep SQLAlchemy's default pool, because every new
+    connection to them would open an empty database.
+
+    Args:
+        url (str): Database URL the engine is created for.
+        is_async (bool): Whether the options are for an asyncio engine.
+
+    Returns:
+        dict: Keyword arguments configuring the connection pool.
+    """
+    sa_url = make_url(url)
+    if sa_url.get_backend_name() == "sqlite" and sa_url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def pool_status(engine: Engine) -> dict:
+    """
+    Reports the current state of an engine's connection pool.
+
+    Args:
+        engine (Engine): Engine whose pool is inspected.
+
+    Returns:
+        dict: Pool size, connections in use, overflow and checkout wait statistics.
+    """
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            in_use=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    stats = getattr(pool, "checkout_stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
+
+
+def threadpool_size(default: int) -> int:
+    """
+    Returns the number of AnyIO worker threads.
+
+    A request keeps its session, and the session its connection, across
+    several ``run_sync`` hops, and every hop as well as closing the session
+    needs a worker thread. With about as many threads as connections, requests
+    holding a connection wait for a thread while the threads wait on pool
+    checkout for a connection, until checkout times out. Unless
+    ``threadpool_size`` is set, the default of the threadpool is kept and only
+    raised to twice the pool capacity for larger pools.
+
+    Args:
+        default (int): Current size of the threadpool, AnyIO's default of 40 at startup.
+
+    Returns:
+        int: Configured ``threadpool_size``, or the larger of ``default`` and twice the pool capacity.
+    """
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    return settings.threadpool_size or max(default, 2 * capacity)
+
+
+def configure_threadpool() -> None:
+    """
+    Applies :func:`threadpool_size` to AnyIO's default thread limiter.
+
+    Must be called from a running event loop, e.g. the application startup hook.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = threadpool_size(int(limiter.total_tokens))
+
+
+def threadpool_status() -> dict:
+    """
+    Reports how busy AnyIO's default threadpool is.
+
+    Must be called from a running event loop.
+
+    Returns:
+        dict: Thread limit, threads in use and tasks waiting for a thread.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {
+        "size": int(limiter.total_tokens),
+        "in_use": limiter.borrowed_tokens,
+        "waiting": limiter.statistics().tasks_waiting,
+    }
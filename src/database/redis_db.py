@@ -0,0 +1,21 @@
+import redis.asyncio as redis
+
+from src.conf.config import settings
+
+redis_client = redis.Redis(
+    host=settings.redis_host,
+    port=settings.redis_port,
+    db=0,
+    encoding="utf-8",
+    decode_responses=True,
+)
+
+
+def get_redis() -> redis.Redis:
+    """
+    Returns the shared Redis client.
+
+    Returns:
+        redis.Redis: Client with a connection pool shared by the whole process.
+    """
+    return redis_client
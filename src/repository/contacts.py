@@ -1,17 +1,52 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List
+from sqlalchemy import Select, case, column, delete, exists, func, insert, or_, select, table, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Iterator, List, Sequence, Tuple
+from sqlalchemy.engine import Row, RowMapping
 from src.database import models
-from src.schemas import ContactCreate, ContactUpdate, ContactResponse
-from datetime import datetime, timedelta
-from src.database.models import User
+from src.schemas import ContactCreate, ContactUpdate, ContactResponse, ContactSelection
+import calendar
+from datetime import date, datetime, timedelta
+from src.database.models import User, birthday_key
 from fastapi import HTTPException, status
 
 
+# Columns of ContactResponse, returned by writes and read paths, and written by the export
+CONTACT_COLUMNS = (
+    models.Contact.id,
+    models.Contact.first_name,
+    models.Contact.last_name,
+    models.Contact.email,
+    models.Contact.phone_number,
+    models.Contact.birthday,
+    models.Contact.additional_info,
+)
+
+
+def contact_columns(fields: Sequence[str] | None = None) -> tuple:
+    """
+    Selects the ``CONTACT_COLUMNS`` named in ``fields``.
+
+    Args:
+        fields (Sequence[str] | None): ContactResponse field names, or None for all of them.
+
+    Returns:
+        tuple: The columns in ``CONTACT_COLUMNS`` order; ``id`` is always included.
+    """
+    if fields is None:
+        return CONTACT_COLUMNS
+    return tuple(column for column in CONTACT_COLUMNS if column.key == "id" or column.key in fields)
+
+
 def create_contact(db: Session, contact: ContactCreate, user: User) -> ContactResponse:
     """
     Creates a new contact and adds it to the database.
 
+    The contact is written with a single ``INSERT ... ON CONFLICT DO NOTHING
+    RETURNING`` statement: the unique index on email detects duplicates and the
+    stored row comes back without another query.
+
     Args:
         db (Session): Database session.
         contact (ContactCreate): Schema for creating a new contact.
@@ -23,40 +58,130 @@ def create_contact(db: Session, contact: ContactCreate, user: User) -> ContactRe
     Raises:
         HTTPException: If a contact with the same email already exists.
     """
-    existing_contact = db.query(models.Contact).filter(
-        models.Contact.email == contact.email).first()
-    if existing_contact:
+    stmt = _insert(db).values(**contact.model_dump(), owner_id=user.id)
+    if hasattr(stmt, "on_conflict_do_nothing"):
+        stmt = stmt.on_conflict_do_nothing(index_elements=[models.Contact.email])
+    try:
+        row = db.execute(stmt.returning(*CONTACT_COLUMNS)).first()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        row = None
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A contact with this email already exists.",
         )
-    db_contact = models.Contact(**contact.dict(), owner_id=user.id)
-    db.add(db_contact)
+    return ContactResponse.model_validate(row._mapping)
+
+
+def _insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(models.Contact)
+    if dialect == "sqlite":
+        return sqlite.insert(models.Contact)
+    return insert(models.Contact)
+
+
+def insert_contact_batch(
+    db: Session, contacts: List[Tuple[int, ContactCreate]], user: User
+) -> List[Tuple[int, str]]:
+    """
+    Inserts a batch of validated contacts with a single multi-row statement.
+
+    Rows whose email already exists, in the database or earlier in the same batch,
+    are skipped by ``ON CONFLICT DO NOTHING`` and reported back. The batch is
+    committed on its own, so a long import keeps a small transaction.
+
+    Args:
+        db (Session): Database session.
+        contacts (List[Tuple[int, ContactCreate]]): Contacts keyed by their row number.
+        user (User): User to whom the contacts belong.
+
+    Returns:
+        List[Tuple[int, str]]: Row numbers and reasons of the rows that were not inserted.
+    """
+    rejected, rows, seen = [], [], set()
+    for number, contact in contacts:
+        if contact.email in seen:
+            rejected.append((number, "Duplicate email in the uploaded file."))
+            continue
+        seen.add(contact.email)
+        rows.append((number, {**contact.model_dump(), "owner_id": user.id}))
+    if not rows:
+        return rejected
+
+    stmt = _insert(db)
+    if hasattr(stmt, "on_conflict_do_nothing"):
+        stmt = stmt.on_conflict_do_nothing(index_elements=[models.Contact.email])
+    inserted = set(
+        db.execute(stmt.returning(models.Contact.email), [values for _, values in rows]).scalars()
+    )
     db.commit()
-    db.refresh(db_contact)
-    return db_contact
+    rejected.extend(
+        (number, "A contact with this email already exists.")
+        for number, values in rows
+        if values["email"] not in inserted
+    )
+    return rejected
 
 
-def get_contacts(db: Session, user: User, skip: int = 0, limit: int = 10) -> List[ContactResponse]:
+def get_contacts(
+    db: Session, user: User, skip: int = 0, limit: int = 10, after_id: int | None = None
+) -> List[ContactResponse]:
     """
-    Retrieves a list of a user's contacts with pagination.
+    Retrieves a page of a user's contacts ordered by ID.
+
+    Pages can be addressed either by offset (``skip``) or by keyset (``after_id``).
+    A keyset page starts right after the given ID, so its cost does not depend on
+    how deep into the address book it is.
 
     Args:
         db (Session): Database session.
         user (User): User whose contacts need to be retrieved.
         skip (int): Number of records to skip (for pagination).
         limit (int): Number of records to return.
+        after_id (int | None): Return only contacts with an ID greater than this one.
 
     Returns:
         List[ContactResponse]: List of contacts.
     """
-    return (
-        db.query(models.Contact)
-        .filter(models.Contact.owner_id == user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    return _page_query(db, user, skip, limit, after_id, models.Contact).all()
+
+
+def get_contact_rows(
+    db: Session,
+    user: User,
+    skip: int = 0,
+    limit: int = 10,
+    after_id: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> List[Row]:
+    """
+    Read-only variant of :func:`get_contacts` returning rows of ``CONTACT_COLUMNS``.
+
+    No ORM entities are built, so nothing enters the session's identity map.
+
+    Args:
+        db (Session): Database session.
+        user (User): User whose contacts need to be retrieved.
+        skip (int): Number of records to skip (for pagination).
+        limit (int): Number of records to return.
+        after_id (int | None): Return only contacts with an ID greater than this one.
+        fields (Sequence[str] | None): Only select these columns, see :func:`contact_columns`.
+
+    Returns:
+        List[Row]: Contact rows with ContactResponse fields as attributes.
+    """
+    return _page_query(db, user, skip, limit, after_id, *contact_columns(fields)).all()
+
+
+def _page_query(db: Session, user: User, skip: int, limit: int, after_id: int | None, *entities):
+    query = db.query(*entities).filter(models.Contact.owner_id == user.id)
+    if after_id is not None:
+        query = query.filter(models.Contact.id > after_id)
+    return query.order_by(models.Contact.id).offset(skip).limit(limit)
 
 
 def get_contact(db: Session, contact_id: int, user: User) -> ContactResponse:
@@ -74,11 +199,38 @@ def get_contact(db: Session, contact_id: int, user: User) -> ContactResponse:
     Raises:
         HTTPException: If the contact is not found.
     """
-    contact = (
-        db.query(models.Contact)
-        .filter(models.Contact.id == contact_id, models.Contact.owner_id == user.id)
-        .first()
+    return _first_or_404(_contact_query(db, contact_id, user, models.Contact))
+
+
+def get_contact_row(
+    db: Session, contact_id: int, user: User, fields: Sequence[str] | None = None
+) -> Row:
+    """
+    Read-only variant of :func:`get_contact` returning a row of ``CONTACT_COLUMNS``.
+
+    Args:
+        db (Session): Database session.
+        contact_id (int): Contact ID.
+        user (User): User whose contacts need to be checked.
+        fields (Sequence[str] | None): Only select these columns, see :func:`contact_columns`.
+
+    Returns:
+        Row: The contact row with ContactResponse fields as attributes.
+
+    Raises:
+        HTTPException: If the contact is not found.
+    """
+    return _first_or_404(_contact_query(db, contact_id, user, *contact_columns(fields)))
+
+
+def _contact_query(db: Session, contact_id: int, user: User, *entities):
+    return db.query(*entities).filter(
+        models.Contact.id == contact_id, models.Contact.owner_id == user.id
     )
+
+
+def _first_or_404(query):
+    contact = query.first()
     if not contact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -87,12 +239,40 @@ def get_contact(db: Session, contact_id: int, user: User) -> ContactResponse:
     return contact
 
 
+def _update_values(changes: ContactUpdate) -> dict:
+    values = changes.model_dump(exclude_unset=True)
+    for field, value in values.items():
+        if value is None and not models.Contact.__table__.c[field].nullable:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{field} cannot be null.",
+            )
+    if "birthday" in values:
+        # Column defaults only apply to inserts, so the derived key is set here
+        values["birthday_md"] = birthday_key(values["birthday"])
+    return values
+
+
+def _contact_missing(db: Session, contact_id: int) -> HTTPException:
+    # Only reached when a write matched nothing, to tell 403 from 404
+    if db.query(exists().where(models.Contact.id == contact_id)).scalar():
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to update this contact",
+        )
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found.")
+
+
 def update_contact(
     db: Session, contact_id: int, contact: ContactUpdate, user: User
 ) -> ContactResponse:
     """
     Updates a contact by ID if it belongs to the user.
 
+    Only the fields present in the request are changed. The update is a single
+    ``UPDATE ... RETURNING`` statement restricted to the user's contacts, and
+    the unique index on email detects conflicts.
+
     Args:
         db (Session): Database session.
         contact_id (int): Contact ID.
@@ -103,30 +283,39 @@ def update_contact(
         ContactResponse: The updated contact.
 
     Raises:
-        HTTPException: If the contact is not found.
+        HTTPException: If the contact is not found or belongs to another user, a
+            required field is set to null, or the new email is already used.
     """
-    db_contact = (
-        db.query(models.Contact)
-        .filter(models.Contact.id == contact_id, models.Contact.owner_id == user.id)
-        .first()
+    values = _update_values(contact)
+    if not values:
+        return get_contact(db, contact_id, user)
+    stmt = (
+        update(models.Contact)
+        .where(models.Contact.id == contact_id, models.Contact.owner_id == user.id)
+        .values(values)
+        .returning(*CONTACT_COLUMNS)
+        .execution_options(synchronize_session=False)
     )
-    if not db_contact:
+    try:
+        row = db.execute(stmt).first()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Contact not found.",
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A contact with this email already exists.",
         )
-    for var, value in vars(contact).items():
-        setattr(db_contact, var, value) if value else None
-    db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
-    return db_contact
+    if row is None:
+        raise _contact_missing(db, contact_id)
+    return ContactResponse.model_validate(row._mapping)
 
 
 def delete_contact(db: Session, contact_id: int, user: User) -> None:
     """
     Deletes a contact by ID if it belongs to the user.
 
+    The contact is removed with a single ``DELETE ... RETURNING`` statement.
+
     Args:
         db (Session): Database session.
         contact_id (int): Contact ID.
@@ -135,68 +324,333 @@ def delete_contact(db: Session, contact_id: int, user: User) -> None:
     Raises:
         HTTPException: If the contact is not found.
     """
-    db_contact = (
-        db.query(models.Contact)
-        .filter(models.Contact.id == contact_id, models.Contact.owner_id == user.id)
-        .first()
+    stmt = (
+        delete(models.Contact)
+        .where(models.Contact.id == contact_id, models.Contact.owner_id == user.id)
+        .returning(models.Contact.id)
+        .execution_options(synchronize_session=False)
     )
-    if not db_contact:
+    deleted = db.execute(stmt).first()
+    db.commit()
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Contact not found.",
         )
-    db.delete(db_contact)
+
+
+FILTER_FIELDS = ("first_name", "last_name", "email", "phone_number")
+
+
+def _selection_criteria(selection: ContactSelection, user: User) -> list:
+    criteria = [models.Contact.owner_id == user.id]
+    if selection.ids is not None:
+        criteria.append(models.Contact.id.in_(selection.ids))
+    contact_filter = selection.filter
+    if contact_filter is not None:
+        for field in FILTER_FIELDS:
+            value = getattr(contact_filter, field)
+            if value is not None:
+                criteria.append(getattr(models.Contact, field) == value)
+        if contact_filter.birthday_from is not None:
+            criteria.append(models.Contact.birthday >= contact_filter.birthday_from)
+        if contact_filter.birthday_to is not None:
+            criteria.append(models.Contact.birthday <= contact_filter.birthday_to)
+    return criteria
+
+
+def bulk_update_contacts(
+    db: Session, selection: ContactSelection, changes: ContactUpdate, user: User
+) -> List[int]:
+    """
+    Updates all selected contacts of a user with a single UPDATE statement.
+
+    Contacts of other users are never matched, whatever IDs are passed. No ORM
+    objects are loaded: the statement returns the IDs of the updated rows.
+
+    Args:
+        db (Session): Database session.
+        selection (ContactSelection): IDs and/or filter selecting the contacts.
+        changes (ContactUpdate): Fields to set; only fields present in the request are applied.
+        user (User): User to whom the contacts belong.
+
+    Returns:
+        List[int]: IDs of the updated contacts in ascending order.
+
+    Raises:
+        HTTPException: If a required field is set to null or the new email is already used.
+    """
+    values = _update_values(changes)
+    stmt = (
+        update(models.Contact)
+        .where(*_selection_criteria(selection, user))
+        .values(values)
+        .returning(models.Contact.id)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        ids = db.execute(stmt).scalars().all()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A contact with this email already exists.",
+        )
+    return sorted(ids)
+
+
+def bulk_delete_contacts(db: Session, selection: ContactSelection, user: User) -> List[int]:
+    """
+    Deletes all selected contacts of a user with a single DELETE statement.
+
+    Contacts of other users are never matched, whatever IDs are passed. No ORM
+    objects are loaded: the statement returns the IDs of the deleted rows.
+
+    Args:
+        db (Session): Database session.
+        selection (ContactSelection): IDs and/or filter selecting the contacts.
+        user (User): User whose contacts need to be deleted.
+
+    Returns:
+        List[int]: IDs of the deleted contacts in ascending order.
+    """
+    stmt = (
+        delete(models.Contact)
+        .where(*_selection_criteria(selection, user))
+        .returning(models.Contact.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = db.execute(stmt).scalars().all()
     db.commit()
+    return sorted(ids)
 
 
-def search_contacts(db: Session, query: str, user: User) -> List[ContactResponse]:
+def export_query(user_id: int, batch_size: int = 1000) -> Select:
     """
-    Searches for a user's contacts based on a query.
+    Builds the statement streaming all of a user's contacts for an export.
+
+    Plain columns are selected, so no ORM objects are built or kept in the
+    identity map, and ``yield_per`` makes the driver use a server-side cursor
+    fetching ``batch_size`` rows at a time.
+
+    Args:
+        user_id (int): ID of the user whose contacts are exported.
+        batch_size (int): Number of rows fetched per round trip.
+
+    Returns:
+        Select: Statement ordered by contact ID.
+    """
+    return (
+        select(*CONTACT_COLUMNS)
+        .where(models.Contact.owner_id == user_id)
+        .order_by(models.Contact.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+def iter_contact_batches(
+    db: Session, user_id: int, batch_size: int = 1000
+) -> Iterator[Sequence[RowMapping]]:
+    """
+    Streams a user's contacts in batches through a server-side cursor.
+
+    Args:
+        db (Session): Database session.
+        user_id (int): ID of the user whose contacts are exported.
+        batch_size (int): Number of rows per batch.
+
+    Yields:
+        Sequence[RowMapping]: Up to ``batch_size`` rows keyed by the :data:`CONTACT_COLUMNS` names.
+    """
+    result = db.execute(export_query(user_id, batch_size))
+    try:
+        yield from result.mappings().partitions()
+    finally:
+        result.close()
+
+
+# SQLite FTS5 shadow table maintained by triggers, see models.SEARCH_DDL_SQLITE
+contacts_fts = table("contacts_fts", column("rowid"), column("rank"))
+
+# Trigram indexes can only serve queries of at least three characters
+TRIGRAM_MIN_LENGTH = 3
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _fts_phrase(query: str) -> str:
+    return '"' + query.replace('"', '""') + '"'
+
+
+def search_contacts(
+    db: Session, query: str, user: User, skip: int = 0, limit: int = 20
+) -> List[ContactResponse]:
+    """
+    Searches for a user's contacts by a substring of their first name, last name or email.
+
+    The search is served by an index: the FTS5 trigram table on SQLite and the
+    pg_trgm GIN indexes on Postgres. Results are ranked by relevance (bm25 on
+    SQLite, trigram similarity on Postgres). Queries shorter than three characters
+    cannot use trigram indexes and fall back to scanning the user's contacts.
 
     Args:
         db (Session): Database session.
         query (str): Search query.
         user (User): User whose contacts need to be searched.
+        skip (int): Number of results to skip (for pagination).
+        limit (int): Maximum number of results to return.
 
     Returns:
-        List[ContactResponse]: List of found contacts.
+        List[ContactResponse]: List of found contacts, most relevant first.
     """
-    return (
-        db.query(models.Contact)
-        .filter(
-            models.Contact.owner_id == user.id,
+    return _search_query(db, query, user, skip, limit, models.Contact).all()
+
+
+def search_contact_rows(
+    db: Session,
+    query: str,
+    user: User,
+    skip: int = 0,
+    limit: int = 20,
+    fields: Sequence[str] | None = None,
+) -> List[Row]:
+    """
+    Read-only variant of :func:`search_contacts` returning rows of ``CONTACT_COLUMNS``.
+
+    Args:
+        db (Session): Database session.
+        query (str): Search query.
+        user (User): User whose contacts need to be searched.
+        skip (int): Number of results to skip (for pagination).
+        limit (int): Maximum number of results to return.
+        fields (Sequence[str] | None): Only select these columns, see :func:`contact_columns`.
+
+    Returns:
+        List[Row]: Found contact rows, most relevant first.
+    """
+    return _search_query(db, query, user, skip, limit, *contact_columns(fields)).all()
+
+
+def _search_query(db: Session, query: str, user: User, skip: int, limit: int, *entities):
+    contacts = db.query(*entities).filter(models.Contact.owner_id == user.id)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite" and len(query) >= TRIGRAM_MIN_LENGTH:
+        contacts = (
+            contacts.join(contacts_fts, contacts_fts.c.rowid == models.Contact.id)
+            .filter(text("contacts_fts MATCH :phrase").bindparams(phrase=_fts_phrase(query)))
+            .order_by(contacts_fts.c.rank, models.Contact.id)
+        )
+    else:
+        pattern = _like_pattern(query)
+        contacts = contacts.filter(
             or_(
-                models.Contact.first_name.ilike(f"%{query}%"),
-                models.Contact.last_name.ilike(f"%{query}%"),
-                models.Contact.email.ilike(f"%{query}%"),
-            ),
+                models.Contact.first_name.ilike(pattern, escape="\\"),
+                models.Contact.last_name.ilike(pattern, escape="\\"),
+                models.Contact.email.ilike(pattern, escape="\\"),
+            )
         )
-        .all()
-    )
+        if dialect == "postgresql":
+            similarity = func.greatest(
+                func.similarity(models.Contact.first_name, query),
+                func.similarity(models.Contact.last_name, query),
+                func.similarity(models.Contact.email, query),
+            )
+            contacts = contacts.order_by(similarity.desc(), models.Contact.id)
+        else:
+            contacts = contacts.order_by(models.Contact.id)
+
+    return contacts.offset(skip).limit(limit)
+
 
+def birthday_windows(today: date, days: int) -> List[Tuple[int, int]]:
+    """
+    Converts a window of days into inclusive ranges of ``birthday_md`` keys.
+
+    A window crossing New Year is split into two ranges. In a non-leap year
+    contacts born on February 29 celebrate on February 28, so a window ending on
+    February 28 is extended to include them.
+
+    Args:
+        today (date): First day of the window.
+        days (int): Length of the window in days, today included.
 
-def get_contacts_with_upcoming_birthdays(db: Session, user: User) -> List[ContactResponse]:
+    Returns:
+        List[Tuple[int, int]]: One or two ``(first, last)`` key ranges.
     """
-    Retrieves contacts with upcoming birthdays in the current month.
+    # Any 366 consecutive days hold every month and day; 365 may miss one
+    if days >= 366:
+        return [(101, 1231)]
+    last_day = today + timedelta(days=days - 1)
+    first, last = birthday_key(today), birthday_key(last_day)
+    if last == 228 and not calendar.isleap(last_day.year):
+        last = 229
+    if last_day.year == today.year:
+        return [(first, last)]
+    return [(first, 1231), (101, last)]
+
+
+def get_contacts_with_upcoming_birthdays(
+    db: Session, user: User, days: int = 7, today: date | None = None
+) -> List[ContactResponse]:
+    """
+    Retrieves contacts whose birthday falls within the next ``days`` days.
+
+    The lookup is a range scan over the ``(owner_id, birthday_md)`` index.
+    Contacts are ordered by how soon their birthday comes.
 
     Args:
         db (Session): Database session.
         user (User): User whose contacts need to be checked.
+        days (int): Length of the window in days, today included.
+        today (date | None): First day of the window. Defaults to the current UTC date.
 
     Returns:
         List[ContactResponse]: List of contacts with upcoming birthdays.
     """
-    today = datetime.utcnow().date()
-    next_month = today.replace(day=1) + timedelta(days=31)
-    next_month = next_month.replace(day=1)
+    return _birthdays_query(db, user, days, today, models.Contact).all()
+
+
+def get_upcoming_birthday_rows(
+    db: Session,
+    user: User,
+    days: int = 7,
+    today: date | None = None,
+    fields: Sequence[str] | None = None,
+) -> List[Row]:
+    """
+    Read-only variant of :func:`get_contacts_with_upcoming_birthdays` returning rows of ``CONTACT_COLUMNS``.
+
+    Args:
+        db (Session): Database session.
+        user (User): User whose contacts need to be checked.
+        days (int): Length of the window in days, today included.
+        today (date | None): First day of the window. Defaults to the current UTC date.
+        fields (Sequence[str] | None): Only select these columns, see :func:`contact_columns`.
+
+    Returns:
+        List[Row]: Contact rows with upcoming birthdays, soonest first.
+    """
+    return _birthdays_query(db, user, days, today, *contact_columns(fields)).all()
+
+
+def _birthdays_query(db: Session, user: User, days: int, today: date | None, *entities):
+    today = today or datetime.utcnow().date()
+    windows = birthday_windows(today, days)
+    start = windows[0][0]
     return (
-        db.query(models.Contact)
+        db.query(*entities)
         .filter(
             models.Contact.owner_id == user.id,
-            models.Contact.birthday.between(
-                today.replace(year=today.year),
-                next_month.replace(year=today.year)
-            ),
+            or_(*(models.Contact.birthday_md.between(first, last) for first, last in windows)),
+        )
+        .order_by(
+            case((models.Contact.birthday_md >= start, 0), else_=1),
+            models.Contact.birthday_md,
+            models.Contact.id,
         )
-        .all()
     )
@@ -1,79 +1,151 @@
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from src.database.db import run_sync
 from src.database.models import User
 from src.schemas import UserModel
+from src.services.cache import user_cache
 
 
-async def get_user_by_email(email: str, db: Session) -> User:
+def _get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _create_user(db: Session, body: UserModel) -> User:
+    new_user = User(**body.dict())
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+
+def _update_token(db: Session, user: User, token: str | None) -> None:
+    user.refresh_token = token
+    db.commit()
+
+
+def _confirmed_email(db: Session, email: str) -> None:
+    user = _get_user_by_email(db, email)
+    user.confirmed = True
+    db.commit()
+
+
+def _update_password(db: Session, email: str, old_hash: str, new_hash: str) -> bool:
+    result = db.execute(
+        update(User)
+        .where(User.email == email, User.password == old_hash)
+        .values(password=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _update_avatar(db: Session, email: str, url: str) -> User:
+    user = _get_user_by_email(db, email)
+    user.avatar = url
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+async def get_user_by_email(email: str, db: Session | AsyncSession) -> User:
     """
     Retrieves a user by their email address.
 
     Args:
         email (str): Email address of the user.
-        db (Session): Database session.
+        db (Session | AsyncSession): Database session.
 
     Returns:
         User: The found user, if it exists.
     """
-    return db.query(User).filter(User.email == email).first()
+    return await run_sync(db, _get_user_by_email, email)
 
 
-async def create_user(body: UserModel, db: Session) -> User:
+async def create_user(body: UserModel, db: Session | AsyncSession) -> User:
     """
     Creates a new user and adds them to the database.
 
+    The email is evicted from the user cache, see :data:`src.services.cache.user_cache`.
+
     Args:
         body (UserModel): Schema for creating a new user.
-        db (Session): Database session.
+        db (Session | AsyncSession): Database session.
 
     Returns:
         User: The created user.
     """
-    new_user = User(**body.dict())
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await run_sync(db, _create_user, body)
+    user_cache.invalidate(body.email)
     return new_user
 
 
-async def update_token(user: User, token: str | None, db: Session) -> None:
+async def update_token(user: User, token: str | None, db: Session | AsyncSession) -> None:
     """
     Updates the user's token.
 
+    The user is evicted from the user cache.
+
     Args:
         user (User): The user whose token needs to be updated.
         token (str | None): The new token or None to remove the token.
-        db (Session): Database session.
+        db (Session | AsyncSession): Database session.
     """
-    user.refresh_token = token
-    db.commit()
+    await run_sync(db, _update_token, user, token)
+    user_cache.invalidate(user.email)
 
 
-async def confirmed_email(email: str, db: Session) -> None:
+async def confirmed_email(email: str, db: Session | AsyncSession) -> None:
     """
     Confirms the user's email address.
 
+    The user is evicted from the user cache.
+
     Args:
         email (str): Email address of the user.
-        db (Session): Database session.
+        db (Session | AsyncSession): Database session.
     """
-    user = await get_user_by_email(email, db)
-    user.confirmed = True
-    db.commit()
+    await run_sync(db, _confirmed_email, email)
+    user_cache.invalidate(email)
 
 
-async def update_avatar(email: str, url: str, db: Session) -> User:
+async def update_avatar(email: str, url: str, db: Session | AsyncSession) -> User:
     """
     Updates the user's avatar URL.
 
+    The user is evicted from the user cache.
+
     Args:
         email (str): Email address of the user.
         url (str): New avatar URL.
-        db (Session): Database session.
+        db (Session | AsyncSession): Database session.
 
     Returns:
         User: The user with the updated avatar URL.
     """
-    user = await get_user_by_email(email, db)
-    user.avatar = url
-    db.commit()
+    user = await run_sync(db, _update_avatar, email, url)
+    user_cache.invalidate(email)
     return user
+
+
+async def update_password(
+    email: str, old_hash: str, new_hash: str, db: Session | AsyncSession
+) -> bool:
+    """
+    Replaces a user's password hash if it has not changed in the meantime.
+
+    The user is evicted from the user cache.
+
+    Args:
+        email (str): Email address of the user.
+        old_hash (str): Hash the new one replaces.
+        new_hash (str): New password hash.
+        db (Session | AsyncSession): Database session.
+
+    Returns:
+        bool: True if the hash was replaced, False if the stored hash was not ``old_hash``.
+    """
+    updated = await run_sync(db, _update_password, email, old_hash, new_hash)
+    user_cache.invalidate(email)
+    return updated
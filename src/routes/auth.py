@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import List
 from fastapi import (
     APIRouter,
@@ -13,39 +14,52 @@ from fastapi.security import (
     HTTPAuthorizationCredentials,
     HTTPBearer,
 )
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
 from src.database.db import get_db
+from src.database.redis_db import get_redis
 from src.schemas import UserModel, UserResponse, TokenModel, RequestEmail
 from src.repository import users as repository_users
-from src.services.auth import auth_service
+from src.services.auth import Principal, auth_service
 from src.services.email import send_email
+from src.services import refresh_tokens, token_versions
+from src.services.refresh_tokens import REFRESH_TOKEN_TTL, RefreshTokenRejected
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
 
 
+def _families_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Refresh token store is unavailable, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
 async def signup(
     body: UserModel,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """
     Registers a new user.
 
     Checks if a user with the given email exists. If not, creates a new user, 
-    hashes their password, and sends a confirmation email.
+    hashes their password, and queues a confirmation email.
 
     Args:
         body (UserModel): Data for creating a new user.
-        background_tasks (BackgroundTasks): Background task for sending email.
         request (Request): Request for obtaining the base URL.
         db (Session): Database session.
+        redis (Redis): Redis client holding the mail queue.
 
     Returns:
         dict: Response with the new user data and a confirmation message.
@@ -58,11 +72,9 @@ async def signup(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Account already exists"
         )
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await repository_users.create_user(body, db)
-    background_tasks.add_task(
-        send_email, new_user.email, new_user.username, request.base_url
-    )
+    await send_email(new_user.email, new_user.username, str(request.base_url), redis)
     return {
         "user": new_user,
         "detail": "User successfully created. Check your email for confirmation.",
@@ -71,22 +83,31 @@ async def signup(
 
 @router.post("/login", response_model=TokenModel)
 async def login(
-    body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    body: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """
     Logs in a user.
 
     Checks user credentials, validates their password, and returns access and refresh tokens.
+    A password hash made with an outdated scheme or cost is replaced in the background.
+    Every login starts its own refresh token family in Redis. In stateless mode the
+    tokens also carry the claims described in :meth:`Auth.token_claims`.
 
     Args:
+        background_tasks (BackgroundTasks): Background task for rehashing the password.
         body (OAuth2PasswordRequestForm): Form for login with email and password.
         db (Session): Database session.
+        redis (Redis): Redis client holding refresh token families.
 
     Returns:
         dict: Response with access and refresh tokens.
 
     Raises:
-        HTTPException: If the email is not confirmed or the password is incorrect.
+        HTTPException: If the email is not confirmed or the password is incorrect,
+            or 503 if the refresh token family cannot be stored.
     """
     user = await repository_users.get_user_by_email(body.username, db)
     if user is None:
@@ -97,14 +118,24 @@ async def login(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed"
         )
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.verify_password(body.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
+    if auth_service.needs_rehash(user.password):
+        background_tasks.add_task(
+            auth_service.rehash_password, user.email, body.password, user.password
+        )
 
-    access_token = await auth_service.create_access_token(data={"sub": user.email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
-    await repository_users.update_token(user, refresh_token, db)
+    claims = await auth_service.token_claims(user, redis)
+    try:
+        family = await refresh_tokens.start_family(redis)
+    except (RedisError, OSError):
+        raise _families_unavailable()
+    access_token = await auth_service.create_access_token(data=claims)
+    refresh_token = await auth_service.create_refresh_token(
+        data={**claims, **family}, expires_delta=REFRESH_TOKEN_TTL
+    )
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -112,38 +143,79 @@ async def login(
     }
 
 
+async def _exchange_legacy_token(
+    token: str, claims: dict, db: Session, redis: Redis
+) -> dict:
+    """
+    Exchanges a refresh token issued before token families for a new family.
+
+    The token is accepted once, and only if it is still the one stored for the user.
+
+    Args:
+        token (str): The legacy refresh token.
+        claims (dict): Its decoded claims.
+        db (Session): Database session.
+        redis (Redis): Redis client holding refresh token families.
+
+    Returns:
+        dict: ``fid`` and ``jti`` claims of the new family.
+
+    Raises:
+        RefreshTokenRejected: If the token is not the stored one or was already exchanged.
+    """
+    user = await repository_users.get_user_by_email(claims["sub"], db)
+    if user is None or user.refresh_token != token:
+        raise RefreshTokenRejected(claims["sub"])
+    remaining = int(claims["exp"] - datetime.now(timezone.utc).timestamp()) + 1
+    if not await refresh_tokens.consume_legacy_token(redis, token, ttl=max(remaining, 1)):
+        raise RefreshTokenRejected(claims["sub"])
+    return await refresh_tokens.start_family(redis)
+
+
 @router.get("/refresh_token", response_model=TokenModel)
 async def refresh_token(
     credentials: HTTPAuthorizationCredentials = Security(security),
     db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """
     Refreshes access and refresh tokens.
 
     Checks the validity of the provided refresh token and returns new access and refresh tokens.
+    The token is rotated within its family in Redis; presenting a token that was already
+    rotated revokes the whole family.
 
     Args:
         credentials (HTTPAuthorizationCredentials): Authorization data (token).
-        db (Session): Database session.
+        db (Session): Database session, only read for tokens issued before token families.
+        redis (Redis): Redis client holding refresh token families.
 
     Returns:
         dict: Response with new access and refresh tokens.
 
     Raises:
-        HTTPException: If the refresh token is invalid.
+        HTTPException: If the refresh token is invalid, revoked or reused, or its token version is outdated,
+            or 503 if its family cannot be read from Redis.
     """
     token = credentials.credentials
-    email = await auth_service.decode_refresh_token(token)
-    user = await repository_users.get_user_by_email(email, db)
-    if user.refresh_token != token:
-        await repository_users.update_token(user, None, db)
+    claims = await auth_service.decode_refresh_token_claims(token)
+    new_claims = await auth_service.refreshed_claims(claims, redis)
+    try:
+        if "fid" in claims:
+            family = await refresh_tokens.rotate(redis, claims["fid"], claims["jti"])
+        else:
+            family = await _exchange_legacy_token(token, claims, db, redis)
+    except RefreshTokenRejected:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
+    except (RedisError, OSError):
+        raise _families_unavailable()
 
-    access_token = await auth_service.create_access_token(data={"sub": email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": email})
-    await repository_users.update_token(user, refresh_token, db)
+    access_token = await auth_service.create_access_token(data=new_claims)
+    refresh_token = await auth_service.create_refresh_token(
+        data={**new_claims, **family}, expires_delta=REFRESH_TOKEN_TTL
+    )
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -151,6 +223,28 @@ async def refresh_token(
     }
 
 
+@router.post("/revoke_tokens")
+async def revoke_tokens(
+    principal: Principal = Depends(auth_service.get_current_principal),
+    redis: Redis = Depends(get_redis),
+):
+    """
+    Revokes all stateless tokens of the current user.
+
+    Bumps the user's token version, so access and refresh tokens carrying an older
+    version are rejected everywhere. The user has to log in again.
+
+    Args:
+        principal (Principal): The currently authenticated user.
+        redis (Redis): Redis client holding token versions.
+
+    Returns:
+        dict: Message about the revocation.
+    """
+    await token_versions.bump_version(redis, principal.id)
+    return {"message": "Tokens revoked"}
+
+
 @router.get("/confirmed_email/{token}")
 async def confirmed_email(token: str, db: Session = Depends(get_db)):
     """
@@ -183,20 +277,20 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
 @router.post("/request_email")
 async def request_email(
     body: RequestEmail,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """
     Requests a resend of the confirmation email.
 
-    Sends a confirmation email to the provided email address if it has not been confirmed yet.
+    Queues a confirmation email to the provided email address if it has not been confirmed yet.
 
     Args:
         body (RequestEmail): Schema with the email for resending.
-        background_tasks (BackgroundTasks): Background task for sending email.
         request (Request): Request for obtaining the base URL.
         db (Session): Database session.
+        redis (Redis): Redis client holding the mail queue.
 
     Returns:
         dict: Message about the email check.
@@ -209,7 +303,5 @@ async def request_email(
     if user.confirmed:
         return {"message": "Your email is already confirmed"}
     if user:
-        background_tasks.add_task(
-            send_email, user.email, user.username, request.base_url
-        )
+        await send_email(user.email, user.username, str(request.base_url), redis)
     return {"message": "Check your email for confirmation."}
@@ -1,18 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from typing import List
-
-from src.database import db
-from src.database.db import get_db
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Literal
+
+from src.database.db import get_db, get_read_db, get_read_sessionmaker, is_replica, run_sync
+from src.database.redis_db import get_redis
 from src.repository import contacts
-from src.schemas import ContactCreate, ContactUpdate, ContactResponse
-from src.database.models import User, Contact
-from src.services.auth import auth_service
-from fastapi_limiter.depends import RateLimiter
+from src.schemas import (
+    ContactBulkResult,
+    ContactBulkUpdate,
+    ContactCreate,
+    ContactImportResult,
+    ContactResponse,
+    ContactSelection,
+    ContactUpdate,
+    ImportRowError,
+)
+from src.services.auth import Principal, auth_service
+from src.services.contacts_io import (
+    EXPORT_EXTENSIONS,
+    EXPORT_MEDIA_TYPES,
+    ImportFormatError,
+    detect_format,
+    export_header,
+    format_contacts,
+    iter_records,
+    next_batch,
+)
+from src.services.pagination import decode_cursor, encode_cursor
+from src.services.rate_limit import RateLimiter
+from src.services.response_cache import cached_json, invalidating
+from src.services.serialization import CONTACT_FIELDS, contact_json, contact_list_json, parse_fields
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+EXPORT_BATCH_SIZE = 1000
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated ContactResponse fields to return, e.g. first_name,phone_number; "
+    "id is always included"
+)
+
+
+def _fields_param(fields: tuple[str, ...]) -> str | None:
+    # Cache key part; the default of all fields is left out
+    return None if fields == CONTACT_FIELDS else ",".join(fields)
+
 
 @router.post(
     "/",
@@ -21,10 +60,11 @@ router = APIRouter(prefix="/contacts", tags=["contacts"])
     description="No more than 10 requests per minute",
     dependencies=[Depends(RateLimiter(times=10, seconds=60))],
 )
-def create_contact(
+async def create_contact(
     contact: ContactCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Creates a new contact.
@@ -34,7 +74,8 @@ def create_contact(
     Args:
         contact (ContactCreate): Data for creating a new contact.
         db (Session): Database session.
-        current_user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         ContactResponse: The created contact.
@@ -42,7 +83,8 @@ def create_contact(
     Raises:
         HTTPException: If the contact creation fails.
     """
-    return contacts.create_contact(db=db, contact=contact, user=current_user)
+    async with invalidating(redis, current_user.id):
+        return await run_sync(db, contacts.create_contact, contact=contact, user=current_user)
 
 
 @router.get(
@@ -51,28 +93,62 @@ def create_contact(
     description="No more than 10 requests per minute",
     dependencies=[Depends(RateLimiter(times=10, seconds=60))],
 )
-def read_contacts(
+async def read_contacts(
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    cursor: str | None = Query(
+        None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None, description="ETag of a copy the client already has"),
+    db: Session = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Retrieves contacts for the currently authenticated user.
 
+    Contacts are ordered by ID. When a page is full, the ``X-Next-Cursor`` response
+    header holds the cursor for the next page; passing it back as ``cursor``
+    switches to keyset pagination and ``skip`` is ignored. Serialized pages are
+    cached in Redis until the user's contacts change, and carry an ETag derived
+    from the same change version: a matching ``If-None-Match`` gets a 304.
+
     Args:
         skip (int): Number of contacts to skip for pagination.
         limit (int): Number of contacts to return.
+        cursor (str | None): Cursor of the page to return.
+        fields (str | None): Comma-separated fields to return, all of them by default.
+        if_none_match (str | None): ETag of a copy the client already has.
         db (Session): Database session.
-        current_user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         List[ContactResponse]: List of contacts.
 
     Raises:
-        HTTPException: If there is an issue retrieving the contacts.
+        HTTPException: If the cursor is invalid or there is an issue retrieving the contacts.
     """
-    return contacts.get_contacts(db=db, skip=skip, limit=limit, user=current_user)
+    selected = parse_fields(fields)
+    after_id = None
+    if cursor is not None:
+        after_id = decode_cursor(cursor)
+        skip = 0
+
+    async def produce():
+        page = await run_sync(
+            db, contacts.get_contact_rows, skip=skip, limit=limit, after_id=after_id,
+            fields=selected, user=current_user
+        )
+        headers = {}
+        if limit > 0 and len(page) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(page[-1].id)
+        return contact_list_json(page, selected), headers
+
+    params = {"skip": skip, "limit": limit, "after_id": after_id, "fields": _fields_param(selected)}
+    return await cached_json(
+        redis, current_user.id, "contacts", params, produce, if_none_match, store=not is_replica(db)
+    )
 
 
 @router.get(
@@ -81,18 +157,27 @@ def read_contacts(
     description="No more than 10 requests per minute",
     dependencies=[Depends(RateLimiter(times=10, seconds=60))],
 )
-def read_contact(
+async def read_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None, description="ETag of a copy the client already has"),
+    db: Session = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Retrieves a specific contact by ID.
 
+    The serialized contact is cached in Redis until the user's contacts change.
+    A matching ``If-None-Match`` gets a 304.
+
     Args:
         contact_id (int): ID of the contact to retrieve.
+        fields (str | None): Comma-separated fields to return, all of them by default.
+        if_none_match (str | None): ETag of a copy the client already has.
         db (Session): Database session.
-        current_user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         ContactResponse: The requested contact.
@@ -100,11 +185,19 @@ def read_contact(
     Raises:
         HTTPException: If the contact is not found or access is forbidden.
     """
-    db_contact = contacts.get_contact(
-        db=db, contact_id=contact_id, user=current_user)
-    if db_contact is None:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    return db_contact
+    selected = parse_fields(fields)
+
+    async def produce():
+        db_contact = await run_sync(
+            db, contacts.get_contact_row, contact_id=contact_id, fields=selected, user=current_user)
+        if db_contact is None:
+            raise HTTPException(status_code=404, detail="Contact not found")
+        return contact_json(db_contact, selected), {}
+
+    params = {"id": contact_id, "fields": _fields_param(selected)}
+    return await cached_json(
+        redis, current_user.id, "contact", params, produce, if_none_match, store=not is_replica(db)
+    )
 
 
 @router.put(
@@ -112,11 +205,12 @@ def read_contact(
     response_model=ContactResponse,
     status_code=status.HTTP_200_OK,
 )
-def update_contact(
+async def update_contact(
     contact_id: int,
     contact: ContactUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    redis: Redis = Depends(get_redis),
+    user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Updates an existing contact.
@@ -125,46 +219,27 @@ def update_contact(
         contact_id (int): ID of the contact to update.
         contact (ContactUpdate): Data to update the contact.
         db (Session): Database session.
-        user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        user (Principal): The currently authenticated user.
 
     Returns:
         ContactResponse: The updated contact.
 
     Raises:
-        HTTPException: If the contact is not found, no changes are detected, or the user does not have permission to update the contact.
+        HTTPException: If the contact is not found, the user does not have permission to update the contact, or the email is already used.
     """
-    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
-    if not db_contact:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
-
-    if db_contact.owner_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                            detail="You do not have permission to update this contact")
-
-    # Обновление данных
-    for attr, value in contact.dict(exclude_unset=True).items():
-        setattr(db_contact, attr, value)
-
-    try:
-        db.commit()
-        db.refresh(db_contact)
-    except IntegrityError as e:
-        db.rollback()
-        if "ix_contacts_email" in str(e.orig):
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                                detail="A contact with this email already exists.")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="An error occurred while updating the contact")
-
-    return db_contact
+    async with invalidating(redis, user.id):
+        return await run_sync(
+            db, contacts.update_contact, contact_id=contact_id, contact=contact, user=user
+        )
 
 
 @router.delete("/{contact_id}")
-def delete_contact(
+async def delete_contact(
     contact_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Deletes a contact.
@@ -172,7 +247,8 @@ def delete_contact(
     Args:
         contact_id (int): ID of the contact to delete.
         db (Session): Database session.
-        current_user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         dict: Message indicating the contact has been deleted.
@@ -180,24 +256,100 @@ def delete_contact(
     Raises:
         HTTPException: If the contact deletion fails.
     """
-    contacts.delete_contact(db=db, contact_id=contact_id, user=current_user)
+    async with invalidating(redis, current_user.id):
+        await run_sync(db, contacts.delete_contact, contact_id=contact_id, user=current_user)
     return {"detail": "Contact deleted"}
 
 
+@router.patch("/bulk/", response_model=ContactBulkResult)
+async def bulk_update_contacts(
+    body: ContactBulkUpdate,
+    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
+):
+    """
+    Updates many contacts of the currently authenticated user at once.
+
+    The contacts are selected by ``ids`` and/or ``filter`` and updated with a
+    single statement. IDs that do not exist or belong to another user are
+    ignored, so only the returned IDs were changed.
+
+    Args:
+        body (ContactBulkUpdate): Selection of the contacts and the fields to set.
+        db (Session): Database session.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
+
+    Returns:
+        ContactBulkResult: Number and IDs of the updated contacts.
+
+    Raises:
+        HTTPException: If a required field is set to null or the new email is already used.
+    """
+    async with invalidating(redis, current_user.id):
+        ids = await run_sync(
+            db, contacts.bulk_update_contacts, selection=body, changes=body.changes, user=current_user
+        )
+    return ContactBulkResult(count=len(ids), ids=ids)
+
+
+@router.post("/bulk/delete/", response_model=ContactBulkResult)
+async def bulk_delete_contacts(
+    selection: ContactSelection,
+    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
+):
+    """
+    Deletes many contacts of the currently authenticated user at once.
+
+    The contacts are selected by ``ids`` and/or ``filter`` and deleted with a
+    single statement. IDs that do not exist or belong to another user are
+    ignored, so only the returned IDs were deleted.
+
+    Args:
+        selection (ContactSelection): Selection of the contacts to delete.
+        db (Session): Database session.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
+
+    Returns:
+        ContactBulkResult: Number and IDs of the deleted contacts.
+    """
+    async with invalidating(redis, current_user.id):
+        ids = await run_sync(db, contacts.bulk_delete_contacts, selection=selection, user=current_user)
+    return ContactBulkResult(count=len(ids), ids=ids)
+
+
 @router.get("/search/", response_model=List[ContactResponse])
-def search_contacts_api(
-    query: str = Query(...,
+async def search_contacts_api(
+    query: str = Query(..., min_length=1,
                        description="Search query for first name, last name, or email"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None, description="ETag of a copy the client already has"),
+    db: Session = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Searches for contacts based on a query.
 
+    Results are ranked by relevance and paginated with ``skip`` and ``limit``.
+    They are cached in Redis until the user's contacts change, and a matching
+    ``If-None-Match`` gets a 304.
+
     Args:
         query (str): Search query for first name, last name, or email.
+        skip (int): Number of results to skip for pagination.
+        limit (int): Maximum number of results to return.
+        fields (str | None): Comma-separated fields to return, all of them by default.
+        if_none_match (str | None): ETag of a copy the client already has.
         db (Session): Database session.
-        current_user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
         List[ContactResponse]: List of contacts matching the search query.
@@ -205,25 +357,191 @@ def search_contacts_api(
     Raises:
         HTTPException: If there is an issue performing the search.
     """
-    return contacts.search_contacts(db=db, query=query, user=current_user)
+    selected = parse_fields(fields)
+
+    async def produce():
+        found = await run_sync(
+            db, contacts.search_contact_rows, query=query, skip=skip, limit=limit,
+            fields=selected, user=current_user
+        )
+        return contact_list_json(found, selected), {}
+
+    params = {"query": query, "skip": skip, "limit": limit, "fields": _fields_param(selected)}
+    return await cached_json(
+        redis, current_user.id, "search", params, produce, if_none_match, store=not is_replica(db)
+    )
 
 
 @router.get("/birthdays/", response_model=List[ContactResponse])
-def get_contacts_with_upcoming_birthdays(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+async def get_contacts_with_upcoming_birthdays(
+    days: int = Query(7, ge=1, le=366, description="Length of the window in days, today included"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None, description="ETag of a copy the client already has"),
+    db: Session = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
 ):
     """
     Retrieves contacts with upcoming birthdays.
 
+    The serialized list is cached in Redis until the user's contacts change or
+    the UTC date does. A matching ``If-None-Match`` gets a 304.
+
     Args:
+        days (int): Length of the window in days, today included.
+        fields (str | None): Comma-separated fields to return, all of them by default.
+        if_none_match (str | None): ETag of a copy the client already has.
         db (Session): Database session.
-        current_user (User): The currently authenticated user.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
 
     Returns:
-        List[ContactResponse]: List of contacts with upcoming birthdays.
+        List[ContactResponse]: List of contacts with upcoming birthdays, soonest first.
 
     Raises:
         HTTPException: If there is an issue retrieving contacts with upcoming birthdays.
     """
-    return contacts.get_contacts_with_upcoming_birthdays(db=db, user=current_user)
+    selected = parse_fields(fields)
+    today = datetime.utcnow().date()
+
+    async def produce():
+        upcoming = await run_sync(
+            db, contacts.get_upcoming_birthday_rows, days=days, today=today,
+            fields=selected, user=current_user
+        )
+        return contact_list_json(upcoming, selected), {}
+
+    params = {"days": days, "today": today.isoformat(), "fields": _fields_param(selected)}
+    return await cached_json(
+        redis, current_user.id, "birthdays", params, produce, if_none_match, store=not is_replica(db)
+    )
+
+
+@router.post(
+    "/import/",
+    response_model=ContactImportResult,
+    description="No more than 2 requests per minute",
+    dependencies=[Depends(RateLimiter(times=2, seconds=60))],
+)
+async def import_contacts(
+    file: UploadFile = File(..., description="CSV file with a header row, or NDJSON"),
+    format: Literal["csv", "ndjson"] | None = Query(
+        None, description="File format, detected from the file name or content type if omitted"),
+    db: Session = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    current_user: Principal = Depends(auth_service.get_current_principal),
+):
+    """
+    Imports contacts in bulk from a CSV or NDJSON upload.
+
+    The file is read and validated against ContactCreate in chunks of
+    ``IMPORT_BATCH_SIZE`` records, and each chunk is inserted with a single
+    multi-row statement and committed. Memory use does not depend on the file
+    size. Invalid rows and rows with an already used email are skipped and
+    reported; only the first ``MAX_REPORTED_ERRORS`` of them are detailed.
+
+    Args:
+        file (UploadFile): Uploaded CSV or NDJSON file.
+        format (str | None): File format, ``csv`` or ``ndjson``.
+        db (Session): Database session.
+        redis (Redis): Redis client holding the response cache.
+        current_user (Principal): The currently authenticated user.
+
+    Returns:
+        ContactImportResult: Number of imported and rejected rows with rejection details.
+
+    Raises:
+        HTTPException: If the format cannot be detected or the file cannot be decoded.
+    """
+    file_format = format or detect_format(file.filename, file.content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot detect the file format, pass format=csv or format=ndjson",
+        )
+    records = iter_records(file.file, file_format)
+    result = ContactImportResult()
+    try:
+        while True:
+            valid, rejected = await run_in_threadpool(next_batch, records, IMPORT_BATCH_SIZE)
+            if not valid and not rejected:
+                break
+            if valid:
+                async with invalidating(redis, current_user.id):
+                    conflicts = await run_sync(
+                        db, contacts.insert_contact_batch, contacts=valid, user=current_user
+                    )
+                result.inserted += len(valid) - len(conflicts)
+                rejected = sorted(rejected + conflicts)
+            result.failed += len(rejected)
+            room = max(MAX_REPORTED_ERRORS - len(result.errors), 0)
+            result.errors.extend(
+                ImportRowError(row=row, detail=detail) for row, detail in rejected[:room]
+            )
+    except ImportFormatError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{error}. {result.inserted} contacts were imported before the error.",
+        )
+    return result
+
+
+def _export_sync(session_local: sessionmaker, user_id: int, file_format: str) -> Iterator[bytes]:
+    yield export_header(file_format)
+    with session_local() as db:
+        for rows in contacts.iter_contact_batches(db, user_id, EXPORT_BATCH_SIZE):
+            yield format_contacts(rows, file_format)
+
+
+async def _export_async(
+    session_local: async_sessionmaker, user_id: int, file_format: str
+) -> AsyncIterator[bytes]:
+    yield export_header(file_format)
+    async with session_local() as db:
+        result = await db.stream(contacts.export_query(user_id, EXPORT_BATCH_SIZE))
+        try:
+            async for rows in result.mappings().partitions():
+                yield format_contacts(rows, file_format)
+        finally:
+            await result.close()
+
+
+@router.get(
+    "/export/",
+    response_class=StreamingResponse,
+    description="No more than 2 requests per minute",
+    dependencies=[Depends(RateLimiter(times=2, seconds=60))],
+)
+async def export_contacts(
+    format: Literal["csv", "ndjson", "vcard"] = Query("csv", description="Export file format"),
+    session_local: sessionmaker | async_sessionmaker = Depends(get_read_sessionmaker),
+    current_user: Principal = Depends(auth_service.get_current_principal),
+):
+    """
+    Exports all contacts of the currently authenticated user.
+
+    Contacts are read through a server-side cursor ``EXPORT_BATCH_SIZE`` rows at
+    a time and every batch is written to the response as soon as it is fetched,
+    so memory use does not depend on the size of the address book. The stream
+    opens its own session, because the request's dependencies are closed before
+    the body is sent.
+
+    Args:
+        format (str): ``csv`` (with a header row), ``ndjson`` or ``vcard``.
+        session_local (sessionmaker | async_sessionmaker): Factory for the read session.
+        current_user (Principal): The currently authenticated user.
+
+    Returns:
+        StreamingResponse: The contacts ordered by ID, as an attachment.
+    """
+    if isinstance(session_local, async_sessionmaker):
+        body = _export_async(session_local, current_user.id, format)
+    else:
+        body = _export_sync(session_local, current_user.id, format)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="contacts.{EXPORT_EXTENSIONS[format]}"'
+        },
+    )
@@ -0,0 +1,117 @@
+import ipaddress
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from redis.asyncio import Redis
+
+from src.conf.config import settings
+from src.database.db import async_engine, async_read_engine, engine, read_engine
+from src.database.pool import pool_status, threadpool_status
+from src.database.redis_db import get_redis
+from src.services.auth import auth_service
+from src.services.cache import token_cache, user_cache
+from src.services.email import mail_worker
+from src.services.hashing import hashing_pool
+from src.services.mail_queue import queue_depth
+from src.services.rate_limit import RateLimiter
+
+
+def require_internal_access(request: Request) -> None:
+    """
+    Restricts the internal routes to trusted clients.
+
+    The routes are hidden unless ``settings.internal_stats_enabled`` is set, and
+    then only answer clients whose address is in ``settings.internal_stats_networks``.
+    Behind a reverse proxy the client is the proxy, so the proxy must not forward
+    ``/api/internal`` from outside.
+
+    Args:
+        request (Request): Incoming request.
+
+    Raises:
+        HTTPException: 404 if the routes are disabled, 403 if the client is not trusted.
+    """
+    if not settings.internal_stats_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    try:
+        address = ipaddress.ip_address(request.client.host if request.client else "")
+    except ValueError:
+        address = None
+    networks = (ipaddress.ip_network(network) for network in settings.internal_stats_networks)
+    if address is None or not any(address in network for network in networks):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_access)],
+)
+
+
+@router.get("/stats/db")
+async def database_stats():
+    """
+    Reports connection pool and threadpool statistics.
+
+    Returns:
+        dict: Pool state and checkout wait times for every engine, plus AnyIO threadpool usage.
+    """
+    stats = {
+        "primary": pool_status(engine),
+        "threadpool": threadpool_status(),
+    }
+    if async_engine is not None:
+        stats["primary_async"] = pool_status(async_engine.sync_engine)
+    if read_engine is not engine:
+        stats["replica"] = pool_status(read_engine)
+    if async_read_engine is not async_engine:
+        stats["replica_async"] = pool_status(async_read_engine.sync_engine)
+    return stats
+
+
+@router.get("/stats/cache")
+async def cache_stats():
+    """
+    Reports in-process cache statistics.
+
+    Returns:
+        dict: Counters of the user and verified-token caches.
+    """
+    return {"users": user_cache.stats(), "tokens": token_cache.stats()}
+
+
+@router.get("/stats/hashing")
+async def hashing_stats():
+    """
+    Reports password hashing pool statistics and the hashing parameters in use.
+
+    Returns:
+        dict: Running and queued jobs, rejections, queue wait times and the hash scheme and cost.
+    """
+    return {**hashing_pool.stats(), **auth_service.hashing_profile}
+
+
+@router.get("/stats/rate_limit")
+async def rate_limit_stats():
+    """
+    Reports rate limiter statistics of this worker.
+
+    Returns:
+        dict: Allowed and rejected requests, Redis syncs and failures, and whether Redis is skipped.
+    """
+    return RateLimiter.stats()
+
+
+@router.get("/stats/mail")
+async def mail_stats(redis: Redis = Depends(get_redis)):
+    """
+    Reports the depth of the outgoing mail queue and the counters of this worker.
+
+    Args:
+        redis (Redis): Redis client holding the mail queue.
+
+    Returns:
+        dict: Queued, in-flight, retrying and dead messages, plus sends, retries and SMTP session counters.
+    """
+    return {"queue": await queue_depth(redis), "worker": mail_worker.stats()}
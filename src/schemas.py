@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -117,9 +117,12 @@ class ContactCreate(ContactBase):
     """
     Data model for creating a new contact.
 
-    Inherits all attributes from ContactBase.
+    Inherits all attributes from ContactBase. Names and phone numbers are limited
+    to the length of their columns.
     """
-    pass
+    first_name: str = Field(max_length=25)
+    last_name: str = Field(max_length=25)
+    phone_number: str = Field(max_length=13)
 
 
 class ContactUpdate(ContactBase):
@@ -134,10 +137,10 @@ class ContactUpdate(ContactBase):
         birthday (Optional[date]): The new birthday of the contact (if updating).
         additional_info (Optional[str]): Any new additional information about the contact (if updating).
     """
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
+    first_name: Optional[str] = Field(None, max_length=25)
+    last_name: Optional[str] = Field(None, max_length=25)
     email: Optional[EmailStr] = None
-    phone_number: Optional[str] = None
+    phone_number: Optional[str] = Field(None, max_length=13)
     birthday: Optional[date] = None
     additional_info: Optional[str] = None
 
@@ -176,3 +179,100 @@ class RequestEmail(BaseModel):
         email (EmailStr): The email address for which the request is made.
     """
     email: EmailStr
+
+
+class ImportRowError(BaseModel):
+    """
+    Data model for a row rejected during a bulk import.
+
+    Attributes:
+        row (int): 1-based position of the record in the uploaded file.
+        detail (str): Why the row was rejected.
+    """
+    row: int
+    detail: str
+
+
+class ContactImportResult(BaseModel):
+    """
+    Response model for a bulk contact import.
+
+    Attributes:
+        inserted (int): Number of contacts created.
+        failed (int): Number of rejected rows.
+        errors (List[ImportRowError]): Details of the rejected rows, capped at the first ones.
+    """
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+
+class ContactFilter(BaseModel):
+    """
+    Filter selecting contacts for a bulk operation. Set fields are combined with AND.
+
+    Attributes:
+        first_name (Optional[str]): Exact first name.
+        last_name (Optional[str]): Exact last name.
+        email (Optional[str]): Exact email address.
+        phone_number (Optional[str]): Exact phone number.
+        birthday_from (Optional[date]): Earliest birthday, inclusive.
+        birthday_to (Optional[date]): Latest birthday, inclusive.
+    """
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    phone_number: Optional[str] = None
+    birthday_from: Optional[date] = None
+    birthday_to: Optional[date] = None
+
+
+class ContactSelection(BaseModel):
+    """
+    Selection of the contacts a bulk operation applies to.
+
+    Contacts can be selected by ID, by filter or by both. An empty selection is
+    rejected, so a request cannot touch the whole address book by accident.
+
+    Attributes:
+        ids (Optional[List[int]]): IDs of the contacts, at most 1000.
+        filter (Optional[ContactFilter]): Filter the contacts must match.
+    """
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[ContactFilter] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if self.ids is None and (
+            self.filter is None or not self.filter.model_dump(exclude_none=True)
+        ):
+            raise ValueError("Select contacts by ids or by a non-empty filter")
+        return self
+
+
+class ContactBulkUpdate(ContactSelection):
+    """
+    Data model for updating many contacts at once.
+
+    Attributes:
+        changes (ContactUpdate): Fields to set on every selected contact.
+    """
+    changes: ContactUpdate
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.changes.model_fields_set:
+            raise ValueError("changes must set at least one field")
+        return self
+
+
+class ContactBulkResult(BaseModel):
+    """
+    Response model for a bulk update or delete.
+
+    Attributes:
+        count (int): Number of affected contacts.
+        ids (List[int]): IDs of the affected contacts, in ascending order.
+    """
+    count: int
+    ids: List[int]
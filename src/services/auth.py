@@ -1,46 +1,151 @@
+import hashlib
+from dataclasses import dataclass
 from typing import Optional
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy.orm import Session
 
-from src.database.db import get_db
+from src.database.db import get_read_db, open_session
+from src.database.redis_db import get_redis
 from src.repository import users as repository_users
+from src.services import token_versions
+from src.services.cache import detached_user, token_cache, user_cache
+from src.services.hashing import (
+    HashingPoolFull,
+    calibrate_rounds,
+    hashing_pool,
+    password_context,
+)
 from src.conf.config import settings
 
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user, as far as contact routes need to know it.
+
+    Attributes:
+        id (int): User ID.
+        email (str): User email.
+        confirmed (bool): Whether the email is confirmed.
+    """
+
+    id: int
+    email: str
+    confirmed: bool
+
+
 class Auth:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    stateless_claims = settings.stateless_access_tokens
+    hashing_profile = {"scheme": "bcrypt", "rounds": None, "calibrated": False}
     SECRET_KEY = settings.secret_key
     ALGORITHM = settings.algorithm
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-    def verify_password(self, plain_password, hashed_password):
+    async def verify_password(self, plain_password, hashed_password):
         """
         Verifies a plain password against a hashed password.
 
+        The check runs in :data:`src.services.hashing.hashing_pool`, off the event loop.
+
         Args:
             plain_password (str): The plain password.
             hashed_password (str): The hashed password.
 
         Returns:
             bool: True if the password matches, otherwise False.
+
+        Raises:
+            HTTPException: If the hashing pool is saturated.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await self._hash_job(self.pwd_context.verify, plain_password, hashed_password)
 
-    def get_password_hash(self, password: str):
+    async def get_password_hash(self, password: str):
         """
         Hashes a plain password.
 
+        The hash is computed in :data:`src.services.hashing.hashing_pool`, off the event loop.
+
         Args:
             password (str): The plain password.
 
         Returns:
             str: The hashed password.
+
+        Raises:
+            HTTPException: If the hashing pool is saturated.
+        """
+        return await self._hash_job(self.pwd_context.hash, password)
+
+    def configure_password_hashing(self) -> dict:
+        """
+        Sets up the password context for the configured scheme and cost.
+
+        The cost is ``password_hash_rounds`` if set, otherwise it is calibrated on
+        this machine to take about ``password_hash_target_ms`` per hash, see
+        :func:`src.services.hashing.calibrate_rounds`. Calibration hashes for up to
+        a few seconds, so this runs once at startup. Deployments with several
+        nodes should set ``password_hash_rounds`` so every node uses the same cost.
+
+        Returns:
+            dict: The chosen scheme and rounds, and whether they were calibrated.
+        """
+        scheme = settings.password_hash_scheme
+        rounds = settings.password_hash_rounds
+        calibrated = rounds is None
+        if calibrated:
+            rounds = calibrate_rounds(scheme, settings.password_hash_target_ms)
+        self.pwd_context = password_context(scheme, rounds)
+        self.hashing_profile = {"scheme": scheme, "rounds": rounds, "calibrated": calibrated}
+        return self.hashing_profile
+
+    def needs_rehash(self, hashed_password: str) -> bool:
         """
-        return self.pwd_context.hash(password)
+        Checks whether a stored hash uses another scheme or cost than the current ones.
+
+        Args:
+            hashed_password (str): The stored hash.
+
+        Returns:
+            bool: True if the hash should be replaced.
+        """
+        return self.pwd_context.needs_update(hashed_password)
+
+    async def rehash_password(self, email: str, password: str, old_hash: str) -> None:
+        """
+        Replaces an outdated password hash, meant to run as a background task after login.
+
+        The new hash is stored only if the old one is still in place, so a
+        concurrent password change wins. Nothing happens if the hashing pool is
+        saturated; the next login tries again.
+
+        Args:
+            email (str): Email address of the user.
+            password (str): The plain password that was just verified.
+            old_hash (str): The outdated hash.
+        """
+        try:
+            new_hash = await hashing_pool.run(self.pwd_context.hash, password)
+        except HashingPoolFull:
+            return
+        async with open_session() as db:
+            await repository_users.update_password(email, old_hash, new_hash, db)
+
+    async def _hash_job(self, fn, *args):
+        try:
+            return await hashing_pool.run(fn, *args)
+        except HashingPoolFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login attempts in progress, try again later",
+                headers={"Retry-After": "1"},
+            )
 
     async def create_access_token(
         self, data: dict, expires_delta: Optional[float] = None
@@ -94,6 +199,73 @@ class Auth:
         )
         return encoded_refresh_token
 
+    async def token_claims(self, user, redis: Redis) -> dict:
+        """
+        Builds the claims identifying a user in new access and refresh tokens.
+
+        In stateless mode the user ID, the confirmed flag and the user's current
+        token version are embedded as ``uid``, ``cnf`` and ``ver``, so that
+        :meth:`get_current_principal` needs no user lookup.
+
+        Args:
+            user (User): The user the tokens are issued to.
+            redis (Redis): Redis client holding token versions.
+
+        Returns:
+            dict: Claims for :meth:`create_access_token` and :meth:`create_refresh_token`.
+        """
+        claims = {"sub": user.email}
+        if self.stateless_claims:
+            claims.update(
+                uid=user.id,
+                cnf=user.confirmed,
+                ver=await self._token_version(redis, user.id),
+            )
+        return claims
+
+    async def refreshed_claims(self, claims: dict, redis: Redis) -> dict:
+        """
+        Builds the claims for tokens issued in exchange for a refresh token.
+
+        Stateless claims are carried over with the current token version, so no
+        user lookup is needed either.
+
+        Args:
+            claims (dict): Claims of the presented refresh token.
+            redis (Redis): Redis client holding token versions.
+
+        Returns:
+            dict: Claims for :meth:`create_access_token` and :meth:`create_refresh_token`.
+
+        Raises:
+            HTTPException: If the refresh token was revoked by a token version bump,
+                or 503 if Redis cannot be reached to check the version.
+        """
+        if not self.stateless_claims or "uid" not in claims:
+            return {"sub": claims["sub"]}
+        await self._check_token_version(claims, redis)
+        return {key: claims[key] for key in ("sub", "uid", "cnf", "ver")}
+
+    async def _token_version(self, redis: Redis, user_id: int) -> int:
+        # Without the version a revoked token cannot be told apart, so fail closed
+        try:
+            return await token_versions.get_version(redis, user_id)
+        except (RedisError, OSError):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Token revocation state is unavailable, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+    async def _check_token_version(self, claims: dict, redis: Redis) -> None:
+        current = await self._token_version(redis, claims["uid"])
+        if claims.get("ver") != current:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
     async def decode_refresh_token(self, refresh_token: str):
         """
         Decodes a JWT refresh token and retrieves the email.
@@ -104,6 +276,22 @@ class Auth:
         Returns:
             str: The email encoded in the token.
 
+        Raises:
+            HTTPException: If the token is invalid or the scope is incorrect.
+        """
+        payload = await self.decode_refresh_token_claims(refresh_token)
+        return payload["sub"]
+
+    async def decode_refresh_token_claims(self, refresh_token: str) -> dict:
+        """
+        Decodes a JWT refresh token and returns all of its claims.
+
+        Args:
+            refresh_token (str): The refresh token.
+
+        Returns:
+            dict: The token claims, including ``fid`` and ``jti`` for tokens issued with a family.
+
         Raises:
             HTTPException: If the token is invalid or the scope is incorrect.
         """
@@ -112,8 +300,7 @@ class Auth:
                 refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM]
             )
             if payload["scope"] == "refresh_token":
-                email = payload["sub"]
-                return email
+                return payload
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid scope for token",
@@ -124,15 +311,50 @@ class Auth:
                 detail="Could not validate credentials",
             )
 
+    def verify_access_token(self, token: str) -> dict:
+        """
+        Verifies a JWT and returns its claims, reusing earlier verifications.
+
+        Verified claims are kept in :data:`src.services.cache.token_cache` under the
+        SHA-256 digest of the token until the token's ``exp``, so a token sent again
+        skips signature verification. Tokens without ``exp`` are not cached.
+
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            dict: The token claims. They are shared with the cache and must not be modified.
+
+        Raises:
+            JWTError: If the token is invalid or expired.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        claims = token_cache.get(key)
+        if claims is None:
+            claims = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            if isinstance(claims.get("exp"), (int, float)):
+                token_cache.set(key, claims, expires_at=claims["exp"])
+        return claims
+
     async def get_current_user(
-        self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+        self,
+        token: str = Depends(oauth2_scheme),
+        db: Session = Depends(get_read_db),
+        redis: Redis = Depends(get_redis),
     ):
         """
         Retrieves the current user based on the access token.
 
+        The token is checked with :meth:`verify_access_token`. Users are served from
+        the in-process :data:`src.services.cache.user_cache` when possible, otherwise
+        read through :func:`get_read_db`, so they may come from the replica. The
+        returned user is a copy bound to no session. Stateless tokens are also
+        checked against the user's token version.
+
         Args:
             token (str): The access token.
             db (Session): The database session.
+            redis (Redis): Redis client holding token versions.
 
         Returns:
             User: The current user.
@@ -147,8 +369,7 @@ class Auth:
         )
 
         try:
-            payload = jwt.decode(token, self.SECRET_KEY,
-                                 algorithms=[self.ALGORITHM])
+            payload = self.verify_access_token(token)
             if payload["scope"] == "access_token":
                 email = payload["sub"]
                 if email is None:
@@ -157,12 +378,54 @@ class Auth:
                 raise credentials_exception
         except JWTError as e:
             raise credentials_exception
+        if "uid" in payload:
+            await self._check_token_version(payload, redis)
 
-        user = await repository_users.get_user_by_email(email, db)
+        user = user_cache.get(email)
         if user is None:
-            raise credentials_exception
+            db_user = await repository_users.get_user_by_email(email, db)
+            if db_user is None:
+                raise credentials_exception
+            user = detached_user(db_user)
+            user_cache.set(email, user)
         return user
 
+    async def get_current_principal(
+        self,
+        token: str = Depends(oauth2_scheme),
+        db: Session = Depends(get_read_db),
+        redis: Redis = Depends(get_redis),
+    ) -> Principal:
+        """
+        Retrieves the current user as a lightweight principal.
+
+        In stateless mode a token carrying ``uid`` is trusted on its signature and
+        a token version check in Redis, without loading the user. Other tokens
+        fall back to :meth:`get_current_user`.
+
+        Args:
+            token (str): The access token.
+            db (Session): The database session, only used by the fallback.
+            redis (Redis): Redis client holding token versions.
+
+        Returns:
+            Principal: The current user.
+
+        Raises:
+            HTTPException: If the token is invalid or revoked, or the user is not found;
+                503 if a stateless token cannot be checked because Redis is down.
+        """
+        try:
+            payload = self.verify_access_token(token)
+        except JWTError:
+            payload = {}
+        if self.stateless_claims and payload.get("scope") == "access_token" and "uid" in payload:
+            await self._check_token_version(payload, redis)
+            return Principal(id=payload["uid"], email=payload["sub"], confirmed=payload["cnf"])
+
+        user = await self.get_current_user(token, db, redis)
+        return Principal(id=user.id, email=user.email, confirmed=user.confirmed)
+
     def create_email_token(self, data: dict):
         """
         Creates a JWT token for email verification.
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import inspect
+
+from src.conf.config import settings
+from src.database.models import User
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry expiry and LRU eviction.
+
+    The cache lives in the memory of a single worker process, so entries
+    invalidated in one worker stay visible in the others until they expire.
+
+    Attributes:
+        ttl (float): Default and maximum lifetime of an entry in seconds; 0 disables the cache.
+        max_entries (int): Maximum number of entries, the least recently used are evicted first.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that found no live entry.
+        evictions (int): Number of entries dropped to respect ``max_entries``.
+    """
+
+    def __init__(
+        self, ttl: float, max_entries: int, clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Returns a live entry and marks it as recently used.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Any | None: The cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float | None = None) -> None:
+        """
+        Stores an entry, evicting the least recently used ones beyond ``max_entries``.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to cache.
+            expires_at (float | None): Expiry on the cache clock, capped at now plus ``ttl``.
+        """
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        now = self._clock()
+        if expires_at is None or expires_at > now + self.ttl:
+            expires_at = now + self.ttl
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drops an entry if it is cached.
+
+        Args:
+            key (Hashable): Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drops all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Reports the cache counters.
+
+        Returns:
+            dict: Size, limits, hits, misses, evictions and the hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def detached_user(user: User) -> User:
+    """
+    Copies the column values of a user into a new instance bound to no session.
+
+    Cached users are shared between requests, so they must not be tied to the
+    session, and the expiry on commit, of the request that loaded them.
+
+    Args:
+        user (User): User loaded by a session.
+
+    Returns:
+        User: Transient copy of the user without relationships loaded.
+    """
+    return User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+
+
+user_cache = TTLCache(settings.user_cache_ttl, settings.user_cache_max_entries)
+
+# Verified access-token claims keyed by token digest. The wall clock is used so
+# that entries expire exactly at the token's ``exp``.
+token_cache = TTLCache(settings.token_cache_ttl, settings.token_cache_max_entries, clock=time.time)
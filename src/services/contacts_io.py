@@ -0,0 +1,235 @@
+import csv
+import io
+import json
+from datetime import date
+from itertools import islice
+from typing import Any, BinaryIO, Iterator, List, Mapping, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from src.schemas import ContactCreate
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "vcard": "text/vcard; charset=utf-8",
+}
+EXPORT_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "vcard": "vcf"}
+EXPORT_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "birthday",
+    "additional_info",
+)
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload cannot be decoded as the requested format."""
+
+
+def detect_format(filename: str | None, content_type: str | None) -> str | None:
+    """
+    Guesses the import format of an upload.
+
+    Args:
+        filename (str | None): Name of the uploaded file.
+        content_type (str | None): Content type of the uploaded part.
+
+    Returns:
+        str | None: ``"csv"``, ``"ndjson"`` or None if it cannot be told.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    if content_type == "text/csv":
+        return "csv"
+    suffix = (filename or "").rsplit(".", 1)[-1].lower()
+    if suffix in ("ndjson", "jsonl"):
+        return "ndjson"
+    if suffix == "csv":
+        return "csv"
+    return None
+
+
+def _text_lines(file: BinaryIO) -> Iterator[str]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from text
+    except UnicodeDecodeError as error:
+        raise ImportFormatError("File is not valid UTF-8") from error
+    finally:
+        # Leave the upload open, it is closed by the framework
+        text.detach()
+
+
+def iter_records(file: BinaryIO, format: str) -> Iterator[Tuple[int, object]]:
+    """
+    Lazily reads records from an uploaded CSV or NDJSON file.
+
+    Only the current line is held in memory. Blank NDJSON lines are skipped.
+
+    Args:
+        file (BinaryIO): Binary file positioned at the start of the data.
+        format (str): ``"csv"`` (with a header row) or ``"ndjson"``.
+
+    Yields:
+        Tuple[int, object]: 1-based record number and the raw record, or the
+        error message for an NDJSON line that is not valid JSON.
+
+    Raises:
+        ImportFormatError: If the file is not UTF-8 or the CSV is malformed.
+    """
+    lines = _text_lines(file)
+    if format == "csv":
+        try:
+            yield from enumerate(csv.DictReader(lines), start=1)
+        except csv.Error as error:
+            raise ImportFormatError(f"Malformed CSV: {error}") from error
+        return
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as error:
+            yield number, f"Invalid JSON: {error.msg}"
+
+
+def validate_record(record: object) -> ContactCreate:
+    """
+    Validates a raw import record with the ContactCreate schema.
+
+    Empty CSV cells are treated as missing values.
+
+    Args:
+        record (object): Parsed CSV row or JSON value.
+
+    Returns:
+        ContactCreate: The validated contact.
+
+    Raises:
+        ValueError: If the record is not an object or fails validation.
+    """
+    if isinstance(record, str):
+        raise ValueError(record)
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+    data = {key: value for key, value in record.items() if key and value not in ("", None)}
+    try:
+        return ContactCreate.model_validate(data)
+    except ValidationError as error:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}"
+                for err in error.errors()
+            )
+        ) from None
+
+
+def next_batch(
+    records: Iterator[Tuple[int, object]], size: int
+) -> Tuple[List[Tuple[int, ContactCreate]], List[Tuple[int, str]]]:
+    """
+    Reads and validates the next chunk of records.
+
+    Args:
+        records (Iterator[Tuple[int, object]]): Iterator returned by :func:`iter_records`.
+        size (int): Maximum number of records to read.
+
+    Returns:
+        Tuple[List[Tuple[int, ContactCreate]], List[Tuple[int, str]]]: Valid contacts
+        and rejected rows, both keyed by record number. Both are empty at the end of the file.
+    """
+    valid, invalid = [], []
+    for number, record in islice(records, size):
+        try:
+            valid.append((number, validate_record(record)))
+        except ValueError as error:
+            invalid.append((number, str(error)))
+    return valid, invalid
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _vcard_escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace(";", "\\;")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _vcard(contact: Mapping[str, Any]) -> str:
+    first, last = contact["first_name"] or "", contact["last_name"] or ""
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"N:{_vcard_escape(last)};{_vcard_escape(first)};;;",
+        f"FN:{_vcard_escape(f'{first} {last}'.strip())}",
+    ]
+    if contact["email"]:
+        lines.append(f"EMAIL;TYPE=INTERNET:{_vcard_escape(contact['email'])}")
+    if contact["phone_number"]:
+        lines.append(f"TEL;TYPE=VOICE:{_vcard_escape(contact['phone_number'])}")
+    if contact["birthday"]:
+        lines.append(f"BDAY:{contact['birthday'].isoformat()}")
+    if contact["additional_info"]:
+        lines.append(f"NOTE:{_vcard_escape(contact['additional_info'])}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def export_header(format: str) -> bytes:
+    """
+    Returns the bytes written before the first exported contact.
+
+    Args:
+        format (str): ``"csv"``, ``"ndjson"`` or ``"vcard"``.
+
+    Returns:
+        bytes: The CSV header row, empty for the other formats.
+    """
+    if format != "csv":
+        return b""
+    out = io.StringIO()
+    csv.writer(out).writerow(EXPORT_FIELDS)
+    return out.getvalue().encode()
+
+
+def format_contacts(rows: Sequence[Mapping[str, Any]], format: str) -> bytes:
+    """
+    Serializes a batch of exported contacts.
+
+    The CSV and NDJSON output can be imported back with :func:`iter_records`.
+
+    Args:
+        rows (Sequence[Mapping[str, Any]]): Contacts keyed by :data:`EXPORT_FIELDS`.
+        format (str): ``"csv"``, ``"ndjson"`` or ``"vcard"``.
+
+    Returns:
+        bytes: The UTF-8 encoded batch.
+    """
+    if format == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerows([row[field] for field in EXPORT_FIELDS] for row in rows)
+        return out.getvalue().encode()
+    if format == "ndjson":
+        return "".join(
+            json.dumps({field: row[field] for field in EXPORT_FIELDS}, default=_json_default) + "\n"
+            for row in rows
+        ).encode()
+    return "".join(_vcard(row) for row in rows).encode()
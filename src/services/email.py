@@ -1,10 +1,16 @@
-from pathlib import Path
+import asyncio
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from fastapi_mail import ConnectionConfig
 from pydantic import EmailStr
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
+from src.database.redis_db import redis_client
 from src.services.auth import auth_service
+from src.services.mail_queue import MailWorker, SMTPPool, enqueue_message
+from src.services.mail_templates import TEMPLATE_FOLDER, mail_templates
 from src.conf.config import settings
 
 
@@ -15,40 +21,72 @@ conf = ConnectionConfig(
     MAIL_PORT=settings.mail_port,
     MAIL_SERVER=settings.mail_server,
     MAIL_FROM_NAME="Desired Name",
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=True,
+    MAIL_STARTTLS=settings.mail_starttls,
+    MAIL_SSL_TLS=settings.mail_ssl_tls,
     USE_CREDENTIALS=True,
     VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+    TEMPLATE_FOLDER=TEMPLATE_FOLDER,
+)
+
+mail_worker = MailWorker(
+    redis_client,
+    SMTPPool(conf, settings.mail_pool_size),
+    batch_size=settings.mail_batch_size,
+    max_attempts=settings.mail_max_attempts,
+    retry_base=settings.mail_retry_base,
+    retry_max=settings.mail_retry_max,
 )
 
 
-async def send_email(email: EmailStr, username: str, host: str):
+def render_message(recipient: str, subject: str, template_name: str, context: dict) -> EmailMessage:
     """
-    Sends a confirmation email to the user with a verification token.
+    Renders an HTML template into a message from the configured sender.
+
+    Args:
+        recipient (str): The recipient's email address.
+        subject (str): The message subject.
+        template_name (str): Name of the template in the templates folder.
+        context (dict): Variables passed to the template.
+
+    Returns:
+        EmailMessage: The message, ready to be queued.
+    """
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = formataddr((conf.MAIL_FROM_NAME, conf.MAIL_FROM))
+    message["To"] = recipient
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = make_msgid()
+    message.set_content(mail_templates.render(template_name, context), subtype="html")
+    return message
+
+
+async def send_email(email: EmailStr, username: str, host: str, redis: Redis = redis_client):
+    """
+    Queues a confirmation email to the user with a verification token.
+
+    The message is sent later by the mail worker, so it survives a restart of
+    the application and a signup spike reuses a few SMTP sessions.
 
     Args:
         email (EmailStr): The recipient's email address.
         username (str): The recipient's username.
         host (str): The base URL of the application used to generate the verification link.
-
-    Raises:
-        ConnectionErrors: If there is an error connecting to the email server.
+        redis (Redis): Redis client holding the mail queue.
     """
+    token_verification = auth_service.create_email_token({"sub": email})
+    message = render_message(
+        email,
+        "Confirm your email",
+        "email_template.html",
+        {"host": host, "username": username, "token": token_verification},
+    )
     try:
-        token_verification = auth_service.create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="email_template.html")
-    except ConnectionErrors as err:
+        await enqueue_message(redis, message)
+    except RedisError as err:
         print(err)
+
+
+if __name__ == "__main__":
+    # Dedicated worker, for deployments that set MAIL_WORKER_ENABLED=false on the API
+    asyncio.run(mail_worker.run())
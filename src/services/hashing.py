@@ -0,0 +1,196 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from passlib.context import CryptContext
+
+from src.conf.config import settings
+
+T = TypeVar("T")
+
+
+class HashingPoolFull(RuntimeError):
+    """Raised when the hashing pool already has ``workers + max_queue`` jobs."""
+
+
+class HashingPool:
+    """
+    Dedicated, bounded thread pool for password hashing.
+
+    bcrypt releases the GIL while hashing, so the worker threads use other CPU
+    cores while the event loop keeps serving requests. At most ``workers``
+    hashes run at once and at most ``max_queue`` more wait; further jobs are
+    rejected immediately instead of piling up behind a login storm.
+
+    Attributes:
+        workers (int): Number of hashing threads.
+        max_queue (int): Number of jobs allowed to wait for a thread.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._started = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Runs a hashing function in the pool and waits for its result.
+
+        Args:
+            fn (Callable): CPU-bound function to run.
+            *args: Positional arguments passed to ``fn``.
+
+        Returns:
+            The value returned by ``fn``.
+
+        Raises:
+            HashingPoolFull: If the pool and its queue are full.
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolFull("Too many password hashing jobs in progress")
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._started += 1
+                waited = started - submitted
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_total += time.perf_counter() - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        """
+        Reports pool usage and queueing.
+
+        Returns:
+            dict: Limits, jobs running and queued, completed and rejected jobs,
+            queue wait and run times in milliseconds.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_avg_ms": self._wait_total / self._started * 1000 if self._started else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+                "run_avg_ms": self._run_total / self._completed * 1000 if self._completed else 0.0,
+            }
+
+
+def hashing_workers() -> int:
+    """
+    Returns the number of hashing threads.
+
+    Defaults to half of the CPU cores, leaving the rest to the event loop and
+    the database threadpool.
+
+    Returns:
+        int: Configured ``hash_workers`` or the default.
+    """
+    return settings.hash_workers or max(1, (os.cpu_count() or 2) // 2)
+
+
+# Lowest cost calibration may pick, whatever the hardware; 12 is the bcrypt cost used before calibration
+MIN_ROUNDS = {"bcrypt": 12, "argon2": 2}
+MAX_ROUNDS = {"bcrypt": 20, "argon2": 64}
+
+
+def _hash_time_ms(scheme: str, rounds: int, samples: int) -> float:
+    context = CryptContext(schemes=[scheme], **{f"{scheme}__rounds": rounds})
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def calibrate_rounds(scheme: str, target_ms: float, samples: int = 3) -> int:
+    """
+    Picks the hash cost that keeps a hash or verify close to ``target_ms`` on this machine.
+
+    The cost of bcrypt doubles with every round, the cost of argon2 grows
+    linearly with its time cost. A cheap probe is timed and extrapolated, and
+    the highest cost not exceeding the target is chosen, within
+    :data:`MIN_ROUNDS` and :data:`MAX_ROUNDS`.
+
+    Args:
+        scheme (str): ``"bcrypt"`` or ``"argon2"``.
+        target_ms (float): Desired duration of one hash or verify, in milliseconds.
+        samples (int): Number of timed probe hashes; the fastest one is used.
+
+    Returns:
+        int: bcrypt log2 rounds or argon2 time cost.
+    """
+    if scheme == "bcrypt":
+        probe = 8
+        probe_ms = _hash_time_ms(scheme, probe, samples)
+        rounds = probe + math.floor(math.log2(target_ms / probe_ms))
+    else:
+        probe = 1
+        probe_ms = _hash_time_ms(scheme, probe, samples)
+        rounds = math.floor(target_ms / probe_ms)
+    return min(max(rounds, MIN_ROUNDS[scheme]), MAX_ROUNDS[scheme])
+
+
+def password_context(scheme: str, rounds: int) -> CryptContext:
+    """
+    Builds the password context for the chosen scheme and cost.
+
+    Hashes made with another scheme or with less than ``rounds`` are reported
+    by ``needs_update`` and get rehashed on the next login. Hashes costing more
+    are kept: a hash is never rehashed to a lower cost, so nodes configured
+    with different costs do not keep rehashing each other's hashes. bcrypt
+    stays verifiable when argon2 is chosen.
+
+    Args:
+        scheme (str): ``"bcrypt"`` or ``"argon2"``.
+        rounds (int): bcrypt log2 rounds or argon2 time cost.
+
+    Returns:
+        CryptContext: Context hashing with ``scheme`` and deprecating everything else.
+    """
+    return CryptContext(
+        schemes=list(dict.fromkeys([scheme, "bcrypt"])),
+        deprecated="auto",
+        **{
+            f"{scheme}__default_rounds": rounds,
+            f"{scheme}__min_rounds": rounds,
+        },
+    )
+
+
+hashing_pool = HashingPool(hashing_workers(), settings.hash_max_queue)
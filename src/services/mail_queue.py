@@ -0,0 +1,447 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import suppress
+from email.message import EmailMessage
+from email.utils import getaddresses
+
+import aiosmtplib
+import redis.asyncio as redis
+from fastapi_mail import ConnectionConfig
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "mail:queue"
+RETRY_KEY = "mail:retry"
+PROCESSING_KEY = "mail:processing"
+LEASES_KEY = "mail:leases"
+DEAD_KEY = "mail:dead"
+
+# Failed messages kept for inspection
+DEAD_LETTER_LIMIT = 1000
+
+# Claims up to ARGV[3] messages for a worker. Messages whose lease expired
+# (their worker died mid-batch) and retries that are due go back to the front
+# of the queue first. Claimed messages stay in the processing set, scored by
+# their lease deadline, until they are acknowledged. The leases hash maps each
+# of them to the token ARGV[4] of the claim holding it; a requeued message
+# loses its token, so its former holder can no longer settle it.
+CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+for _, key in ipairs({KEYS[3], KEYS[2]}) do
+    for _, message in ipairs(redis.call('ZRANGEBYSCORE', key, '-inf', now, 'LIMIT', 0, ARGV[3])) do
+        redis.call('ZREM', key, message)
+        redis.call('HDEL', KEYS[4], message)
+        redis.call('RPUSH', KEYS[1], message)
+    end
+end
+local batch = {}
+for i = 1, tonumber(ARGV[3]) do
+    local message = redis.call('RPOP', KEYS[1])
+    if not message then
+        break
+    end
+    redis.call('ZADD', KEYS[3], ARGV[2], message)
+    redis.call('HSET', KEYS[4], message, ARGV[4])
+    batch[i] = message
+end
+return batch
+"""
+
+# Settles message ARGV[1] if the claim with token ARGV[2] still holds it: the
+# message leaves the processing set and, as ARGV[3] says, is dropped ('sent'),
+# moved to the dead letters ('dead', payload ARGV[4], list capped at ARGV[5])
+# or scheduled for a retry ('retry', payload ARGV[4], due at ARGV[5]).
+# Returns 0 if the lease was lost to another claim.
+SETTLE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if ARGV[3] == 'dead' then
+    redis.call('LPUSH', KEYS[3], ARGV[4])
+    redis.call('LTRIM', KEYS[3], 0, tonumber(ARGV[5]) - 1)
+elseif ARGV[3] == 'retry' then
+    redis.call('ZADD', KEYS[4], ARGV[5], ARGV[4])
+end
+return 1
+"""
+
+# Moves the lease deadline of the messages ARGV[3..] to ARGV[2], for those the
+# claim with token ARGV[1] still holds. Returns the number renewed.
+RENEW_SCRIPT = """
+local renewed = 0
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then
+        redis.call('ZADD', KEYS[1], 'XX', ARGV[2], ARGV[i])
+        renewed = renewed + 1
+    end
+end
+return renewed
+"""
+
+
+async def enqueue_message(client: redis.Redis, message: EmailMessage) -> str:
+    """
+    Adds a message to the outgoing mail queue.
+
+    The message is stored fully rendered, so the worker only needs SMTP access.
+    Its envelope is taken from the ``From``, ``To``, ``Cc`` and ``Bcc`` headers;
+    ``Bcc`` is removed from the stored message.
+
+    Args:
+        client (redis.Redis): Redis client.
+        message (EmailMessage): Message to send.
+
+    Returns:
+        str: Id of the queued message.
+    """
+    recipients = [
+        address
+        for _, address in getaddresses(message.get_all("To", []) + message.get_all("Cc", []) + message.get_all("Bcc", []))
+    ]
+    del message["Bcc"]
+    message_id = uuid.uuid4().hex
+    payload = {
+        "id": message_id,
+        "sender": getaddresses([message["From"]])[0][1],
+        "recipients": recipients,
+        "message": message.as_string(),
+        "attempts": 0,
+    }
+    await client.lpush(QUEUE_KEY, json.dumps(payload))
+    return message_id
+
+
+async def queue_depth(client: redis.Redis) -> dict:
+    """
+    Counts messages in each state of the mail queue.
+
+    Args:
+        client (redis.Redis): Redis client.
+
+    Returns:
+        dict: Messages ``queued``, being sent (``processing``), waiting to be retried (``retrying``)
+        and given up on (``dead``).
+    """
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.llen(QUEUE_KEY)
+        pipe.zcard(PROCESSING_KEY)
+        pipe.zcard(RETRY_KEY)
+        pipe.llen(DEAD_KEY)
+        queued, processing, retrying, dead = await pipe.execute()
+    return {"queued": queued, "processing": processing, "retrying": retrying, "dead": dead}
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """
+    Tells whether retrying a message that failed with ``error`` is pointless.
+
+    Args:
+        error (Exception): Error raised while sending.
+
+    Returns:
+        bool: True for 5xx rejections of the message or all of its recipients.
+    """
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= refused.code < 600 for refused in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPAuthenticationError):
+        return False
+    return isinstance(error, aiosmtplib.SMTPResponseException) and 500 <= error.code < 600
+
+
+class SMTPPool:
+    """
+    Small pool of connected, authenticated SMTP sessions.
+
+    Sessions are opened on demand, at most ``size`` at a time, and reused for
+    later messages instead of paying a TLS handshake and login per message.
+    A session is dropped when it fails; one dropped by the server while idle is
+    replaced and the message is sent again on the new session.
+
+    Attributes:
+        config (ConnectionConfig): SMTP server, credentials and TLS settings.
+        size (int): Maximum number of open sessions.
+    """
+
+    def __init__(self, config: ConnectionConfig, size: int = 2):
+        self.config = config
+        self.size = size
+        self._idle: list[aiosmtplib.SMTP] = []
+        self._slots: asyncio.Semaphore | None = None
+        self.counters = {"opened": 0, "reused": 0, "discarded": 0}
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        config = self.config
+        credentials = {}
+        if config.USE_CREDENTIALS:
+            credentials = {"username": config.MAIL_USERNAME, "password": config.MAIL_PASSWORD}
+        smtp = aiosmtplib.SMTP(
+            hostname=config.MAIL_SERVER,
+            port=config.MAIL_PORT,
+            use_tls=config.MAIL_SSL_TLS,
+            start_tls=config.MAIL_STARTTLS,
+            validate_certs=config.VALIDATE_CERTS,
+            timeout=config.TIMEOUT,
+            **credentials,
+        )
+        await smtp.connect()
+        self.counters["opened"] += 1
+        return smtp
+
+    def _discard(self, smtp: aiosmtplib.SMTP) -> None:
+        smtp.close()
+        self.counters["discarded"] += 1
+
+    async def _send_on(self, smtp: aiosmtplib.SMTP, sender: str, recipients: list[str], message: str) -> None:
+        try:
+            await smtp.sendmail(sender, recipients, message)
+        except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+            # The server refused this message; the session itself is still usable
+            if smtp.is_connected:
+                self._idle.append(smtp)
+            else:
+                self._discard(smtp)
+            raise
+        except BaseException:
+            self._discard(smtp)
+            raise
+        self._idle.append(smtp)
+
+    async def send(self, sender: str, recipients: list[str], message: str) -> None:
+        """
+        Sends one message on a pooled session, waiting for a free one if needed.
+
+        Args:
+            sender (str): Envelope sender address.
+            recipients (list[str]): Envelope recipient addresses.
+            message (str): The RFC 5322 message.
+
+        Raises:
+            aiosmtplib.SMTPException: If the server cannot be reached or refuses the message.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            while self._idle:
+                smtp = self._idle.pop()
+                if not smtp.is_connected:
+                    self._discard(smtp)
+                    continue
+                self.counters["reused"] += 1
+                try:
+                    return await self._send_on(smtp, sender, recipients, message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Closed by the server while idle; try the next session
+                    continue
+            await self._send_on(await self._connect(), sender, recipients, message)
+
+    async def close(self) -> None:
+        """Ends all idle sessions."""
+        while self._idle:
+            smtp = self._idle.pop()
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+    def stats(self) -> dict:
+        """
+        Reports session counters of the pool.
+
+        Returns:
+            dict: Sessions opened, reused and discarded, and the number currently idle.
+        """
+        return {**self.counters, "idle": len(self._idle), "size": self.size}
+
+
+class MailWorker:
+    """
+    Sends the messages of the Redis mail queue through an :class:`SMTPPool`.
+
+    Each round claims a batch of messages and sends them concurrently over the
+    pooled sessions. A sent message is acknowledged; a failed one is retried
+    after an exponential backoff with jitter, up to ``max_attempts`` sends, and
+    then moved to the dead letter list. Messages rejected with a 5xx reply go
+    there at once, and so do messages that cannot be decoded or fail with an
+    unexpected error.
+
+    Claimed messages are leased rather than removed, so a batch interrupted by a
+    crash or restart is sent again once the lease expires. Leases are renewed
+    every third of ``lease_seconds`` while the batch is being sent, so a slow
+    batch is not claimed and sent twice. Every claim has its own lease token,
+    checked by the acknowledgement and the renewal, so a worker whose lease ran
+    out cannot settle or extend a message another worker claimed since. Several
+    workers, in one or many processes, can share a queue.
+
+    Attributes:
+        redis (redis.Redis): Redis client holding the queue.
+        pool (SMTPPool): Pool of SMTP sessions.
+        batch_size (int): Messages claimed per round.
+        max_attempts (int): Sends tried before a message is given up on.
+        retry_base (float): Delay before the first retry, in seconds; doubled for each later one.
+        retry_max (float): Upper bound of the retry delay, in seconds.
+        lease_seconds (float): Time a worker may go without renewing its leases before
+            its batch is claimed again.
+        poll_interval (float): Pause between rounds while the queue is empty, in seconds.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        pool: SMTPPool,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        retry_base: float = 30.0,
+        retry_max: float = 3600.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+    ):
+        self.redis = client
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.counters = {"sent": 0, "retried": 0, "dead": 0, "lost_leases": 0, "redis_errors": 0, "errors": 0}
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        Computes how long to wait before sending a message again.
+
+        Args:
+            attempts (int): Sends already tried.
+
+        Returns:
+            float: Delay in seconds, between half and all of the capped exponential backoff.
+        """
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _settle(self, raw: str, token: str, outcome: str, payload: str = "", score: float = 0) -> bool:
+        settled = await self.redis.eval(
+            SETTLE_SCRIPT, 4, PROCESSING_KEY, LEASES_KEY, DEAD_KEY, RETRY_KEY, raw, token, outcome, payload, score
+        )
+        if not settled:
+            # Another worker claimed it again after our lease ran out and owns it now
+            self.counters["lost_leases"] += 1
+            logger.warning("Mail worker lost the lease of a message before settling it as %s", outcome)
+        return bool(settled)
+
+    async def _fail(self, raw: str, token: str, payload: dict, error: Exception, permanent: bool) -> None:
+        payload["attempts"] += 1
+        payload["error"] = str(error) or repr(error)
+        if permanent or payload["attempts"] >= self.max_attempts:
+            if await self._settle(raw, token, "dead", json.dumps(payload), DEAD_LETTER_LIMIT):
+                self.counters["dead"] += 1
+        else:
+            due = time.time() + self.retry_delay(payload["attempts"])
+            if await self._settle(raw, token, "retry", json.dumps(payload), due):
+                self.counters["retried"] += 1
+
+    async def _deliver(self, raw: str, token: str) -> None:
+        try:
+            payload = json.loads(raw)
+            envelope = (payload["sender"], payload["recipients"], payload["message"])
+            payload["attempts"] = int(payload.get("attempts", 0))
+        except (ValueError, TypeError, KeyError) as error:
+            # It would fail the same way on every claim; keep it for inspection
+            logger.error("Mail worker dropped a malformed message: %r", error)
+            await self._fail(raw, token, {"raw": raw, "attempts": 0}, error, permanent=True)
+            return
+        try:
+            await self.pool.send(*envelope)
+        except (aiosmtplib.SMTPException, OSError) as error:
+            await self._fail(raw, token, payload, error, permanent=is_permanent_failure(error))
+            return
+        except Exception as error:
+            logger.exception("Mail worker could not send message %s", payload.get("id"))
+            await self._fail(raw, token, payload, error, permanent=True)
+            return
+        if await self._settle(raw, token, "sent"):
+            self.counters["sent"] += 1
+
+    async def _renew_leases(self, batch: list[str], token: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            # Only messages still held by this claim are touched; settled ones stay gone
+            try:
+                await self.redis.eval(
+                    RENEW_SCRIPT, 2, PROCESSING_KEY, LEASES_KEY, token, time.time() + self.lease_seconds, *batch
+                )
+            except (RedisError, OSError) as error:
+                self.counters["redis_errors"] += 1
+                logger.warning("Mail worker could not renew its leases: %s", error)
+
+    async def run_once(self) -> int:
+        """
+        Claims one batch of messages and sends it, renewing the leases meanwhile.
+
+        Returns:
+            int: Number of messages claimed.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        batch = await self.redis.eval(
+            CLAIM_SCRIPT, 4, QUEUE_KEY, RETRY_KEY, PROCESSING_KEY, LEASES_KEY,
+            now, now + self.lease_seconds, self.batch_size, token,
+        )
+        if not batch:
+            return 0
+        renewal = asyncio.create_task(self._renew_leases(batch, token))
+        try:
+            await asyncio.gather(*(self._deliver(raw, token) for raw in batch))
+        finally:
+            renewal.cancel()
+            with suppress(asyncio.CancelledError):
+                await renewal
+        return len(batch)
+
+    async def run(self) -> None:
+        """Sends queued messages until :meth:`stop` is called."""
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_once()
+            except (RedisError, OSError) as error:
+                self.counters["redis_errors"] += 1
+                logger.warning("Mail worker could not reach Redis: %s", error)
+                claimed = 0
+            except Exception:
+                # Keep running; an unacknowledged batch is claimed again when its leases expire
+                self.counters["errors"] += 1
+                logger.exception("Mail worker failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+
+    def start(self) -> None:
+        """Runs the worker in a task of the running event loop."""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Finishes the batch in flight, stops the worker and closes its SMTP sessions."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.pool.close()
+
+    def stats(self) -> dict:
+        """
+        Reports delivery counters of this worker.
+
+        Returns:
+            dict: Messages sent, scheduled for retry and given up on, Redis and unexpected errors,
+            and pool counters.
+        """
+        return {**self.counters, "running": self._task is not None, "pool": self.pool.stats()}
@@ -0,0 +1,78 @@
+from collections.abc import Mapping
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from src.conf.config import settings
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+
+class MailTemplates:
+    """
+    Email templates compiled once into a shared Jinja environment.
+
+    :meth:`compile_all` loads every template of the folder, usually at
+    startup; a template not loaded yet is compiled on first use. Compiled
+    templates are kept for the life of the process and are not reloaded when
+    their file changes. The bytecode cache on disk lets later processes skip
+    parsing templates that have not changed.
+
+    Attributes:
+        environment (Environment): The Jinja environment the templates are compiled in.
+    """
+
+    def __init__(self, folder: Path, cache_dir: str | None = None):
+        bytecode_cache = FileSystemBytecodeCache(cache_dir) if cache_dir else FileSystemBytecodeCache()
+        self.environment = Environment(
+            loader=FileSystemLoader(folder),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+        )
+        self._compiled: dict[str, Template] = {}
+
+    def compile_all(self) -> list[str]:
+        """
+        Compiles every template of the folder.
+
+        Returns:
+            list[str]: Names of the compiled templates.
+        """
+        names = self.environment.list_templates()
+        for name in names:
+            self.get(name)
+        return names
+
+    def get(self, name: str) -> Template:
+        """
+        Returns a compiled template, compiling it if needed.
+
+        Args:
+            name (str): Template name, relative to the templates folder.
+
+        Returns:
+            Template: The compiled template.
+
+        Raises:
+            jinja2.TemplateNotFound: If there is no such template.
+        """
+        template = self._compiled.get(name)
+        if template is None:
+            template = self._compiled[name] = self.environment.get_template(name)
+        return template
+
+    def render(self, name: str, context: Mapping) -> str:
+        """
+        Renders a template.
+
+        Args:
+            name (str): Template name, relative to the templates folder.
+            context (Mapping): Variables available to the template.
+
+        Returns:
+            str: The rendered text.
+        """
+        return self.get(name).render(context)
+
+
+mail_templates = MailTemplates(TEMPLATE_FOLDER, settings.mail_template_cache_dir)
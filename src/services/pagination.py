@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Builds an opaque keyset cursor pointing right after a contact.
+
+    Args:
+        last_id (int): ID of the last contact on the current page.
+
+    Returns:
+        str: URL-safe cursor for the next page.
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Reads the contact ID stored in a keyset cursor.
+
+    Args:
+        cursor (str): Cursor previously returned by :func:`encode_cursor`.
+
+    Returns:
+        int: ID the next page starts after.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        last_id = None
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return last_id
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import ipaddress
+import math
+import time
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from jose import JWTError
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError, RedisError
+
+from src.conf.config import settings
+from src.database.redis_db import get_redis
+from src.services.auth import auth_service
+from src.services.cache import TTLCache
+
+# Adds a batch of hits to the current fixed window and returns the sliding
+# window estimate: the previous window weighted by the part of it still inside
+# the sliding window, plus the current one.
+SLIDING_WINDOW_SCRIPT = """
+local hits = redis.call('INCRBY', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2] * 2)
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+return math.ceil(previous * (1 - tonumber(ARGV[3])) + hits)
+"""
+SLIDING_WINDOW_SHA = hashlib.sha1(SLIDING_WINDOW_SCRIPT.encode()).hexdigest()
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "pending")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.pending = 0
+
+
+class RateLimiter:
+    """
+    Per-user rate limit checked in process and synchronised with Redis in batches.
+
+    Each worker keeps a token bucket per key that refills at ``times`` per
+    ``seconds``, so most requests are decided without leaving the process. The
+    hits of a key are sent to a Redis sliding window counter, shared by all
+    workers, once ``batch`` of them are pending or when the bucket runs low; the
+    global count then caps the local bucket. A worker can therefore let through
+    up to ``batch`` requests more than the limit before it learns about the
+    others. If Redis is unreachable, limiting continues with the local buckets
+    alone and Redis is retried after ``offline_seconds``.
+
+    Requests are keyed by the subject of a valid bearer token, and by client
+    address otherwise, separately for every route. ``X-Forwarded-For`` is only
+    honoured from peers in ``settings.rate_limit_trusted_proxies``; anyone else
+    could pick a fresh address for every request.
+
+    Attributes:
+        times (int): Requests allowed per window.
+        seconds (int): Window length in seconds.
+        batch (int): Number of local hits sent to Redis at once.
+    """
+
+    offline_until = 0.0
+    counters = {"allowed": 0, "rejected": 0, "syncs": 0, "sync_errors": 0}
+
+    def __init__(
+        self,
+        times: int,
+        seconds: int,
+        batch: int | None = None,
+        max_keys: int = 10000,
+        sync_timeout: float = 0.25,
+        offline_seconds: float = 5.0,
+    ):
+        self.times = times
+        self.seconds = seconds
+        self.batch = batch or max(1, times // 4)
+        self.sync_timeout = sync_timeout
+        self.offline_seconds = offline_seconds
+        self._rate = times / seconds
+        # An idle bucket is full again after one window, so it can be forgotten
+        self._buckets = TTLCache(ttl=seconds, max_entries=max_keys)
+
+    async def __call__(
+        self, request: Request, response: Response, redis: Redis = Depends(get_redis)
+    ) -> None:
+        key = f"{self._route(request)}:{self._identity(request)}"
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(float(self.times), now)
+        else:
+            bucket.tokens = min(self.times, bucket.tokens + (now - bucket.updated) * self._rate)
+            bucket.updated = now
+        self._buckets.set(key, bucket)
+
+        if bucket.tokens < 1:
+            self.counters["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(math.ceil((1 - bucket.tokens) / self._rate))},
+            )
+        bucket.tokens -= 1
+        bucket.pending += 1
+        self.counters["allowed"] += 1
+
+        if bucket.pending >= self.batch or bucket.tokens < self.batch:
+            await self._sync(redis, key, bucket)
+
+    async def _sync(self, redis: Redis, key: str, bucket: _Bucket) -> None:
+        if time.monotonic() < RateLimiter.offline_until:
+            return
+        hits, bucket.pending = bucket.pending, 0
+        now = time.time()
+        window = int(now // self.seconds)
+        args = (
+            2,
+            f"ratelimit:{key}:{window}",
+            f"ratelimit:{key}:{window - 1}",
+            hits,
+            self.seconds,
+            now / self.seconds - window,
+        )
+        try:
+            count = await asyncio.wait_for(self._eval(redis, args), self.sync_timeout)
+        except (RedisError, OSError, asyncio.TimeoutError):
+            self.counters["sync_errors"] += 1
+            RateLimiter.offline_until = time.monotonic() + self.offline_seconds
+            return
+        self.counters["syncs"] += 1
+        bucket.tokens = min(bucket.tokens, max(0, self.times - int(count)))
+
+    @staticmethod
+    async def _eval(redis: Redis, args: tuple) -> int:
+        try:
+            return await redis.evalsha(SLIDING_WINDOW_SHA, *args)
+        except NoScriptError:
+            return await redis.eval(SLIDING_WINDOW_SCRIPT, *args)
+
+    @staticmethod
+    def _route(request: Request) -> str:
+        route = request.scope.get("route")
+        return f"{request.method}:{getattr(route, 'path', request.url.path)}"
+
+    @staticmethod
+    def _identity(request: Request) -> str:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                claims = auth_service.verify_access_token(token)
+            except JWTError:
+                claims = {}
+            if claims.get("scope") == "access_token" and claims.get("sub"):
+                return f"user:{claims['sub']}"
+        return f"ip:{RateLimiter._client_address(request)}"
+
+    @staticmethod
+    def _client_address(request: Request) -> str:
+        host = getattr(request.client, "host", "")
+        networks = [ipaddress.ip_network(network) for network in settings.rate_limit_trusted_proxies]
+
+        def parse(address: str):
+            try:
+                return ipaddress.ip_address(address.strip())
+            except ValueError:
+                return None
+
+        def trusted(address) -> bool:
+            return any(address in network for network in networks)
+
+        peer = parse(host)
+        if peer is None or not trusted(peer):
+            return host
+        # Proxies append the address they received the request from, so the
+        # client is the last valid hop that none of our proxies added
+        hops = [parse(hop) for hop in request.headers.get("x-forwarded-for", "").split(",")]
+        for hop in reversed(hops):
+            if hop is None:
+                break
+            if not trusted(hop):
+                return str(hop)
+        return host
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Reports rate limiter counters shared by all routes.
+
+        Returns:
+            dict: Allowed and rejected requests, Redis syncs and failures, and whether Redis is skipped.
+        """
+        return {**cls.counters, "redis_offline": time.monotonic() < cls.offline_until}
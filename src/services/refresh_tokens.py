@@ -0,0 +1,110 @@
+import hashlib
+import uuid
+
+import redis.asyncio as redis
+
+# Lifetime of a refresh token, and of the Redis state tracking it
+REFRESH_TOKEN_TTL = 7 * 24 * 3600
+
+FAMILY_KEY = "refresh:family:{}"
+LEGACY_KEY = "refresh:legacy:{}"
+
+# Moves a family to its next token if the presented one is the current one.
+# Presenting any other token of the family revokes it.
+ROTATE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return -1
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class RefreshTokenRejected(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused."""
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+
+async def start_family(client: redis.Redis, ttl: int = REFRESH_TOKEN_TTL) -> dict:
+    """
+    Starts a token family for a new login.
+
+    A family is the chain of refresh tokens obtained from one login by
+    rotation. Redis keeps only the ID of its current token, expiring together
+    with that token.
+
+    Args:
+        client (redis.Redis): Redis client.
+        ttl (int): Lifetime of the first token in seconds.
+
+    Returns:
+        dict: ``fid`` and ``jti`` claims to embed in the refresh token.
+    """
+    claims = {"fid": _new_id(), "jti": _new_id()}
+    await client.set(FAMILY_KEY.format(claims["fid"]), claims["jti"], ex=ttl)
+    return claims
+
+
+async def rotate(client: redis.Redis, fid: str, jti: str, ttl: int = REFRESH_TOKEN_TTL) -> dict:
+    """
+    Exchanges the current token of a family for the next one, atomically.
+
+    Presenting a token that is no longer current means it was stolen or
+    replayed, so the whole family is revoked and its legitimate holder has to
+    log in again.
+
+    Args:
+        client (redis.Redis): Redis client.
+        fid (str): Family ID from the presented token.
+        jti (str): Token ID from the presented token.
+        ttl (int): Lifetime of the next token in seconds.
+
+    Returns:
+        dict: ``fid`` and ``jti`` claims for the next refresh token.
+
+    Raises:
+        RefreshTokenRejected: If the family is unknown, expired or revoked, or the token was reused.
+    """
+    next_jti = _new_id()
+    result = await client.eval(ROTATE_SCRIPT, 1, FAMILY_KEY.format(fid), jti, next_jti, ttl)
+    if int(result) != 1:
+        raise RefreshTokenRejected(fid)
+    return {"fid": fid, "jti": next_jti}
+
+
+async def revoke_family(client: redis.Redis, fid: str) -> None:
+    """
+    Revokes all refresh tokens of a family.
+
+    Args:
+        client (redis.Redis): Redis client.
+        fid (str): Family ID.
+    """
+    await client.delete(FAMILY_KEY.format(fid))
+
+
+async def consume_legacy_token(client: redis.Redis, token: str, ttl: int = REFRESH_TOKEN_TTL) -> bool:
+    """
+    Marks a refresh token issued before token families as used.
+
+    Such tokens are checked against ``users.refresh_token`` once and then
+    exchanged for a family; the marker makes a second use count as reuse.
+
+    Args:
+        client (redis.Redis): Redis client.
+        token (str): The legacy refresh token.
+        ttl (int): How long to remember the token, at least its remaining lifetime.
+
+    Returns:
+        bool: True the first time a token is presented, False afterwards.
+    """
+    key = LEGACY_KEY.format(hashlib.sha256(token.encode()).hexdigest())
+    return bool(await client.set(key, 1, nx=True, ex=ttl))
@@ -0,0 +1,202 @@
+import hashlib
+import uuid
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Awaitable, Callable
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Response, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+
+VERSION_KEY = "contacts_version:{}"
+ENTRY_KEY = "response:{}:{}:{}?{}"
+JSON_MEDIA_TYPE = "application/json"
+# Clients may keep responses but must revalidate them with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+Producer = Callable[[], Awaitable[tuple[bytes, dict[str, str]]]]
+
+
+def _ttl() -> int:
+    return max(1, int(settings.response_cache_ttl))
+
+
+async def owner_version(redis: Redis, user_id: int) -> str | None:
+    """
+    Returns the version of a user's contacts.
+
+    The version is a random token, created whenever the key is missing: after
+    a write, an eviction or a Redis restart. Tokens are never reused, so a
+    lost key can never bring back an ETag that clients already hold. The
+    token expires with the responses cached under it.
+
+    Args:
+        redis (Redis): Redis client.
+        user_id (int): Owner of the contacts.
+
+    Returns:
+        str | None: The version, or None if Redis is unreachable.
+    """
+    key = VERSION_KEY.format(user_id)
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, uuid.uuid4().hex, nx=True, ex=_ttl())
+            pipe.get(key)
+            _, version = await pipe.execute()
+    except (RedisError, OSError):
+        return None
+    return version
+
+
+@asynccontextmanager
+async def invalidating(redis: Redis, user_id: int) -> AsyncIterator[None]:
+    """
+    Invalidates every cached response and ETag about a user's contacts around a write.
+
+    The version is dropped before the write, so the write is refused when
+    Redis is unreachable instead of leaving validators that would still
+    match. It is dropped again afterwards, discarding responses cached from
+    the old data while the write was running.
+
+    Args:
+        redis (Redis): Redis client.
+        user_id (int): Owner of the contacts.
+
+    Raises:
+        HTTPException: 503 if Redis cannot be reached before the write.
+    """
+    key = VERSION_KEY.format(user_id)
+    try:
+        await redis.delete(key)
+    except (RedisError, OSError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Response cache is unavailable, try again later",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        # Left to expire with the cache if Redis went away during the write
+        with suppress(RedisError, OSError):
+            await redis.delete(key)
+
+
+def entry_key(user_id: int, version: str, route: str, params: dict) -> str:
+    """
+    Builds the cache key of a response.
+
+    Args:
+        user_id (int): Owner of the contacts.
+        version (str): Current version of the owner's contacts, see :func:`owner_version`.
+        route (str): Name of the route.
+        params (dict): Parameters the response depends on; None values are left out.
+
+    Returns:
+        str: The Redis key.
+    """
+    query = urlencode(sorted((name, value) for name, value in params.items() if value is not None))
+    return ENTRY_KEY.format(user_id, version, route, query)
+
+
+def entity_tag(key: str) -> str:
+    """
+    Derives the strong ETag of a response from its cache key.
+
+    The key holds the owner's contacts version and every parameter of the
+    response, so equal keys always stand for byte-identical bodies.
+
+    Args:
+        key (str): Cache key from :func:`entry_key`.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks an ``If-None-Match`` header against an entity tag.
+
+    Args:
+        if_none_match (str | None): Header value, a list of tags or ``*``.
+        etag (str): Current entity tag.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+async def cached_json(
+    redis: Redis,
+    user_id: int,
+    route: str,
+    params: dict,
+    produce: Producer,
+    if_none_match: str | None = None,
+    store: bool = True,
+) -> Response:
+    """
+    Serves a JSON response from the cache, or produces and caches it.
+
+    Entries hold the serialized body and the extra headers, so a hit skips the
+    database and serialization alike. Responses carry a strong ``ETag``; when
+    ``If-None-Match`` matches it, a bodiless 304 is returned before the cache
+    or the database is consulted. Without Redis, or with caching disabled by a
+    zero ``response_cache_ttl``, the response is produced every time and has
+    no ETag. With ``store`` false a miss is produced but neither cached nor
+    given an ETag, for bodies read from a replica that may lag behind the
+    version; hits and 304s are still served.
+
+    Args:
+        redis (Redis): Redis client.
+        user_id (int): Owner of the contacts.
+        route (str): Name of the route.
+        params (dict): Parameters the response depends on.
+        produce (Producer): Coroutine function returning the body and extra headers.
+        if_none_match (str | None): ``If-None-Match`` header of the request.
+        store (bool): Whether a produced response may be cached and validated.
+
+    Returns:
+        Response: The JSON response, or a 304 response.
+    """
+    version = None
+    if settings.response_cache_ttl > 0:
+        version = await owner_version(redis, user_id)
+    if version is None:
+        body, headers = await produce()
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+    key = entry_key(user_id, version, route, params)
+    etag = entity_tag(key)
+    validators = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+    try:
+        entry = await redis.hgetall(key)
+    except (RedisError, OSError):
+        entry = None
+    if entry:
+        body = entry.pop("body")
+        return Response(body.encode(), media_type=JSON_MEDIA_TYPE, headers={**entry, **validators})
+
+    body, headers = await produce()
+    if not store:
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={"body": body, **headers})
+            pipe.expire(key, _ttl())
+            await pipe.execute()
+    except (RedisError, OSError):
+        pass
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers={**headers, **validators})
@@ -0,0 +1,120 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterable, List, NamedTuple
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from src.schemas import ContactResponse
+
+# Field names in the order ContactResponse serializes them
+CONTACT_FIELDS = tuple(ContactResponse.model_fields)
+
+
+class _Serializer(NamedTuple):
+    fields: tuple[str, ...]
+    attributes: Callable[[Any], tuple]
+    items: Callable[[Any], tuple]
+    row: TypeAdapter
+    rows: TypeAdapter
+
+
+def _getter(factory, fields: tuple[str, ...]) -> Callable[[Any], tuple]:
+    getter = factory(*fields)
+    # A single-field getter returns the bare value instead of a tuple
+    return getter if len(fields) > 1 else lambda contact: (getter(contact),)
+
+
+@lru_cache(maxsize=None)
+def _serializer(fields: tuple[str, ...]) -> _Serializer:
+    # Same fields and types as ContactResponse, serialized from plain dicts
+    row_type = TypedDict(
+        "ContactRow", {name: ContactResponse.model_fields[name].annotation for name in fields}
+    )
+    return _Serializer(
+        fields,
+        _getter(attrgetter, fields),
+        _getter(itemgetter, fields),
+        TypeAdapter(row_type),
+        TypeAdapter(List[row_type]),
+    )
+
+
+def parse_fields(value: str | None) -> tuple[str, ...]:
+    """
+    Parses a ``fields`` query parameter into ContactResponse field names.
+
+    ``id`` is always included, and the fields keep their ContactResponse order
+    whatever order they were requested in.
+
+    Args:
+        value (str | None): Comma-separated field names, or None for all fields.
+
+    Returns:
+        tuple[str, ...]: The selected field names.
+
+    Raises:
+        HTTPException: If a name is not a ContactResponse field.
+    """
+    if not value:
+        return CONTACT_FIELDS
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(CONTACT_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                   f"Available fields: {', '.join(CONTACT_FIELDS)}.",
+        )
+    return tuple(name for name in CONTACT_FIELDS if name == "id" or name in requested)
+
+
+def contact_row(contact: Any, fields: tuple[str, ...] = CONTACT_FIELDS) -> dict:
+    """
+    Extracts ContactResponse fields of a contact.
+
+    Args:
+        contact (Any): ORM contact, result row or mapping with the contact columns.
+        fields (tuple[str, ...]): Fields to extract, from :func:`parse_fields`.
+
+    Returns:
+        dict: Field values keyed by field name.
+    """
+    serializer = _serializer(fields)
+    getter = serializer.items if isinstance(contact, Mapping) else serializer.attributes
+    return dict(zip(fields, getter(contact)))
+
+
+def contact_json(contact: Any, fields: tuple[str, ...] = CONTACT_FIELDS) -> bytes:
+    """
+    Serializes one contact to the JSON of a ContactResponse.
+
+    Args:
+        contact (Any): ORM contact, result row or mapping with the contact columns.
+        fields (tuple[str, ...]): Fields to include, from :func:`parse_fields`.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    return _serializer(fields).row.dump_json(contact_row(contact, fields))
+
+
+def contact_list_json(contacts: Iterable[Any], fields: tuple[str, ...] = CONTACT_FIELDS) -> bytes:
+    """
+    Serializes contacts to the JSON of a ``List[ContactResponse]``.
+
+    Values are read straight from the contacts and dumped by pydantic-core in
+    one call, without building and validating a ContactResponse per contact.
+    They are trusted to be valid, as they come from the database.
+
+    Args:
+        contacts (Iterable[Any]): ORM contacts, result rows or mappings with the contact columns.
+        fields (tuple[str, ...]): Fields to include, from :func:`parse_fields`.
+
+    Returns:
+        bytes: The JSON array.
+    """
+    serializer = _serializer(fields)
+    return serializer.rows.dump_json([contact_row(contact, fields) for contact in contacts])
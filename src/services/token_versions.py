@@ -0,0 +1,33 @@
+import redis.asyncio as redis
+
+VERSION_KEY = "token_version:{}"
+
+
+async def get_version(client: redis.Redis, user_id: int) -> int:
+    """
+    Returns the current token version of a user.
+
+    Tokens carrying an older version than this are revoked.
+
+    Args:
+        client (redis.Redis): Redis client.
+        user_id (int): User ID.
+
+    Returns:
+        int: The version, 0 for users whose tokens were never revoked.
+    """
+    return int(await client.get(VERSION_KEY.format(user_id)) or 0)
+
+
+async def bump_version(client: redis.Redis, user_id: int) -> int:
+    """
+    Revokes all stateless tokens issued to a user so far.
+
+    Args:
+        client (redis.Redis): Redis client.
+        user_id (int): User ID.
+
+    Returns:
+        int: The new version, to embed in tokens issued from now on.
+    """
+    return await client.incr(VERSION_KEY.format(user_id))
@@ -1,11 +1,23 @@
+from contextlib import contextmanager
+from datetime import date
+from uuid import uuid4
+
+import fakeredis
 import pytest
+from fastapi import Request, Response
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 
 from main import app
-from src.database.models import Base
-from src.database.db import get_db
+from src.database.models import Base, Contact, User
+from src.database.db import get_db, get_read_db, make_async_url
+from src.database.redis_db import get_redis
+from src.services.auth import Principal, auth_service
+from src.services.rate_limit import RateLimiter
+from src.services.cache import token_cache, user_cache
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -17,8 +29,48 @@ TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cached users would leak between tests using different databases
+    user_cache.clear()
+    token_cache.clear()
+    yield
+    user_cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture(scope="module", params=["sync", "async"])
+def db_mode(request):
+    # Route tests run against synchronous sessions and, as with DB_ASYNC=true, asyncio sessions
+    return request.param
+
+
+def async_sessions(url):
+    # Every TestClient request runs in its own event loop, so connections are not pooled
+    engine = create_async_engine(make_async_url(url), poolclass=NullPool)
+    return engine, async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+def session_override(db_mode, url, sync_session):
+    # get_db override yielding sync_session, or a new asyncio session on the same database
+    if db_mode == "sync":
+        def override_get_db():
+            yield sync_session
+
+        return override_get_db, None
+
+    engine, session_local = async_sessions(url)
+
+    async def override_get_async_db():
+        # Carries markers such as "replica" set on the synchronous session
+        async with session_local(info=dict(sync_session.info)) as db:
+            yield db
+
+    return override_get_async_db, engine
+
+
 @pytest.fixture(scope="module")
-def session():
+def session(db_mode):
     # Create the database
 
     Base.metadata.drop_all(bind=engine)
@@ -32,16 +84,37 @@ def session():
 
 
 @pytest.fixture(scope="module")
-def client(session):
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def fake_redis(redis_server):
+    return fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+
+
+@pytest.fixture(scope="module")
+def client(db_mode, session, redis_server):
     # Dependency override
 
-    def override_get_db():
+    def override_get_sync_db():
         try:
             yield session
         finally:
             session.close()
 
+    if db_mode == "sync":
+        override_get_db = override_get_sync_db
+    else:
+        override_get_db, _ = session_override(db_mode, SQLALCHEMY_DATABASE_URL, session)
+
+    def override_get_redis():
+        # A client per request: every TestClient request runs in its own event loop
+        return fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_redis] = override_get_redis
 
     yield TestClient(app)
 
@@ -49,3 +122,103 @@ def client(session):
 @pytest.fixture(scope="module")
 def user():
     return {"username": "deadpool", "email": "deadpool@example.com", "password": "123456789", "avatar": ""}
+
+
+@pytest.fixture
+def memory_session():
+    # Isolated in-memory database for repository tests, usable from the threadpool.
+    # The shared cache lets an asyncio engine open the same database, see contacts_client.
+
+    memory_engine = create_engine(
+        f"sqlite:///file:memory{uuid4().hex}?mode=memory&cache=shared&uri=true",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=memory_engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        memory_engine.dispose()
+
+
+@pytest.fixture
+def owner(memory_session):
+    owner = User(username="owner", email="owner@example.com", password="secret")
+    memory_session.add(owner)
+    memory_session.commit()
+    return owner
+
+
+@pytest.fixture
+def contacts_client(db_mode, memory_session, owner, monkeypatch):
+    # Contact routes served from memory_session's database to the owner, without rate limits
+
+    async def no_limit(self, request: Request, response: Response, redis=None):
+        return None
+
+    override_get_db, async_engine = session_override(
+        db_mode, memory_session.get_bind().url.render_as_string(), memory_session)
+    if async_engine is not None:
+        # Lets count_statements see what the routes run
+        monkeypatch.setitem(memory_session.info, "async_bind", async_engine.sync_engine)
+
+    monkeypatch.setattr(RateLimiter, "__call__", no_limit)
+    redis_server = fakeredis.FakeServer()
+    principal = Principal(id=owner.id, email=owner.email, confirmed=owner.confirmed)
+    overrides = {
+        get_db: override_get_db,
+        get_read_db: override_get_db,
+        get_redis: lambda: fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True),
+        auth_service.get_current_principal: lambda: principal,
+    }
+    saved = {dependency: app.dependency_overrides.get(dependency) for dependency in overrides}
+    app.dependency_overrides.update(overrides)
+    try:
+        yield TestClient(app)
+    finally:
+        for dependency, override in saved.items():
+            if override is None:
+                app.dependency_overrides.pop(dependency, None)
+            else:
+                app.dependency_overrides[dependency] = override
+
+
+def make_contacts(db, owner, count, **overrides):
+    contacts = [
+        Contact(
+            **{
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"contact{i}@example.com",
+                "phone_number": "1234567890",
+                "birthday": date(1990, 1, 1),
+                "owner_id": owner.id,
+                **overrides,
+            }
+        )
+        for i in range(count)
+    ]
+    db.add_all(contacts)
+    db.commit()
+    return contacts
+
+
+@contextmanager
+def count_statements(db):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    binds = [db.get_bind()]
+    if "async_bind" in db.info:
+        binds.append(db.info["async_bind"])
+    for bind in binds:
+        event.listen(bind, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        for bind in binds:
+            event.remove(bind, "before_cursor_execute", before_execute)
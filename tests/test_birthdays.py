@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from conftest import make_contacts
+from src.database.models import Contact
+from src.repository.contacts import birthday_windows, get_contacts_with_upcoming_birthdays
+
+
+@pytest.mark.parametrize(
+    "today, days, expected",
+    [
+        (date(2024, 3, 10), 7, [(310, 316)]),
+        (date(2024, 12, 28), 7, [(1228, 1231), (101, 103)]),
+        (date(2023, 2, 22), 7, [(222, 229)]),
+        (date(2024, 2, 22), 7, [(222, 228)]),
+        (date(2023, 3, 1), 7, [(301, 307)]),
+        (date(2024, 6, 1), 366, [(101, 1231)]),
+        (date(2024, 6, 1), 365, [(601, 1231), (101, 531)]),
+        # 2024 is a leap year, so 365 days from New Year end on December 30
+        (date(2024, 1, 1), 365, [(101, 1230)]),
+        (date(2023, 1, 1), 365, [(101, 1231)]),
+    ],
+)
+def test_birthday_windows(today, days, expected):
+    assert birthday_windows(today, days) == expected
+
+
+def test_birthday_md_is_maintained(memory_session, owner):
+    contact, = make_contacts(memory_session, owner, 1, birthday=date(1990, 7, 4))
+    assert contact.birthday_md == 704
+
+    contact.birthday = date(1985, 11, 30)
+    memory_session.commit()
+    memory_session.refresh(contact)
+    assert contact.birthday_md == 1130
+
+    memory_session.execute(insert(Contact), [{
+        "first_name": "Core", "last_name": "Insert", "email": "core@example.com",
+        "phone_number": "1234567890", "birthday": date(2000, 1, 2), "owner_id": owner.id,
+    }])
+    core = memory_session.query(Contact).filter_by(email="core@example.com").one()
+    assert core.birthday_md == 102
+
+
+def test_upcoming_birthdays_wrap_year_end(memory_session, owner):
+    contacts = make_contacts(memory_session, owner, 4)
+    for contact, birthday in zip(
+        contacts, [date(1990, 12, 30), date(1980, 1, 2), date(1970, 1, 10), date(1999, 6, 1)]
+    ):
+        contact.birthday = birthday
+    memory_session.commit()
+
+    upcoming = get_contacts_with_upcoming_birthdays(
+        memory_session, owner, days=7, today=date(2024, 12, 29))
+    assert [c.id for c in upcoming] == [contacts[0].id, contacts[1].id]
+
+
+def test_leap_day_birthday_in_common_year(memory_session, owner):
+    contact, = make_contacts(memory_session, owner, 1, birthday=date(2000, 2, 29))
+    assert get_contacts_with_upcoming_birthdays(
+        memory_session, owner, days=1, today=date(2023, 2, 28)) == [contact]
+    assert get_contacts_with_upcoming_birthdays(
+        memory_session, owner, days=7, today=date(2023, 3, 1)) == []
+
+
+def test_year_long_window_in_a_leap_year(memory_session, owner):
+    new_years_eve, = make_contacts(memory_session, owner, 1, birthday=date(1990, 12, 31))
+    # Day 366 of a window starting on January 1, 2024
+    assert get_contacts_with_upcoming_birthdays(
+        memory_session, owner, days=365, today=date(2024, 1, 1)) == []
+    assert get_contacts_with_upcoming_birthdays(
+        memory_session, owner, days=366, today=date(2024, 1, 1)) == [new_years_eve]
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from src.repository.contacts import (
+    CONTACT_COLUMNS,
+    get_contact,
+    get_contact_row,
+    get_contact_rows,
+    get_contacts,
+    get_contacts_with_upcoming_birthdays,
+    get_upcoming_birthday_rows,
+    search_contact_rows,
+    search_contacts,
+)
+
+from conftest import make_contacts
+
+
+def as_tuples(contacts):
+    return [tuple(getattr(contact, column.key) for column in CONTACT_COLUMNS) for contact in contacts]
+
+
+def test_row_variants_return_the_same_contacts(memory_session, owner):
+    make_contacts(memory_session, owner, 12, birthday=date(1990, 12, 30))
+    memory_session.refresh(owner)
+    first_id = get_contacts(memory_session, owner, limit=1)[0].id
+
+    assert as_tuples(get_contact_rows(memory_session, owner, skip=2, limit=5)) == \
+        as_tuples(get_contacts(memory_session, owner, skip=2, limit=5))
+    assert as_tuples([get_contact_row(memory_session, first_id, owner)]) == \
+        as_tuples([get_contact(memory_session, first_id, owner)])
+    assert as_tuples(search_contact_rows(memory_session, "Last1", owner)) == \
+        as_tuples(search_contacts(memory_session, "Last1", owner))
+    today = date(2024, 12, 29)
+    assert as_tuples(get_upcoming_birthday_rows(memory_session, owner, today=today)) == \
+        as_tuples(get_contacts_with_upcoming_birthdays(memory_session, owner, today=today))
+
+
+def test_row_variants_leave_the_identity_map_empty(memory_session, owner):
+    make_contacts(memory_session, owner, 5)
+    memory_session.refresh(owner)
+    memory_session.expunge_all()
+
+    rows = get_contact_rows(memory_session, owner, limit=10)
+    rows += search_contact_rows(memory_session, "example", owner)
+    rows += get_upcoming_birthday_rows(memory_session, owner, days=366)
+    rows.append(get_contact_row(memory_session, rows[0].id, owner))
+    assert len(rows) == 16
+    assert not memory_session.identity_map
+
+    with pytest.raises(HTTPException) as error:
+        get_contact_row(memory_session, 999, owner)
+    assert error.value.status_code == 404
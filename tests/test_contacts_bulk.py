@@ -0,0 +1,95 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from src.database.models import Contact, User
+from src.repository.contacts import bulk_delete_contacts, bulk_update_contacts
+from src.schemas import ContactBulkUpdate, ContactSelection, ContactUpdate
+
+from conftest import make_contacts
+
+
+@pytest.fixture
+def stranger(memory_session):
+    stranger = User(username="stranger", email="stranger@example.com", password="secret")
+    memory_session.add(stranger)
+    memory_session.commit()
+    memory_session.add(
+        Contact(first_name="First0", last_name="Other", email="other@example.com",
+                phone_number="1", birthday=date(1990, 1, 1), owner_id=stranger.id)
+    )
+    memory_session.commit()
+    return stranger
+
+
+def test_selection_must_not_be_empty():
+    with pytest.raises(ValidationError):
+        ContactSelection()
+    with pytest.raises(ValidationError):
+        ContactSelection(filter={})
+    with pytest.raises(ValidationError):
+        ContactBulkUpdate(ids=[1], changes={})
+    assert ContactSelection(filter={"last_name": "Doe"}).ids is None
+
+
+def test_bulk_update_by_ids(memory_session, owner, stranger):
+    mine = make_contacts(memory_session, owner, 3)
+    other_id = memory_session.query(Contact.id).filter(Contact.owner_id == stranger.id).scalar()
+    ids = [mine[0].id, mine[2].id, other_id]
+    memory_session.refresh(owner)
+    memory_session.expunge_all()
+
+    updated = bulk_update_contacts(
+        memory_session,
+        ContactSelection(ids=ids),
+        ContactUpdate(birthday=date(1985, 12, 31), additional_info="vip"),
+        owner,
+    )
+    assert updated == sorted(ids[:2])
+    assert not memory_session.identity_map
+
+    rows = memory_session.query(Contact).order_by(Contact.id).all()
+    assert [(c.additional_info, c.birthday_md) for c in rows if c.owner_id == owner.id] == [
+        ("vip", 1231), (None, 101), ("vip", 1231)
+    ]
+    assert [c.additional_info for c in rows if c.owner_id == stranger.id] == [None]
+
+
+def test_bulk_update_by_filter_and_conflicts(memory_session, owner, stranger):
+    make_contacts(memory_session, owner, 3)
+    selection = ContactSelection(filter={"first_name": "First0"})
+
+    assert len(bulk_update_contacts(
+        memory_session, selection, ContactUpdate(last_name="Renamed"), owner)) == 1
+
+    with pytest.raises(HTTPException) as error:
+        bulk_update_contacts(
+            memory_session, ContactSelection(filter={"last_name": "Last1"}),
+            ContactUpdate(email="other@example.com"), owner,
+        )
+    assert error.value.status_code == 409
+
+    with pytest.raises(HTTPException) as error:
+        bulk_update_contacts(memory_session, selection, ContactUpdate(last_name=None), owner)
+    assert error.value.status_code == 422
+
+
+def test_bulk_delete_by_filter(memory_session, owner, stranger):
+    make_contacts(memory_session, owner, 4)
+    memory_session.query(Contact).filter(Contact.email == "contact3@example.com").update(
+        {Contact.birthday: date(2000, 6, 1)})
+    memory_session.commit()
+
+    deleted = bulk_delete_contacts(
+        memory_session,
+        ContactSelection(filter={"birthday_to": date(1999, 1, 1), "first_name": "First0"}),
+        owner,
+    )
+    assert len(deleted) == 1
+    deleted += bulk_delete_contacts(
+        memory_session, ContactSelection(filter={"birthday_from": date(1980, 1, 1)}), owner)
+    assert len(deleted) == 4
+    assert memory_session.query(Contact).filter(Contact.owner_id == owner.id).count() == 0
+    assert memory_session.query(Contact).filter(Contact.owner_id == stranger.id).count() == 1
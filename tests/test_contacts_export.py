@@ -0,0 +1,106 @@
+import io
+import json
+from datetime import date
+
+import pytest
+from fastapi import Request, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from src.database.db import get_read_sessionmaker
+from src.database.models import Base, User
+from src.repository.contacts import iter_contact_batches
+from src.services.auth import auth_service
+from src.services.contacts_io import export_header, format_contacts, iter_records, next_batch
+from src.services.rate_limit import RateLimiter
+
+from conftest import async_sessions, make_contacts
+
+
+def test_contacts_are_streamed_in_batches(memory_session, owner):
+    make_contacts(memory_session, owner, 7)
+    owner_id = owner.id
+    memory_session.expunge_all()
+
+    batches = list(iter_contact_batches(memory_session, owner_id, batch_size=3))
+    assert [len(rows) for rows in batches] == [3, 3, 1]
+    assert [row["email"] for row in batches[0]] == [f"contact{i}@example.com" for i in range(3)]
+    assert not memory_session.identity_map
+
+
+def test_csv_export_can_be_imported_back(memory_session, owner):
+    make_contacts(memory_session, owner, 3, additional_info="likes, commas")
+    rows = [row for batch in iter_contact_batches(memory_session, owner.id) for row in batch]
+
+    data = export_header("csv") + format_contacts(rows, "csv")
+    valid, invalid = next_batch(iter_records(io.BytesIO(data), "csv"), 10)
+    assert invalid == []
+    assert [contact.email for _, contact in valid] == [row["email"] for row in rows]
+    assert valid[0][1].additional_info == "likes, commas"
+
+
+def test_ndjson_and_vcard_formats():
+    row = {
+        "id": 1,
+        "first_name": "Ann",
+        "last_name": "Lee",
+        "email": "ann@example.com",
+        "phone_number": "123",
+        "birthday": date(1990, 5, 6),
+        "additional_info": "line one\nline; two",
+    }
+
+    assert json.loads(format_contacts([row], "ndjson"))["birthday"] == "1990-05-06"
+
+    card = format_contacts([row], "vcard").decode().split("\r\n")
+    assert card[:4] == ["BEGIN:VCARD", "VERSION:3.0", "N:Lee;Ann;;;", "FN:Ann Lee"]
+    assert "BDAY:1990-05-06" in card
+    assert "NOTE:line one\\nline\\; two" in card
+
+
+@pytest.fixture
+def export_client(db_mode, tmp_path, monkeypatch):
+    # The streamed body is produced in a worker thread, so the database must be a file
+    url = f"sqlite:///{tmp_path / 'export.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_local() as db:
+        owner = User(username="exporter", email="exporter@example.com", password="secret")
+        db.add(owner)
+        db.commit()
+        make_contacts(db, owner, 2500)
+        db.refresh(owner)
+        db.expunge(owner)
+
+    async def no_limit(self, request: Request, response: Response, redis=None):
+        return None
+
+    if db_mode == "async":
+        # Streamed by _export_async
+        _, session_local = async_sessions(url)
+
+    monkeypatch.setattr(RateLimiter, "__call__", no_limit)
+    app.dependency_overrides[get_read_sessionmaker] = lambda: session_local
+    app.dependency_overrides[auth_service.get_current_principal] = lambda: owner
+    try:
+        yield TestClient(app)
+    finally:
+        del app.dependency_overrides[get_read_sessionmaker]
+        del app.dependency_overrides[auth_service.get_current_principal]
+        engine.dispose()
+
+
+def test_export_route_streams_all_contacts(export_client):
+    response = export_client.get("/api/contacts/export/", params={"format": "ndjson"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="contacts.ndjson"' in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert len(lines) == 2500
+    assert json.loads(lines[-1])["email"] == "contact2499@example.com"
+
+    response = export_client.get("/api/contacts/export/", params={"format": "vcard"})
+    assert response.text.count("BEGIN:VCARD") == 2500
@@ -0,0 +1,84 @@
+import io
+import json
+from datetime import date
+
+import pytest
+
+from src.database.models import Contact
+from src.repository.contacts import insert_contact_batch
+from src.services.contacts_io import ImportFormatError, detect_format, iter_records, next_batch
+
+CSV_HEADER = "first_name,last_name,email,phone_number,birthday,additional_info\n"
+
+
+def test_detect_format():
+    assert detect_format("contacts.csv", "application/octet-stream") == "csv"
+    assert detect_format("upload", "application/x-ndjson") == "ndjson"
+    assert detect_format("contacts.jsonl", None) == "ndjson"
+    assert detect_format("contacts.txt", "text/plain") is None
+
+
+def test_csv_records_are_validated_in_batches():
+    data = CSV_HEADER + "".join(
+        f"Name{i},Last{i},user{i}@example.com,123456,1990-01-0{i % 9 + 1},\n" for i in range(5)
+    ) + "Broken,,not-an-email,123,1990-01-01,\n"
+    records = iter_records(io.BytesIO(data.encode()), "csv")
+
+    valid, invalid = next_batch(records, 4)
+    assert [number for number, _ in valid] == [1, 2, 3, 4] and invalid == []
+
+    valid, invalid = next_batch(records, 4)
+    assert [number for number, _ in valid] == [5]
+    assert invalid[0][0] == 6 and "email" in invalid[0][1] and "last_name" in invalid[0][1]
+
+    assert next_batch(records, 4) == ([], [])
+
+
+def test_ndjson_records_report_bad_lines():
+    lines = [
+        json.dumps({"first_name": "A", "last_name": "B", "email": "a@example.com",
+                    "phone_number": "1", "birthday": "1990-01-01"}),
+        "",
+        "{not json",
+        "[1, 2]",
+    ]
+    valid, invalid = next_batch(iter_records(io.BytesIO("\n".join(lines).encode()), "ndjson"), 10)
+    assert len(valid) == 1
+    assert [number for number, _ in invalid] == [2, 3]
+
+
+def test_values_longer_than_their_columns_are_rejected():
+    data = CSV_HEADER + (
+        f"{'A' * 26},Lee,long@example.com,1,1990-01-01,\n"
+        f"Ann,Lee,phone@example.com,{'1' * 14},1990-01-01,\n"
+        f"{'A' * 25},Lee,fits@example.com,{'1' * 13},1990-01-01,\n"
+    )
+    valid, invalid = next_batch(iter_records(io.BytesIO(data.encode()), "csv"), 10)
+    assert [number for number, _ in valid] == [3]
+    assert [number for number, _ in invalid] == [1, 2]
+    assert "first_name" in invalid[0][1] and "phone_number" in invalid[1][1]
+
+
+def test_invalid_utf8_is_a_format_error():
+    records = iter_records(io.BytesIO(CSV_HEADER.encode() + b"\xff\xfe\n"), "csv")
+    with pytest.raises(ImportFormatError):
+        next_batch(records, 10)
+
+
+def test_insert_contact_batch_reports_conflicts(memory_session, owner):
+    data = CSV_HEADER + (
+        "Ann,Lee,ann@example.com,1,1990-05-06,\n"
+        "Bob,Ray,bob@example.com,2,1991-02-03,\n"
+        "Ann,Dup,ann@example.com,3,1992-01-01,\n"
+    )
+    valid, _ = next_batch(iter_records(io.BytesIO(data.encode()), "csv"), 10)
+
+    rejected = insert_contact_batch(memory_session, valid, owner)
+    assert rejected == [(3, "Duplicate email in the uploaded file.")]
+
+    rejected = insert_contact_batch(memory_session, valid[:1], owner)
+    assert rejected == [(1, "A contact with this email already exists.")]
+
+    stored = memory_session.query(Contact).order_by(Contact.id).all()
+    assert [c.email for c in stored] == ["ann@example.com", "bob@example.com"]
+    assert stored[0].birthday == date(1990, 5, 6) and stored[0].birthday_md == 506
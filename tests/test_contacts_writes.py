@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from src.database.models import Contact, User
+from src.repository.contacts import create_contact, delete_contact, update_contact
+from src.schemas import ContactCreate, ContactUpdate
+
+from conftest import count_statements, make_contacts
+
+
+def new_contact(email="ann@example.com"):
+    return ContactCreate(first_name="Ann", last_name="Lee", email=email,
+                         phone_number="123", birthday=date(1990, 5, 6))
+
+
+def test_create_is_a_single_statement(memory_session, owner):
+    memory_session.refresh(owner)
+    with count_statements(memory_session) as statements:
+        created = create_contact(memory_session, new_contact(), owner)
+        assert created.id and created.email == "ann@example.com"
+    assert len(statements) == 1 and statements[0].startswith("INSERT")
+    assert memory_session.get(Contact, created.id).birthday_md == 506
+
+    with pytest.raises(HTTPException) as error:
+        create_contact(memory_session, new_contact(), owner)
+    assert error.value.status_code == 409
+
+
+def test_update_is_a_single_statement(memory_session, owner):
+    first, second = make_contacts(memory_session, owner, 2)
+    first_id, second_email = first.id, second.email
+    memory_session.refresh(owner)
+
+    with count_statements(memory_session) as statements:
+        updated = update_contact(
+            memory_session, first_id, ContactUpdate(birthday=date(1991, 7, 8)), owner)
+    assert len(statements) == 1 and statements[0].startswith("UPDATE")
+    assert updated.birthday == date(1991, 7, 8) and updated.first_name == "First0"
+    assert memory_session.get(Contact, first_id).birthday_md == 708
+
+    with pytest.raises(HTTPException) as error:
+        update_contact(memory_session, first_id, ContactUpdate(email=second_email), owner)
+    assert error.value.status_code == 409
+
+
+def test_update_and_delete_respect_ownership(memory_session, owner):
+    stranger = User(username="stranger", email="stranger@example.com", password="secret")
+    memory_session.add(stranger)
+    memory_session.commit()
+    contact_id = make_contacts(memory_session, stranger, 1)[0].id
+
+    with pytest.raises(HTTPException) as error:
+        update_contact(memory_session, contact_id, ContactUpdate(first_name="Mine"), owner)
+    assert error.value.status_code == 403
+    with pytest.raises(HTTPException) as error:
+        update_contact(memory_session, 999, ContactUpdate(first_name="Mine"), owner)
+    assert error.value.status_code == 404
+    with pytest.raises(HTTPException) as error:
+        delete_contact(memory_session, contact_id, owner)
+    assert error.value.status_code == 404
+
+    memory_session.refresh(stranger)
+    with count_statements(memory_session) as statements:
+        delete_contact(memory_session, contact_id, stranger)
+    assert len(statements) == 1 and statements[0].startswith("DELETE")
+    assert memory_session.get(Contact, contact_id) is None
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from main import app
+from src.conf.config import settings
+from src.database.pool import (
+    InstrumentedQueuePool,
+    configure_threadpool,
+    engine_options,
+    pool_status,
+    threadpool_size,
+    threadpool_status,
+)
+
+
+def test_engine_options_keep_default_pool_for_memory_sqlite():
+    assert engine_options("sqlite://") == {}
+    assert engine_options("sqlite:///./test.db")["poolclass"] is InstrumentedQueuePool
+
+
+def test_pool_status_reports_checkouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+    )
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("select 1"))
+        second.execute(text("select 1"))
+        status = pool_status(engine)
+        assert status["in_use"] == 2
+        assert status["overflow"] == 0
+    status = pool_status(engine)
+    assert status["in_use"] == 0
+    assert status["checkouts"] == 2
+    assert status["timeouts"] == 0
+    engine.dispose()
+
+
+def test_threadpool_stays_well_above_the_pool_capacity(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 2)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    assert threadpool_size(40) == 40
+    monkeypatch.setattr(settings, "db_pool_size", 30)
+    monkeypatch.setattr(settings, "db_max_overflow", 10)
+    assert threadpool_size(40) == 80
+    monkeypatch.setattr(settings, "threadpool_size", 16)
+    assert threadpool_size(40) == 16
+
+
+@pytest.mark.asyncio
+async def test_requests_holding_connections_across_hops_finish(tmp_path, monkeypatch):
+    # Six requests making two threadpool hops on a session over a two-connection pool
+    monkeypatch.setattr(settings, "db_pool_size", 2)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    configure_threadpool()
+    assert threadpool_status()["size"] == 40
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'hops.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=2,
+    )
+
+    async def request():
+        db = Session(engine)
+        await run_in_threadpool(db.execute, text("select 1"))
+        await asyncio.sleep(0.05)
+        await run_in_threadpool(db.execute, text("select 1"))
+        await run_in_threadpool(db.close)
+
+    await asyncio.wait_for(asyncio.gather(*(request() for _ in range(6))), 5)
+    assert pool_status(engine)["timeouts"] == 0
+    engine.dispose()
+
+
+def stats_client(host: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(host, 50000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_database_stats_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "internal_stats_enabled", True)
+    async with stats_client("127.0.0.1") as client:
+        response = await client.get("/api/internal/stats/db")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert "in_use" in data["primary"]
+    assert data["threadpool"]["size"] > 0
+
+
+@pytest.mark.asyncio
+async def test_internal_stats_are_restricted(monkeypatch):
+    async with stats_client("127.0.0.1") as client:
+        assert (await client.get("/api/internal/stats/db")).status_code == 404
+
+    monkeypatch.setattr(settings, "internal_stats_enabled", True)
+    async with stats_client("203.0.113.7") as client:
+        for name in ("db", "cache", "hashing", "rate_limit", "mail"):
+            assert (await client.get(f"/api/internal/stats/{name}")).status_code == 403
+
+    monkeypatch.setattr(settings, "internal_stats_networks", ["203.0.113.0/24"])
+    async with stats_client("203.0.113.7") as client:
+        assert (await client.get("/api/internal/stats/cache")).status_code == 200
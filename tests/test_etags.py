@@ -0,0 +1,93 @@
+import asyncio
+
+from main import app
+from src.conf.config import settings
+from src.database.redis_db import get_redis
+from src.services.response_cache import etag_matches
+
+from conftest import count_statements, make_contacts
+from test_response_cache import UnreachableRedis
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_matching_etag_returns_304_without_touching_the_database(contacts_client, memory_session, owner):
+    make_contacts(memory_session, owner, 3)
+    memory_session.refresh(owner)
+
+    urls = [
+        "/api/contacts/?limit=2",
+        "/api/contacts/1",
+        "/api/contacts/search/?query=First1",
+        "/api/contacts/birthdays/",
+    ]
+    etags = {}
+    for url in urls:
+        response = contacts_client.get(url)
+        assert response.status_code == 200, response.text
+        assert response.headers["Cache-Control"] == "private, no-cache"
+        etags[url] = response.headers["ETag"]
+    assert len(set(etags.values())) == len(urls)
+
+    with count_statements(memory_session) as statements:
+        for url in urls:
+            response = contacts_client.get(url, headers={"If-None-Match": etags[url]})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["ETag"] == etags[url]
+    assert statements == []
+
+
+def test_no_etag_when_the_cache_is_disabled(contacts_client, memory_session, owner, monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_ttl", 0)
+    make_contacts(memory_session, owner, 1)
+
+    response = contacts_client.get("/api/contacts/", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_write_changes_the_etag(contacts_client, memory_session, owner):
+    make_contacts(memory_session, owner, 2)
+    memory_session.refresh(owner)
+    etag = contacts_client.get("/api/contacts/").headers["ETag"]
+
+    response = contacts_client.delete("/api/contacts/1")
+    assert response.status_code == 200, response.text
+
+    response = contacts_client.get("/api/contacts/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [contact["id"] for contact in response.json()] == [2]
+
+
+def test_etag_does_not_match_again_after_redis_loses_its_keys(contacts_client, memory_session, owner):
+    make_contacts(memory_session, owner, 2)
+    memory_session.refresh(owner)
+    etag = contacts_client.get("/api/contacts/").headers["ETag"]
+
+    response = contacts_client.put("/api/contacts/1", json={"first_name": "Changed"})
+    assert response.status_code == 200, response.text
+    redis = app.dependency_overrides[get_redis]()
+    asyncio.run(redis.flushall())
+
+    response = contacts_client.get("/api/contacts/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["first_name"] == "Changed"
+
+
+def test_writes_are_refused_while_redis_is_unreachable(contacts_client, memory_session, owner, monkeypatch):
+    make_contacts(memory_session, owner, 1)
+    monkeypatch.setitem(app.dependency_overrides, get_redis, UnreachableRedis)
+
+    response = contacts_client.put("/api/contacts/1", json={"first_name": "Changed"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    memory_session.expire_all()
+    assert contacts_client.get("/api/contacts/1").json()["first_name"] == "First0"
@@ -0,0 +1,62 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from passlib.context import CryptContext
+
+from src.database.models import User
+from src.services import auth as auth_module
+from src.services import hashing
+from src.services.auth import auth_service
+from src.services.hashing import calibrate_rounds, password_context
+
+
+def bcrypt_hash(password, rounds):
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(password)
+
+
+def test_calibration_extrapolates_the_probe(monkeypatch):
+    monkeypatch.setattr(hashing, "_hash_time_ms", lambda scheme, rounds, samples: 5.0)
+    assert calibrate_rounds("bcrypt", 250) == 13
+    assert calibrate_rounds("bcrypt", 1) == hashing.MIN_ROUNDS["bcrypt"] == 12
+    assert calibrate_rounds("argon2", 250) == 50
+    assert calibrate_rounds("argon2", 1e9) == hashing.MAX_ROUNDS["argon2"]
+
+
+def test_calibration_measures_real_hashes():
+    rounds = calibrate_rounds("bcrypt", 50, samples=1)
+    assert hashing.MIN_ROUNDS["bcrypt"] <= rounds <= hashing.MAX_ROUNDS["bcrypt"]
+
+
+def test_context_flags_only_hashes_below_the_cost():
+    context = password_context("bcrypt", 5)
+    assert context.needs_update(bcrypt_hash("secret", 4))
+    assert not context.needs_update(bcrypt_hash("secret", 5))
+    assert not context.needs_update(bcrypt_hash("secret", 8))
+    assert context.verify("secret", bcrypt_hash("secret", 8))
+
+
+@pytest.mark.asyncio
+async def test_outdated_hash_is_replaced_after_login(memory_session, monkeypatch):
+    old_hash = bcrypt_hash("secret", 4)
+    user = User(username="ann", email="ann@example.com", password=old_hash, confirmed=True)
+    memory_session.add(user)
+    memory_session.commit()
+
+    @asynccontextmanager
+    async def test_session():
+        yield memory_session
+
+    monkeypatch.setattr(auth_module, "open_session", test_session)
+    monkeypatch.setattr(auth_service, "pwd_context", password_context("bcrypt", 5))
+    assert auth_service.needs_rehash(old_hash)
+
+    await auth_service.rehash_password(user.email, "secret", old_hash)
+    memory_session.refresh(user)
+    assert user.password != old_hash
+    assert not auth_service.needs_rehash(user.password)
+    assert await auth_service.verify_password("secret", user.password)
+
+    current_hash = user.password
+    await auth_service.rehash_password(user.email, "secret", old_hash)
+    memory_session.refresh(user)
+    assert user.password == current_hash
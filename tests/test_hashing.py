@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.services import auth as auth_module
+from src.services.auth import auth_service
+from src.services.hashing import HashingPool, HashingPoolFull
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_jobs_off_the_event_loop():
+    pool = HashingPool(workers=2, max_queue=2)
+    loop_thread = threading.get_ident()
+
+    threads = await asyncio.gather(*(pool.run(threading.get_ident) for _ in range(4)))
+    assert loop_thread not in threads
+
+    stats = pool.stats()
+    assert stats["completed"] == 4 and stats["running"] == 0 and stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_jobs_beyond_its_queue():
+    pool = HashingPool(workers=1, max_queue=1)
+    release = threading.Event()
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    assert pool.stats() | {"wait_avg_ms": 0, "wait_max_ms": 0, "run_avg_ms": 0} == {
+        "workers": 1, "max_queue": 1, "running": 1, "queued": 1, "completed": 0,
+        "rejected": 0, "wait_avg_ms": 0, "wait_max_ms": 0, "run_avg_ms": 0,
+    }
+    with pytest.raises(HashingPoolFull):
+        await pool.run(release.wait)
+
+    release.set()
+    assert await running and await queued
+    assert pool.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_password_round_trip_and_saturation(monkeypatch):
+    hashed = await auth_service.get_password_hash("secret")
+    assert await auth_service.verify_password("secret", hashed)
+    assert not await auth_service.verify_password("wrong", hashed)
+
+    monkeypatch.setattr(auth_module, "hashing_pool", HashingPool(workers=1, max_queue=0))
+    release = threading.Event()
+    blocker = asyncio.ensure_future(auth_module.hashing_pool.run(release.wait))
+    await asyncio.sleep(0.05)
+    with pytest.raises(HTTPException) as error:
+        await auth_service.verify_password("secret", hashed)
+    assert error.value.status_code == 503
+    release.set()
+    await blocker
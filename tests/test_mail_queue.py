@@ -0,0 +1,311 @@
+import asyncio
+import json
+import socket
+import time
+
+import fakeredis
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from fastapi_mail import ConnectionConfig
+
+from src.services.email import conf, render_message, send_email
+from src.services.mail_queue import (
+    CLAIM_SCRIPT,
+    DEAD_KEY,
+    LEASES_KEY,
+    PROCESSING_KEY,
+    QUEUE_KEY,
+    RENEW_SCRIPT,
+    RETRY_KEY,
+    MailWorker,
+    SMTPPool,
+    enqueue_message,
+    queue_depth,
+)
+
+
+class Mailbox:
+    """aiosmtpd handler keeping accepted messages; some recipients are refused."""
+
+    def __init__(self):
+        self.messages = []
+        self.logins = 0
+        self.sessions = set()
+        self.refuse = {}
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(session.peer)
+        for recipient in envelope.rcpt_tos:
+            replies = self.refuse.get(recipient)
+            if replies:
+                return replies.pop(0)
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        return AuthResult(success=auth_data.login == b"user" and auth_data.password == b"secret")
+
+
+@pytest.fixture
+def mailbox():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = Mailbox()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port,
+        authenticator=handler.authenticate,
+        auth_require_tls=False,
+    )
+    controller.start()
+    handler.port = port
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def mail_config(mailbox):
+    return ConnectionConfig(
+        MAIL_USERNAME="user",
+        MAIL_PASSWORD="secret",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=mailbox.port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=False,
+    )
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+async def queue(redis, *recipients):
+    for recipient in recipients:
+        context = {"host": "http://test/", "username": "user", "token": "t"}
+        await enqueue_message(redis, render_message(recipient, "Hello", "email_template.html", context))
+
+
+async def claim(redis, token, deadline):
+    return await redis.eval(
+        CLAIM_SCRIPT, 4, QUEUE_KEY, RETRY_KEY, PROCESSING_KEY, LEASES_KEY, time.time(), deadline, 10, token
+    )
+
+
+async def drain(worker):
+    while await worker.run_once():
+        pass
+
+
+@pytest.mark.asyncio
+async def test_worker_sends_queue_over_pooled_sessions(redis, mailbox, mail_config):
+    recipients = [f"user{i}@example.com" for i in range(10)]
+    await queue(redis, *recipients)
+    assert (await queue_depth(redis))["queued"] == 10
+
+    worker = MailWorker(redis, SMTPPool(mail_config, size=2), batch_size=4, poll_interval=0.01)
+    worker.start()
+    for _ in range(200):
+        if len(mailbox.messages) == 10:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert sorted(envelope.rcpt_tos[0] for envelope in mailbox.messages) == sorted(recipients)
+    assert mailbox.messages[0].mail_from == conf.MAIL_FROM
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 0, "dead": 0}
+    assert mailbox.logins <= 2
+    assert len(mailbox.sessions) <= 2
+    stats = worker.stats()
+    assert stats["sent"] == 10
+    assert stats["pool"]["opened"] <= 2
+    assert stats["pool"]["reused"] >= 8
+    assert stats["pool"]["idle"] == 0
+
+
+@pytest.mark.asyncio
+async def test_send_email_queues_confirmation_link(redis, mailbox, mail_config):
+    await send_email("new@example.com", "newbie", "http://test/", redis)
+    await drain(MailWorker(redis, SMTPPool(mail_config)))
+
+    (envelope,) = mailbox.messages
+    assert envelope.rcpt_tos == ["new@example.com"]
+    body = envelope.content.decode()
+    assert "Subject: Confirm your email" in body
+    assert "http://test/api/auth/confirmed_email/" in body
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_retried(redis, mailbox, mail_config):
+    mailbox.refuse["flaky@example.com"] = ["451 Try again later"]
+    await queue(redis, "flaky@example.com", "ok@example.com")
+    worker = MailWorker(redis, SMTPPool(mail_config), retry_base=60)
+
+    assert await worker.run_once() == 2
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 1, "dead": 0}
+    ((raw, due),) = await redis.zrange(RETRY_KEY, 0, -1, withscores=True)
+    assert json.loads(raw)["attempts"] == 1
+    assert time.time() + 25 < due <= time.time() + 60
+
+    # Make the retry due now
+    await redis.zadd(RETRY_KEY, {raw: 0})
+    assert await worker.run_once() == 1
+    assert sorted(envelope.rcpt_tos[0] for envelope in mailbox.messages) == ["flaky@example.com", "ok@example.com"]
+    assert worker.stats()["retried"] == 1
+    assert worker.stats()["sent"] == 2
+    await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_go_to_dead_letters(redis, mailbox, mail_config):
+    mailbox.refuse["bounce@example.com"] = ["550 No such user"]
+    mailbox.refuse["down@example.com"] = ["451 Try again later"] * 2
+    await queue(redis, "bounce@example.com", "down@example.com")
+    worker = MailWorker(redis, SMTPPool(mail_config), max_attempts=2, retry_base=0)
+
+    await drain(worker)
+
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 0, "dead": 2}
+    dead = {json.loads(raw)["recipients"][0]: json.loads(raw) for raw in await redis.lrange(DEAD_KEY, 0, -1)}
+    assert dead["bounce@example.com"]["attempts"] == 1
+    assert "550" in dead["bounce@example.com"]["error"]
+    assert dead["down@example.com"]["attempts"] == 2
+    assert mailbox.messages == []
+    await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_is_retried(redis, mail_config):
+    mail_config.MAIL_PORT = 1
+    await queue(redis, "user@example.com")
+    worker = MailWorker(redis, SMTPPool(mail_config), retry_base=60)
+
+    assert await worker.run_once() == 1
+    assert (await queue_depth(redis))["retrying"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_claimed_again(redis, mailbox, mail_config):
+    await queue(redis, "user@example.com")
+    # A worker that claimed the message and died before acknowledging it
+    now = time.time()
+    assert len(await claim(redis, "dead-worker", deadline=now - 1)) == 1
+    assert await redis.llen(QUEUE_KEY) == 0
+
+    await drain(MailWorker(redis, SMTPPool(mail_config)))
+
+    assert len(mailbox.messages) == 1
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 0, "dead": 0}
+
+
+def test_retry_delay_is_capped_exponential_backoff(mail_config):
+    worker = MailWorker(None, SMTPPool(mail_config), retry_base=10, retry_max=100)
+    for attempts, full in [(1, 10), (2, 20), (3, 40), (5, 100), (20, 100)]:
+        delay = worker.retry_delay(attempts)
+        assert full / 2 <= delay <= full
+
+
+@pytest.mark.asyncio
+async def test_undeliverable_messages_do_not_stop_the_worker(redis, mailbox, mail_config, monkeypatch):
+    await redis.lpush(QUEUE_KEY, "{not json", json.dumps({"id": "x", "attempts": 0}))
+    await queue(redis, "boom@example.com", "ok@example.com")
+    worker = MailWorker(redis, SMTPPool(mail_config), poll_interval=0.01)
+    send = worker.pool.send
+
+    async def failing_send(sender, recipients, message):
+        if recipients == ["boom@example.com"]:
+            raise RuntimeError("unexpected")
+        await send(sender, recipients, message)
+
+    monkeypatch.setattr(worker.pool, "send", failing_send)
+    worker.start()
+    for _ in range(200):
+        if len(mailbox.messages) == 1 and (await queue_depth(redis))["dead"] == 3:
+            break
+        await asyncio.sleep(0.01)
+    assert worker.stats()["running"]
+    await worker.stop()
+
+    assert [envelope.rcpt_tos for envelope in mailbox.messages] == [["ok@example.com"]]
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 0, "dead": 3}
+    dead = [json.loads(raw) for raw in await redis.lrange(DEAD_KEY, 0, -1)]
+    assert {entry.get("raw") for entry in dead} >= {"{not json"}
+    assert any(entry.get("error") == "'sender'" for entry in dead)
+    assert any(entry.get("error") == "unexpected" for entry in dead)
+
+
+@pytest.mark.asyncio
+async def test_leases_are_renewed_while_a_batch_is_sent(redis, mail_config, monkeypatch):
+    await queue(redis, "slow@example.com")
+    worker = MailWorker(redis, SMTPPool(mail_config), lease_seconds=0.3)
+    deadlines = []
+
+    async def slow_send(sender, recipients, message):
+        for _ in range(3):
+            await asyncio.sleep(0.2)
+            deadlines.append((await redis.zrange(PROCESSING_KEY, 0, -1, withscores=True))[0][1])
+
+    monkeypatch.setattr(worker.pool, "send", slow_send)
+    claimed_at = time.time()
+    assert await worker.run_once() == 1
+
+    # Sending took twice the lease, which never ran out
+    assert deadlines == sorted(deadlines)
+    assert all(deadline > claimed_at + 0.2 * (i + 1) for i, deadline in enumerate(deadlines))
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 0, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_running_after_an_unexpected_error(redis, mailbox, mail_config, monkeypatch):
+    await queue(redis, "user@example.com")
+    worker = MailWorker(redis, SMTPPool(mail_config), poll_interval=0.01)
+    run_once = worker.run_once
+    failures = [RuntimeError("bug")]
+
+    async def flaky_run_once():
+        if failures:
+            raise failures.pop()
+        return await run_once()
+
+    monkeypatch.setattr(worker, "run_once", flaky_run_once)
+    worker.start()
+    for _ in range(200):
+        if mailbox.messages:
+            break
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+    assert len(mailbox.messages) == 1
+    assert worker.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_a_worker_cannot_settle_a_message_after_losing_its_lease(redis, mail_config):
+    await queue(redis, "user@example.com")
+    [raw] = await claim(redis, "slow-worker", deadline=time.time() - 1)
+    # Its lease ran out, so another worker claims the message
+    assert await claim(redis, "other-worker", deadline=time.time() + 60) == [raw]
+
+    worker = MailWorker(redis, SMTPPool(mail_config))
+    assert await redis.eval(RENEW_SCRIPT, 2, PROCESSING_KEY, LEASES_KEY, "slow-worker", time.time() + 600, raw) == 0
+    assert not await worker._settle(raw, "slow-worker", "sent")
+    assert await redis.zscore(PROCESSING_KEY, raw) < time.time() + 120
+    assert worker.stats()["lost_leases"] == 1
+
+    assert await worker._settle(raw, "other-worker", "sent")
+    assert await queue_depth(redis) == {"queued": 0, "processing": 0, "retrying": 0, "dead": 0}
+    assert await redis.hlen(LEASES_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_stop_before_run_does_not_hang(redis, mail_config):
+    worker = MailWorker(redis, SMTPPool(mail_config))
+    await worker.stop()
+    await asyncio.wait_for(worker.run(), timeout=1)
@@ -0,0 +1,35 @@
+import pytest
+from jinja2 import Environment, TemplateNotFound
+
+from src.services.email import conf
+from src.services.mail_templates import TEMPLATE_FOLDER, MailTemplates
+
+CONTEXT = {"host": "http://test/", "username": "Ann", "token": "abc"}
+
+
+def test_renders_like_fastapi_mail(tmp_path):
+    templates = MailTemplates(TEMPLATE_FOLDER, str(tmp_path))
+
+    assert "email_template.html" in templates.compile_all()
+    expected = conf.template_engine().get_template("email_template.html").render(**CONTEXT)
+    assert templates.render("email_template.html", CONTEXT) == expected
+    assert "http://test/api/auth/confirmed_email/abc" in expected
+    with pytest.raises(TemplateNotFound):
+        templates.get("missing.html")
+
+
+def test_compiled_templates_skip_loader_and_parser(tmp_path, monkeypatch):
+    MailTemplates(TEMPLATE_FOLDER, str(tmp_path)).compile_all()
+    assert list(tmp_path.iterdir())
+
+    def fail(*args, **kwargs):
+        raise AssertionError("template parsed again")
+
+    # A new process finds the bytecode cached by the first one
+    monkeypatch.setattr(Environment, "_parse", fail)
+    templates = MailTemplates(TEMPLATE_FOLDER, str(tmp_path))
+    templates.compile_all()
+
+    # Once compiled, rendering does not go back to the templates folder
+    monkeypatch.setattr(templates.environment.loader, "get_source", fail)
+    assert "Hi Ann," in templates.render("email_template.html", CONTEXT)
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from main import BASELINE_REVISION, migrate_database
+from src.database.models import SEARCH_DDL_SQLITE
+
+ALEMBIC_INI = str(Path(__file__).parent.parent / "alembic.ini")
+
+
+def baseline_database(path):
+    # Schema of the baseline, as create_all built it before migrations existed
+    engine = create_engine(f"sqlite:///{path}")
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, BASELINE_REVISION)
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, username, email, password, confirmed) "
+            "VALUES (1, 'deadpool', 'deadpool@example.com', 'x', 1)"
+        )
+    return engine, config
+
+
+def add_contact(engine, **extra):
+    columns = {"first_name": "Wade", "last_name": "Wilson", "email": "wade@example.com",
+               "phone_number": "1234567890", "birthday": "1990-03-05", "owner_id": 1, **extra}
+    with engine.begin() as connection:
+        connection.execute(
+            text(f"INSERT INTO contacts ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+            columns,
+        )
+
+
+def assert_at_head(engine, config):
+    head = ScriptDirectory.from_config(config).get_current_head()
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar() == head
+        assert connection.exec_driver_sql("SELECT birthday_md FROM contacts").scalar() == 305
+        found = connection.exec_driver_sql(
+            "SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH '\"Wilson\"'"
+        ).scalars().all()
+        assert found == [1]
+    indexes = {index["name"] for index in inspect(engine).get_indexes("contacts")}
+    assert {"ix_contacts_owner_id_birthday_md", "ix_contacts_owner_id_id"} <= indexes
+
+
+def test_migrates_database_created_with_search_tables(tmp_path):
+    # Built by create_all when search shipped, before the birthday key and Alembic
+    engine, config = baseline_database(tmp_path / "search.db")
+    with engine.begin() as connection:
+        for statement in SEARCH_DDL_SQLITE:
+            connection.exec_driver_sql(statement)
+    add_contact(engine)
+
+    migrate_database(engine)
+
+    assert_at_head(engine, config)
+    engine.dispose()
+
+
+def test_migrates_database_created_with_birthday_key(tmp_path):
+    # Built by create_all when the birthday key shipped, still before Alembic
+    engine, config = baseline_database(tmp_path / "birthdays.db")
+    with engine.begin() as connection:
+        for statement in SEARCH_DDL_SQLITE:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("ALTER TABLE contacts ADD COLUMN birthday_md SMALLINT NOT NULL DEFAULT 0")
+        connection.exec_driver_sql(
+            "CREATE INDEX ix_contacts_owner_id_birthday_md ON contacts (owner_id, birthday_md)"
+        )
+    add_contact(engine, birthday_md=305)
+
+    migrate_database(engine)
+
+    assert_at_head(engine, config)
+    engine.dispose()
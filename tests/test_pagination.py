@@ -0,0 +1,33 @@
+import pytest
+from fastapi import HTTPException
+
+from conftest import make_contacts
+from src.repository.contacts import get_contacts
+from src.services.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(1)[:-2], "e30"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as context:
+        decode_cursor(cursor)
+    assert context.value.status_code == 400
+
+
+def test_keyset_pages_match_offset_pages(memory_session, owner):
+    db, user = memory_session, owner
+    make_contacts(db, owner, 25)
+    by_offset = [c.id for c in get_contacts(db, user, skip=0, limit=25)]
+
+    by_keyset, after_id = [], None
+    while True:
+        page = get_contacts(db, user, limit=10, after_id=after_id)
+        if not page:
+            break
+        by_keyset.extend(c.id for c in page)
+        after_id = decode_cursor(encode_cursor(page[-1].id))
+
+    assert by_keyset == by_offset == sorted(by_offset)
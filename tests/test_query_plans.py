@@ -0,0 +1,110 @@
+import re
+from collections import Counter
+from datetime import date
+
+import pytest
+from sqlalchemy import event, text
+
+from conftest import make_contacts
+from src.database.models import User
+from src.repository import contacts as repository_contacts
+from src.repository.users import _get_user_by_email
+from src.schemas import ContactCreate, ContactFilter, ContactSelection, ContactUpdate
+
+# A plan step reading the whole table without any index
+FULL_SCAN = re.compile(r"^SCAN (contacts|users)$")
+# A plan step finding rows through an index, the primary key or the full-text index
+INDEX_LOOKUP = re.compile(r"^(SEARCH (contacts|users) USING|SCAN contacts_fts VIRTUAL TABLE)")
+CONSTANT_ROWS = re.compile(r"^SCAN (\d+ )?CONSTANT ROWS?$")
+DML = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+@pytest.fixture
+def captured(memory_session):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(DML):
+            if parameters and isinstance(parameters[0], (tuple, dict)):
+                # A true executemany: one parameter set is enough to plan it
+                parameters = parameters[0]
+            statements.append((statement, parameters))
+
+    engine = memory_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def query_plan(db, statement, parameters):
+    return [
+        row[-1]
+        for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    ]
+
+
+def repository_calls(db, owner, contact_id):
+    new_contact = ContactCreate(
+        first_name="New", last_name="Contact", email="new@example.com",
+        phone_number="1234567890", birthday=date(1991, 5, 5),
+    )
+    yield lambda: repository_contacts.create_contact(db, new_contact, owner)
+    yield lambda: repository_contacts.insert_contact_batch(db, [
+        (1, new_contact.model_copy(update={"email": "batch1@example.com"})),
+        (2, new_contact.model_copy(update={"email": "batch2@example.com"})),
+    ], owner)
+    yield lambda: repository_contacts.get_contacts(db, owner, skip=20, limit=10)
+    yield lambda: repository_contacts.get_contacts(db, owner, after_id=contact_id, limit=10)
+    yield lambda: repository_contacts.get_contact(db, contact_id, owner)
+    yield lambda: repository_contacts.update_contact(
+        db, contact_id, ContactUpdate(phone_number="5555555555"), owner)
+    yield lambda: repository_contacts.search_contacts(db, "Last1", owner)
+    yield lambda: repository_contacts.search_contacts(db, "t1", owner)
+    yield lambda: repository_contacts.get_contacts_with_upcoming_birthdays(
+        db, owner, days=7, today=date(2024, 12, 29))
+    yield lambda: repository_contacts.get_contact_rows(db, owner, after_id=contact_id, limit=10)
+    yield lambda: repository_contacts.get_contact_row(db, contact_id, owner)
+    yield lambda: repository_contacts.search_contact_rows(db, "Last1", owner)
+    yield lambda: repository_contacts.get_upcoming_birthday_rows(
+        db, owner, days=7, today=date(2024, 12, 29))
+    yield lambda: repository_contacts.bulk_update_contacts(
+        db, ContactSelection(ids=[contact_id, contact_id + 1]), ContactUpdate(phone_number="1"), owner)
+    yield lambda: repository_contacts.bulk_update_contacts(
+        db, ContactSelection(filter=ContactFilter(last_name="Last2")), ContactUpdate(phone_number="2"), owner)
+    yield lambda: repository_contacts.bulk_delete_contacts(
+        db, ContactSelection(filter=ContactFilter(email="batch1@example.com")), owner)
+    yield lambda: repository_contacts.bulk_delete_contacts(db, ContactSelection(ids=[contact_id + 2]), owner)
+    yield lambda: list(repository_contacts.iter_contact_batches(db, owner.id, batch_size=20))
+    yield lambda: repository_contacts.delete_contact(db, contact_id, owner)
+    yield lambda: _get_user_by_email(db, owner.email)
+
+
+def test_repository_queries_use_indexes(memory_session, owner, captured):
+    for i in range(5):
+        other = User(username=f"other{i}", email=f"other{i}@example.com", password="secret")
+        memory_session.add(other)
+        memory_session.flush()
+        for contact in make_contacts(memory_session, other, 50):
+            contact.email = f"{i}.{contact.email}"
+        memory_session.commit()
+    contacts = make_contacts(memory_session, owner, 50)
+    memory_session.execute(text("ANALYZE"))
+    captured.clear()
+
+    for call in repository_calls(memory_session, owner, contacts[5].id):
+        call()
+
+    verbs = Counter(statement.split(None, 1)[0].upper() for statement, _ in captured)
+    assert verbs["INSERT"] == 2 and verbs["UPDATE"] == 3 and verbs["DELETE"] == 3, verbs
+    export = str(repository_contacts.export_query(owner.id).compile(memory_session.get_bind()))
+    assert export in (statement for statement, _ in captured)
+
+    for statement, parameters in captured:
+        plan = query_plan(memory_session, statement, parameters)
+        full_scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not full_scans, f"{statement}\n{plan}"
+        if statement.startswith("INSERT"):
+            # VALUES reads no table; ON CONFLICT probes the unique email index
+            assert all(CONSTANT_ROWS.match(step) for step in plan), f"{statement}\n{plan}"
+        else:
+            assert any(INDEX_LOOKUP.match(step) for step in plan), f"{statement}\n{plan}"
@@ -0,0 +1,101 @@
+import pytest
+from fastapi import HTTPException, Request, Response
+from redis.exceptions import ConnectionError
+
+from src.conf.config import settings
+from src.services.auth import auth_service
+from src.services.rate_limit import RateLimiter
+
+
+class UnreachableRedis:
+    async def evalsha(self, *args):
+        raise ConnectionError("connection refused")
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter_state(monkeypatch):
+    monkeypatch.setattr(RateLimiter, "offline_until", 0.0)
+    monkeypatch.setattr(RateLimiter, "counters", dict.fromkeys(RateLimiter.counters, 0))
+
+
+def make_request(client="10.0.0.1", token=None, forwarded=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/contacts/",
+        "query_string": b"",
+        "headers": headers,
+        "client": (client, 1234),
+    })
+
+
+async def hit(limiter, redis, **request):
+    try:
+        await limiter(make_request(**request), Response(), redis)
+    except HTTPException as error:
+        assert error.status_code == 429
+        assert int(error.headers["Retry-After"]) >= 1
+        return False
+    return True
+
+
+@pytest.mark.asyncio
+async def test_requests_are_synced_in_batches(fake_redis):
+    limiter = RateLimiter(times=20, seconds=60, batch=5)
+    results = [await hit(limiter, fake_redis) for _ in range(25)]
+
+    assert results == [True] * 20 + [False] * 5
+    # Batches of five until the bucket runs low, then every request
+    assert RateLimiter.counters["syncs"] == 3 + 5
+    assert RateLimiter.stats()["rejected"] == 5
+
+
+@pytest.mark.asyncio
+async def test_workers_share_the_limit_through_redis(fake_redis):
+    first, second = RateLimiter(times=10, seconds=60, batch=2), RateLimiter(times=10, seconds=60, batch=2)
+    allowed = sum([await hit(first, fake_redis) for _ in range(8)])
+    allowed += sum([await hit(second, fake_redis) for _ in range(10)])
+
+    assert allowed <= 10 + 2
+    assert not await hit(second, fake_redis)
+
+
+@pytest.mark.asyncio
+async def test_limit_is_per_user_not_per_address(fake_redis):
+    limiter = RateLimiter(times=2, seconds=60)
+    ann = await auth_service.create_access_token(data={"sub": "ann@example.com"})
+    bob = await auth_service.create_access_token(data={"sub": "bob@example.com"})
+
+    assert await hit(limiter, fake_redis, token=ann)
+    assert await hit(limiter, fake_redis, token=ann, client="10.0.0.2")
+    assert not await hit(limiter, fake_redis, token=ann, client="10.0.0.3")
+    assert await hit(limiter, fake_redis, token=bob)
+    assert await hit(limiter, fake_redis, token="not-a-token")
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_falls_back_to_local_limits():
+    limiter = RateLimiter(times=4, seconds=60, batch=1)
+    results = [await hit(limiter, UnreachableRedis()) for _ in range(5)]
+
+    assert results == [True] * 4 + [False]
+    assert RateLimiter.counters["sync_errors"] == 1
+    assert RateLimiter.stats()["redis_offline"]
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", [])
+    request = make_request(client="203.0.113.7", forwarded="10.9.9.9")
+    assert RateLimiter._identity(request) == "ip:203.0.113.7"
+
+
+def test_forwarded_for_names_the_client_behind_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", ["10.0.0.0/8"])
+    # The client's own header entry is spoofed; the proxies appended the rest
+    request = make_request(client="10.0.0.1", forwarded="1.2.3.4, 198.51.100.5, 10.0.0.2")
+    assert RateLimiter._identity(request) == "ip:198.51.100.5"
+    assert RateLimiter._identity(make_request(client="10.0.0.1")) == "ip:10.0.0.1"
+    assert RateLimiter._identity(make_request(client="10.0.0.1", forwarded="1.2.3.4, junk")) == "ip:10.0.0.1"
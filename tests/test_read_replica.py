@@ -0,0 +1,51 @@
+import asyncio
+
+import fakeredis
+import pytest
+from jose import jwt
+from redis.exceptions import ConnectionError
+from starlette.requests import Request
+
+from src.database.db import ReadYourWrites, sticky_key
+
+
+def make_request(authorization: str | None = None) -> Request:
+    headers = []
+    if authorization is not None:
+        headers.append((b"authorization", authorization.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_window_is_shared_by_processes():
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    # One tracker per worker process, sharing Redis
+    writer, reader = ReadYourWrites(window=0.05), ReadYourWrites(window=0.05)
+    assert not await reader.is_sticky(redis, "deadpool@example.com")
+    await writer.mark(redis, "deadpool@example.com")
+    assert await reader.is_sticky(redis, "deadpool@example.com")
+    assert not await reader.is_sticky(redis, "other@example.com")
+    await asyncio.sleep(0.08)
+    assert not await reader.is_sticky(redis, "deadpool@example.com")
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_primary_without_redis():
+    class DownRedis:
+        async def exists(self, *args):
+            raise ConnectionError("down")
+
+        async def set(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    tracker = ReadYourWrites(window=5)
+    await tracker.mark(DownRedis(), "deadpool@example.com")
+    assert await tracker.is_sticky(DownRedis(), "deadpool@example.com")
+    assert not await tracker.is_sticky(DownRedis(), None)
+
+
+def test_sticky_key_uses_token_subject():
+    token = jwt.encode({"sub": "deadpool@example.com"}, "any", algorithm="HS256")
+    assert sticky_key(make_request(f"Bearer {token}")) == "deadpool@example.com"
+    assert sticky_key(make_request("Bearer not-a-token")) is None
+    assert sticky_key(make_request()) is None
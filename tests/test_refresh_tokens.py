@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.database.models import User
+from src.services import refresh_tokens
+from src.services.auth import auth_service
+from src.services.refresh_tokens import FAMILY_KEY, RefreshTokenRejected
+
+EMAIL = "rotate@example.com"
+PASSWORD = "secret123"
+
+
+@pytest.fixture(scope="module")
+def confirmed_user(session):
+    user = User(username="rotate", email=EMAIL, confirmed=True,
+                password=auth_service.pwd_context.hash(PASSWORD))
+    session.add(user)
+    session.commit()
+
+
+def stored_token(session):
+    # The client fixture closes the session after each request, so look the user up again
+    return session.query(User).filter(User.email == EMAIL).one().refresh_token
+
+
+def login(client):
+    response = client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()["refresh_token"]
+
+
+def refresh(client, token):
+    return client.get("/api/auth/refresh_token", headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.mark.asyncio
+async def test_rotation_moves_the_family_forward(fake_redis):
+    family = await refresh_tokens.start_family(fake_redis, ttl=60)
+    assert await fake_redis.ttl(FAMILY_KEY.format(family["fid"])) == 60
+
+    rotated = await refresh_tokens.rotate(fake_redis, family["fid"], family["jti"], ttl=120)
+    assert rotated["fid"] == family["fid"]
+    assert rotated["jti"] != family["jti"]
+    assert await fake_redis.get(FAMILY_KEY.format(family["fid"])) == rotated["jti"]
+    assert await fake_redis.ttl(FAMILY_KEY.format(family["fid"])) == 120
+
+
+@pytest.mark.asyncio
+async def test_reuse_revokes_the_family(fake_redis):
+    family = await refresh_tokens.start_family(fake_redis)
+    rotated = await refresh_tokens.rotate(fake_redis, family["fid"], family["jti"])
+
+    with pytest.raises(RefreshTokenRejected):
+        await refresh_tokens.rotate(fake_redis, family["fid"], family["jti"])
+    with pytest.raises(RefreshTokenRejected):
+        await refresh_tokens.rotate(fake_redis, family["fid"], rotated["jti"])
+    assert not await fake_redis.exists(FAMILY_KEY.format(family["fid"]))
+
+
+@pytest.mark.asyncio
+async def test_legacy_token_is_consumed_once(fake_redis):
+    assert await refresh_tokens.consume_legacy_token(fake_redis, "legacy", ttl=60)
+    assert not await refresh_tokens.consume_legacy_token(fake_redis, "legacy", ttl=60)
+
+
+def test_refresh_rotates_without_database_writes(client, session, confirmed_user):
+    first = login(client)
+    response = refresh(client, first)
+    assert response.status_code == 200, response.text
+    second = response.json()["refresh_token"]
+    assert second != first
+
+    assert stored_token(session) is None
+
+
+def test_replayed_refresh_token_revokes_the_session(client, confirmed_user):
+    first = login(client)
+    other_session = login(client)
+    second = refresh(client, first).json()["refresh_token"]
+
+    response = refresh(client, first)
+    assert response.status_code == 401, response.text
+    assert response.json()["detail"] == "Invalid refresh token"
+    assert refresh(client, second).status_code == 401
+    assert refresh(client, other_session).status_code == 200
+
+
+def test_legacy_refresh_token_is_exchanged_once(client, session, confirmed_user):
+    legacy = asyncio.run(auth_service.create_refresh_token(data={"sub": EMAIL}))
+    session.query(User).filter(User.email == EMAIL).update({"refresh_token": legacy})
+    session.commit()
+
+    response = refresh(client, legacy)
+    assert response.status_code == 200, response.text
+    assert refresh(client, response.json()["refresh_token"]).status_code == 200
+    assert refresh(client, legacy).status_code == 401
+
+
+def test_unreachable_family_store_answers_503(client, confirmed_user, monkeypatch):
+    first = login(client)
+
+    async def unreachable(*args, **kwargs):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(refresh_tokens, "start_family", unreachable)
+    monkeypatch.setattr(refresh_tokens, "rotate", unreachable)
+    for response in (
+        client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD}),
+        refresh(client, first),
+    ):
+        assert response.status_code == 503, response.text
+        assert response.headers["Retry-After"] == "1"
+    monkeypatch.undo()
+    assert refresh(client, first).status_code == 200
@@ -0,0 +1,149 @@
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError
+
+from src.services.response_cache import cached_json, entry_key, invalidating
+
+from conftest import count_statements, make_contacts
+
+
+class UnreachableRedis:
+    async def hgetall(self, *args):
+        raise ConnectionError("connection refused")
+
+    async def delete(self, *args):
+        raise ConnectionError("connection refused")
+
+    def pipeline(self, *args, **kwargs):
+        raise ConnectionError("connection refused")
+
+
+def producer(body=b"[]", headers=None):
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        return body, dict(headers or {})
+
+    return produce, calls
+
+
+def test_entry_key_ignores_parameter_order_and_missing_values():
+    assert entry_key(1, "v", "contacts", {"skip": 0, "limit": 10, "after_id": None}) == \
+        entry_key(1, "v", "contacts", {"limit": 10, "skip": 0}) == "response:1:v:contacts?limit=10&skip=0"
+
+
+@pytest.mark.asyncio
+async def test_hits_return_the_stored_body_and_headers(fake_redis):
+    produce, calls = producer(b'[{"id":1}]', {"X-Next-Cursor": "abc"})
+    first = await cached_json(fake_redis, 1, "contacts", {"limit": 1}, produce)
+    second = await cached_json(fake_redis, 1, "contacts", {"limit": 1}, produce)
+
+    assert len(calls) == 1
+    assert second.body == first.body == b'[{"id":1}]'
+    assert second.headers["X-Next-Cursor"] == "abc"
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.media_type == "application/json"
+
+    await cached_json(fake_redis, 1, "contacts", {"limit": 2}, produce)
+    await cached_json(fake_redis, 2, "contacts", {"limit": 1}, produce)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_all_responses_of_the_owner(fake_redis):
+    produce, calls = producer()
+    first = await cached_json(fake_redis, 1, "contacts", {}, produce)
+    await cached_json(fake_redis, 1, "birthdays", {}, produce)
+    await cached_json(fake_redis, 2, "contacts", {}, produce)
+    async with invalidating(fake_redis, 1):
+        pass
+    second = await cached_json(fake_redis, 1, "contacts", {}, produce)
+    await cached_json(fake_redis, 1, "birthdays", {}, produce)
+    await cached_json(fake_redis, 2, "contacts", {}, produce)
+    assert len(calls) == 5
+    assert first.headers["ETag"] != second.headers["ETag"]
+
+    stale = await cached_json(fake_redis, 1, "contacts", {}, produce, if_none_match=first.headers["ETag"])
+    assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_a_lost_version_does_not_bring_back_old_etags(fake_redis):
+    produce, _ = producer()
+    first = await cached_json(fake_redis, 1, "contacts", {}, produce)
+    await fake_redis.flushall()
+    response = await cached_json(fake_redis, 1, "contacts", {}, produce, if_none_match=first.headers["ETag"])
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_responses_are_produced_without_redis():
+    produce, calls = producer(b"[1]")
+    response = await cached_json(UnreachableRedis(), 1, "contacts", {}, produce)
+    await cached_json(UnreachableRedis(), 1, "contacts", {}, produce, if_none_match="*")
+    assert response.body == b"[1]" and len(calls) == 2
+    # Nothing could invalidate a validator while Redis is away
+    assert "ETag" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_writes_are_refused_without_redis():
+    with pytest.raises(HTTPException) as error:
+        async with invalidating(UnreachableRedis(), 1):
+            pytest.fail("the write ran without invalidating the cache")
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_misses_that_are_not_stored_have_no_etag(fake_redis):
+    produce, calls = producer()
+    response = await cached_json(fake_redis, 3, "contacts", {}, produce, store=False)
+    await cached_json(fake_redis, 3, "contacts", {}, produce, store=False)
+    assert len(calls) == 2 and "ETag" not in response.headers
+
+
+def test_contact_reads_are_served_from_cache_until_a_write(contacts_client, memory_session, owner):
+    make_contacts(memory_session, owner, 3)
+    memory_session.refresh(owner)
+
+    first = contacts_client.get("/api/contacts/", params={"limit": 2})
+    assert first.status_code == 200, first.text
+    with count_statements(memory_session) as statements:
+        second = contacts_client.get("/api/contacts/", params={"limit": 2})
+        contact = contacts_client.get(f"/api/contacts/{first.json()[0]['id']}")
+        contacts_client.get(f"/api/contacts/{first.json()[0]['id']}")
+    assert second.content == first.content
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert contact.json()["email"] == "contact0@example.com"
+    # Only the first read of the contact misses
+    assert len(statements) == 1
+
+    response = contacts_client.put(
+        f"/api/contacts/{first.json()[0]['id']}", json={"first_name": "Changed"}
+    )
+    assert response.status_code == 200, response.text
+    assert contacts_client.get("/api/contacts/", params={"limit": 2}).json()[0]["first_name"] == "Changed"
+    assert contacts_client.get("/api/contacts/99").status_code == 404
+
+
+def test_reads_from_the_replica_are_not_cached(contacts_client, memory_session, owner, monkeypatch):
+    make_contacts(memory_session, owner, 2)
+    monkeypatch.setitem(memory_session.info, "replica", True)
+
+    with count_statements(memory_session) as statements:
+        first = contacts_client.get("/api/contacts/")
+        second = contacts_client.get("/api/contacts/")
+    assert second.content == first.content
+    assert len(statements) == 2
+    assert "ETag" not in first.headers
+
+    # An entry filled from the primary is served to replica readers
+    monkeypatch.setitem(memory_session.info, "replica", False)
+    contacts_client.get("/api/contacts/")
+    monkeypatch.setitem(memory_session.info, "replica", True)
+    with count_statements(memory_session) as statements:
+        assert contacts_client.get("/api/contacts/").content == first.content
+    assert statements == []
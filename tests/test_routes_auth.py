@@ -1,10 +1,10 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 from src.database.models import User
 
 
 def test_create_user(client, user, monkeypatch):
-    mock_send_email = MagicMock()
+    mock_send_email = AsyncMock()
     monkeypatch.setattr("src.routes.auth.send_email", mock_send_email)
     response = client.post(
         "/api/auth/signup",
@@ -0,0 +1,49 @@
+from conftest import make_contacts
+from src.database.models import User
+from src.repository.contacts import search_contacts
+
+
+def test_search_matches_substrings_case_insensitively(memory_session, owner):
+    john, jane, bob = make_contacts(memory_session, owner, 3)
+    john.first_name, jane.first_name, bob.first_name = "Johnny", "Jane", "Bob"
+    bob.email = "bob@johnson.org"
+    memory_session.commit()
+
+    found = search_contacts(memory_session, "OHN", owner)
+    assert {c.id for c in found} == {john.id, bob.id}
+
+
+def test_search_is_limited_to_owner(memory_session, owner):
+    stranger = User(username="stranger", email="stranger@example.com", password="secret")
+    memory_session.add(stranger)
+    memory_session.commit()
+    make_contacts(memory_session, stranger, 1, first_name="Matching")
+
+    assert search_contacts(memory_session, "Matching", owner) == []
+    assert len(search_contacts(memory_session, "Matching", stranger)) == 1
+
+
+def test_search_follows_updates_and_deletes(memory_session, owner):
+    contact, = make_contacts(memory_session, owner, 1)
+    contact.last_name = "Wilson"
+    memory_session.commit()
+    assert search_contacts(memory_session, "Last0", owner) == []
+    assert search_contacts(memory_session, "wils", owner) == [contact]
+
+    memory_session.delete(contact)
+    memory_session.commit()
+    assert search_contacts(memory_session, "wils", owner) == []
+
+
+def test_search_paginates(memory_session, owner):
+    make_contacts(memory_session, owner, 15)
+    first = search_contacts(memory_session, "example", owner, limit=10)
+    second = search_contacts(memory_session, "example", owner, skip=10, limit=10)
+    assert len(first) == 10 and len(second) == 5
+    assert not {c.id for c in first} & {c.id for c in second}
+
+
+def test_short_query_falls_back_to_escaped_like(memory_session, owner):
+    make_contacts(memory_session, owner, 2)
+    assert len(search_contacts(memory_session, "t1", owner)) == 1
+    assert search_contacts(memory_session, "%", owner) == []
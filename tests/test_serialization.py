@@ -0,0 +1,42 @@
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from main import app
+from src.database.models import Contact
+from src.repository.contacts import CONTACT_COLUMNS
+from src.schemas import ContactResponse
+from src.services.serialization import contact_json, contact_list_json
+
+from conftest import make_contacts
+
+adapter = TypeAdapter(List[ContactResponse])
+
+
+def test_fast_path_matches_pydantic_output(memory_session, owner):
+    make_contacts(memory_session, owner, 3)
+    memory_session.query(Contact).filter(Contact.id == 2).update({"additional_info": "ünïcode \"quoted\""})
+    memory_session.commit()
+    contacts = memory_session.query(Contact).order_by(Contact.id).all()
+    expected = adapter.dump_json(adapter.validate_python(contacts, from_attributes=True))
+
+    rows = memory_session.execute(select(*CONTACT_COLUMNS).order_by(Contact.id)).all()
+    assert contact_list_json(contacts) == expected
+    assert contact_list_json(rows) == expected
+    assert contact_list_json(row._mapping for row in rows) == expected
+    assert contact_json(contacts[1]) == ContactResponse.model_validate(contacts[1]).model_dump_json().encode()
+    assert contact_list_json([]) == b"[]"
+
+
+def test_openapi_still_documents_contact_response():
+    paths = app.openapi()["paths"]
+
+    def schema(path):
+        return paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    contact_ref = {"$ref": "#/components/schemas/ContactResponse"}
+    assert schema("/api/contacts/")["items"] == contact_ref
+    assert schema("/api/contacts/{contact_id}") == contact_ref
+    assert schema("/api/contacts/search/")["items"] == contact_ref
+    assert schema("/api/contacts/birthdays/")["items"] == contact_ref
@@ -0,0 +1,64 @@
+import pytest
+from fastapi import HTTPException
+
+from src.services.serialization import CONTACT_FIELDS, parse_fields
+
+from conftest import count_statements, make_contacts
+
+
+def test_parse_fields():
+    assert parse_fields(None) == CONTACT_FIELDS
+    assert parse_fields("") == CONTACT_FIELDS
+    assert parse_fields(" phone_number, first_name,first_name ") == ("first_name", "phone_number", "id")
+    assert parse_fields("id") == ("id",)
+    with pytest.raises(HTTPException) as error:
+        parse_fields("first_name,password")
+    assert error.value.status_code == 422
+    assert "password" in error.value.detail
+
+
+def test_fields_narrow_select_and_body(contacts_client, memory_session, owner):
+    make_contacts(memory_session, owner, 3, additional_info="x" * 1000)
+    memory_session.refresh(owner)
+
+    urls = [
+        "/api/contacts/?fields=first_name,phone_number",
+        "/api/contacts/search/?query=First1&fields=first_name,phone_number",
+        "/api/contacts/birthdays/?days=366&fields=first_name,phone_number",
+    ]
+    for url in urls:
+        with count_statements(memory_session) as statements:
+            response = contacts_client.get(url)
+        assert response.status_code == 200, response.text
+        assert response.json()
+        for contact in response.json():
+            assert list(contact) == ["first_name", "phone_number", "id"]
+        contact_selects = [s for s in statements if "contacts" in s and s.lstrip().startswith("SELECT")]
+        assert contact_selects
+        assert all("additional_info" not in s and "last_name" not in s for s in contact_selects)
+
+    response = contacts_client.get("/api/contacts/2?fields=email")
+    assert response.json() == {"email": "contact1@example.com", "id": 2}
+
+
+def test_unknown_field_is_rejected(contacts_client):
+    for url in ["/api/contacts/", "/api/contacts/1", "/api/contacts/search/?query=a", "/api/contacts/birthdays/"]:
+        response = contacts_client.get(url, params={"fields": "first_name,owner_id"})
+        assert response.status_code == 422
+        assert "owner_id" in response.json()["detail"]
+
+
+def test_cache_and_etag_are_per_fieldset(contacts_client, memory_session, owner):
+    make_contacts(memory_session, owner, 2)
+    memory_session.refresh(owner)
+
+    full = contacts_client.get("/api/contacts/")
+    sparse = contacts_client.get("/api/contacts/?fields=last_name")
+    reordered = contacts_client.get("/api/contacts/?fields=id,last_name")
+    explicit_all = contacts_client.get("/api/contacts/", params={"fields": ",".join(CONTACT_FIELDS)})
+
+    assert full.headers["ETag"] != sparse.headers["ETag"]
+    assert sparse.headers["ETag"] == reordered.headers["ETag"]
+    assert full.headers["ETag"] == explicit_all.headers["ETag"]
+    assert "email" in full.json()[0]
+    assert sparse.json()[0] == {"last_name": "Last0", "id": 1}
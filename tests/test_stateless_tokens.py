@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException, Request, Response
+from redis.exceptions import ConnectionError
+
+from src.database.models import User
+from src.repository import users as repository_users
+from src.services.auth import Auth, Principal, auth_service
+from src.services import token_versions
+from src.services.rate_limit import RateLimiter
+
+EMAIL = "stateless@example.com"
+PASSWORD = "secret123"
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(Auth, "stateless_claims", True)
+
+
+@pytest.fixture(scope="module")
+def confirmed_user(session):
+    user = User(username="stateless", email=EMAIL, confirmed=True,
+                password=auth_service.pwd_context.hash(PASSWORD))
+    session.add(user)
+    session.commit()
+
+
+@pytest.mark.asyncio
+async def test_principal_is_built_from_the_token_alone(stateless, owner, fake_redis, monkeypatch):
+    claims = await auth_service.token_claims(owner, fake_redis)
+    assert claims == {"sub": owner.email, "uid": owner.id, "cnf": False, "ver": 0}
+    token = await auth_service.create_access_token(data=claims)
+
+    lookup = AsyncMock()
+    monkeypatch.setattr(repository_users, "get_user_by_email", lookup)
+    principal = await auth_service.get_current_principal(token, None, fake_redis)
+    assert principal == Principal(id=owner.id, email=owner.email, confirmed=False)
+    lookup.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_version_bump_revokes_stateless_tokens(stateless, owner, memory_session, fake_redis):
+    token = await auth_service.create_access_token(
+        data=await auth_service.token_claims(owner, fake_redis)
+    )
+    assert await token_versions.bump_version(fake_redis, owner.id) == 1
+
+    with pytest.raises(HTTPException) as error:
+        await auth_service.get_current_principal(token, None, fake_redis)
+    assert error.value.detail == "Token has been revoked"
+    with pytest.raises(HTTPException):
+        await auth_service.get_current_user(token, memory_session, fake_redis)
+
+    fresh = await auth_service.create_access_token(
+        data=await auth_service.token_claims(owner, fake_redis)
+    )
+    assert (await auth_service.get_current_principal(fresh, None, fake_redis)).id == owner.id
+
+
+class RedisDown:
+    async def get(self, key):
+        raise ConnectionError("Connection refused")
+
+
+@pytest.mark.asyncio
+async def test_stateless_token_is_refused_with_503_when_redis_is_down(stateless, owner, fake_redis):
+    token = await auth_service.create_access_token(
+        data=await auth_service.token_claims(owner, fake_redis)
+    )
+
+    with pytest.raises(HTTPException) as error:
+        await auth_service.get_current_principal(token, None, RedisDown())
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    with pytest.raises(HTTPException) as error:
+        await auth_service.token_claims(owner, RedisDown())
+    assert error.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_principal_falls_back_to_the_user_lookup(owner, memory_session, fake_redis):
+    claims = await auth_service.token_claims(owner, fake_redis)
+    assert claims == {"sub": owner.email}
+    token = await auth_service.create_access_token(data=claims)
+
+    principal = await auth_service.get_current_principal(token, memory_session, fake_redis)
+    assert principal == Principal(id=owner.id, email=owner.email, confirmed=False)
+
+
+def test_revoke_tokens_route(stateless, client, confirmed_user, monkeypatch):
+    async def no_limit(self, request: Request, response: Response, redis=None):
+        return None
+
+    monkeypatch.setattr(RateLimiter, "__call__", no_limit)
+    tokens = client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD}).json()
+    access = {"Authorization": f"Bearer {tokens['access_token']}"}
+    refresh = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+
+    response = client.get("/api/contacts/", headers=access)
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/auth/revoke_tokens", headers=access)
+    assert response.status_code == 200, response.text
+    assert client.get("/api/contacts/", headers=access).status_code == 401
+    assert client.get("/api/auth/refresh_token", headers=refresh).status_code == 401
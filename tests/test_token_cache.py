@@ -0,0 +1,38 @@
+from unittest.mock import patch
+
+import pytest
+from jose import JWTError, jwt
+
+from src.services.auth import auth_service
+from src.services.cache import token_cache
+
+
+@pytest.mark.asyncio
+async def test_verified_claims_are_reused():
+    token = await auth_service.create_access_token(data={"sub": "ann@example.com"})
+
+    with patch("src.services.auth.jwt.decode", wraps=jwt.decode) as decode:
+        first = auth_service.verify_access_token(token)
+        second = auth_service.verify_access_token(token)
+    assert decode.call_count == 1
+    assert first == second and first["sub"] == "ann@example.com"
+    assert token_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_claims_expire_with_the_token(monkeypatch):
+    token = await auth_service.create_access_token(data={"sub": "ann@example.com"}, expires_delta=2)
+    claims = auth_service.verify_access_token(token)
+    (key, (expires_at, _)), = token_cache._entries.items()
+    assert expires_at == claims["exp"]
+
+    monkeypatch.setattr(token_cache, "_clock", lambda: claims["exp"] - 0.001)
+    assert token_cache.get(key) is claims
+    monkeypatch.setattr(token_cache, "_clock", lambda: claims["exp"])
+    assert token_cache.get(key) is None
+
+
+def test_invalid_tokens_are_not_cached():
+    with pytest.raises(JWTError):
+        auth_service.verify_access_token("not-a-token")
+    assert token_cache.stats()["size"] == 0
@@ -20,7 +20,8 @@ class TestContactRepository(unittest.TestCase):
             phone_number="1234567890",
             birthday="1990-01-01",
         )
-        self.db.query().filter().first.return_value = None
+        self.db.execute().first.return_value = MagicMock(
+            _mapping={"id": 1, **contact_data.model_dump()})
         created_contact = create_contact(self.db, contact_data, self.user)
 
         self.assertEqual(created_contact.first_name, contact_data.first_name)
@@ -34,8 +35,8 @@ class TestContactRepository(unittest.TestCase):
             phone_number="0987654321",
             birthday="1995-01-01",
         )
-        # Имитация существующего контакта
-        self.db.query().filter().first.return_value = MagicMock()
+        # Имитация существующего контакта: ON CONFLICT DO NOTHING не вернул строку
+        self.db.execute().first.return_value = None
 
         with self.assertRaises(HTTPException) as context:
             create_contact(self.db, contact_data, self.user)
@@ -43,7 +44,7 @@ class TestContactRepository(unittest.TestCase):
         self.assertEqual(context.exception.status_code, 409)
 
     def test_get_contacts(self):
-        self.db.query().filter().offset().limit().all.return_value = [
+        self.db.query().filter().order_by().offset().limit().all.return_value = [
             MagicMock()]  # Имитация списка контактов
         contacts = get_contacts(self.db, self.user)
         self.assertIsInstance(contacts, list)
@@ -66,17 +67,19 @@ class TestContactRepository(unittest.TestCase):
 
     def test_update_contact_success(self):
         contact_id = 1
-        existing_contact = MagicMock()
-        self.db.query().filter().first.return_value = existing_contact
-
         update_data = ContactUpdate(
             first_name="Updated Name",
-            last_name=None,  # Не обновляем фамилию
-            email=None,  # Не обновляем email
             phone_number="1111111111",
-            birthday=None,
-            additional_info=None,
         )
+        self.db.execute().first.return_value = MagicMock(_mapping={
+            "id": contact_id,
+            "first_name": "Updated Name",
+            "last_name": "Doe",
+            "email": "john@example.com",
+            "phone_number": "1111111111",
+            "birthday": "1990-01-01",
+            "additional_info": None,
+        })
 
         updated_contact = update_contact(
             self.db, contact_id, update_data, self.user)
@@ -85,7 +88,8 @@ class TestContactRepository(unittest.TestCase):
 
     def test_update_contact_not_found(self):
         contact_id = 999
-        self.db.query().filter().first.return_value = None
+        self.db.execute().first.return_value = None
+        self.db.query().scalar.return_value = False
 
         update_data = ContactUpdate(
             first_name="Updated Name",
@@ -102,16 +106,15 @@ class TestContactRepository(unittest.TestCase):
 
     def test_delete_contact_success(self):
         contact_id = 1
-        existing_contact = MagicMock()
-        self.db.query().filter().first.return_value = existing_contact
+        self.db.execute().first.return_value = (contact_id,)
 
         delete_contact(self.db, contact_id, self.user)
-        self.db.delete.assert_called_once_with(existing_contact)
+        self.db.delete.assert_not_called()
         self.db.commit.assert_called_once()
 
     def test_delete_contact_not_found(self):
         contact_id = 999
-        self.db.query().filter().first.return_value = None
+        self.db.execute().first.return_value = None
 
         with self.assertRaises(HTTPException) as context:
             delete_contact(self.db, contact_id, self.user)
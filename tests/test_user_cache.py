@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.database.models import User
+from src.repository import users as repository_users
+from src.services.auth import auth_service
+from src.services.cache import TTLCache, detached_user, user_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, max_entries=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, expires_at=3)
+
+    clock.now = 5
+    assert cache.get("a") == 1 and cache.get("b") is None
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.stats() | {"hit_ratio": None} == {
+        "size": 0, "max_entries": 10, "ttl": 10, "hits": 1, "misses": 2,
+        "evictions": 0, "hit_ratio": None,
+    }
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TTLCache(ttl=0, max_entries=10)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_until_invalidated(memory_session, owner, monkeypatch):
+    token = await auth_service.create_access_token(data={"sub": owner.email})
+    lookup = AsyncMock(wraps=repository_users.get_user_by_email)
+    monkeypatch.setattr(repository_users, "get_user_by_email", lookup)
+
+    first = await auth_service.get_current_user(token, memory_session)
+    second = await auth_service.get_current_user(token, memory_session)
+    assert lookup.await_count == 1
+    assert first is second and first.username == "owner"
+    assert user_cache.stats()["hits"] == 1
+
+    await repository_users.update_avatar(owner.email, "https://example.com/a.png", memory_session)
+    refreshed = await auth_service.get_current_user(token, memory_session)
+    assert lookup.await_count == 2
+    assert refreshed.avatar == "https://example.com/a.png"
+
+
+def test_detached_user_survives_commits(memory_session, owner):
+    copy = detached_user(owner)
+    owner.confirmed = True
+    memory_session.commit()
+
+    assert isinstance(copy, User) and copy.email == "owner@example.com"
+    assert not copy.confirmed